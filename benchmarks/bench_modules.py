@@ -0,0 +1,177 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from edition_manager import module_call, module_batch
+
+# Module micro-benchmarks: every get_* function is run over a versioned golden
+# corpus of real-world file names and stream metadata. Outputs are checked
+# against the expected labels, and each module is timed (calls/sec) and
+# traced for memory (peak bytes allocated per call). Modules with a batch API
+# are also checked and timed through it (column extraction included).
+
+CORPUS = Path(__file__).resolve().parent / "corpus" / "modules.jsonl"
+CORPUS_VERSION = 1
+BATCH_SIZE = 1000
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        cases = [json.loads(line) for line in f if line.strip()]
+    if header.get("version") != CORPUS_VERSION:
+        raise SystemExit(f"{path} is corpus version {header.get('version')}, expected {CORPUS_VERSION}")
+    return header, cases
+
+def _file_name(movie):
+    parts = (movie.get('Media') or [{}])[0].get('Part') or []
+    return os.path.basename(max(parts, key=lambda p: p['size'])['file']) if parts else ""
+
+def _calls(case, module):
+    """(function, args) for a corpus case, built the way compute_edition builds them."""
+    options = case.get("options", {})
+    return module_call(
+        module, case["movie"], _file_name(case["movie"]),
+        set(options.get("excluded_languages", [])), options.get("skip_multiple_audio_tracks", False), None
+    )
+
+def check(cases, modules) -> list:
+    """(case id, module, expected, got) for every output that differs from the corpus."""
+    mismatches = []
+    for case in cases:
+        for module in modules:
+            if module not in case["expected"]:
+                continue
+            fn, args = _calls(case, module)
+            got = fn(*args)
+            if got != case["expected"][module]:
+                mismatches.append((case["id"], module, case["expected"][module], got))
+    for module in modules:
+        api = module_batch(module)
+        batch_cases = [case for case in cases if module in case["expected"]]
+        if api is None or not batch_cases:
+            continue
+        column, batch = api
+        for case, got in zip(batch_cases, batch([column(case["movie"]) for case in batch_cases])):
+            if got != case["expected"][module]:
+                mismatches.append((case["id"], f"{module} (batch)", case["expected"][module], got))
+    return mismatches
+
+def bench(cases, module, min_seconds) -> dict:
+    calls = [_calls(case, module) for case in cases if module in case["expected"]]
+    if not calls:
+        return None
+    # Timing pass: repeat the corpus until min_seconds have passed
+    rounds = 0
+    started = time.perf_counter()
+    while True:
+        for fn, args in calls:
+            fn(*args)
+        rounds += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            break
+    n = rounds * len(calls)
+
+    # Memory pass (separate, tracemalloc slows calls down)
+    peaks = []
+    tracemalloc.start()
+    for fn, args in calls:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(*args)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return {
+        "module": module,
+        "cases": len(calls),
+        "calls_per_sec": round(n / elapsed),
+        "us_per_call": round(elapsed / n * 1e6, 2),
+        "batch_us_per_movie": bench_batch(cases, module, min_seconds),
+        "peak_alloc_bytes": round(sum(peaks) / len(peaks)),
+    }
+
+def bench_batch(cases, module, min_seconds):
+    """Microseconds per movie through the batch API, over the corpus repeated to BATCH_SIZE movies."""
+    api = module_batch(module)
+    if api is None:
+        return None
+    column, batch = api
+    movies = [case["movie"] for case in cases if module in case["expected"]]
+    movies = (movies * (BATCH_SIZE // len(movies) + 1))[:BATCH_SIZE]
+    rounds = 0
+    started = time.perf_counter()
+    while True:
+        batch([column(m) for m in movies])
+        rounds += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            break
+    return round(elapsed / (rounds * len(movies)) * 1e6, 2)
+
+def update(path, header, cases, modules):
+    """Rewrite the expected labels with the current outputs."""
+    changed = 0
+    for case in cases:
+        for module in modules:
+            fn, args = _calls(case, module)
+            got = fn(*args)
+            if case["expected"].get(module, object()) != got:
+                case["expected"][module] = got
+                changed += 1
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        for case in cases:
+            f.write(json.dumps(case, ensure_ascii=False) + "\n")
+    return changed
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and time the edition modules against the golden corpus')
+    parser.add_argument('--corpus', default=str(CORPUS))
+    parser.add_argument('--modules', help='Comma-separated modules (default: every module in the corpus)')
+    parser.add_argument('--seconds', type=float, default=0.5, help='Minimum timing run per module')
+    parser.add_argument('--check-only', action='store_true', help='Only check the outputs, no timing')
+    parser.add_argument('--update', action='store_true',
+                        help='Store the current outputs as the expected labels (after an intended change)')
+    parser.add_argument('--json', dest='json_file', help='Write the timings to this file')
+    args = parser.parse_args()
+
+    header, cases = load_corpus(args.corpus)
+    if args.modules:
+        modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+    else:
+        modules = sorted({m for case in cases for m in case["expected"]})
+
+    if args.update:
+        changed = update(args.corpus, header, cases, modules)
+        print(f"Updated {changed} expected labels in {args.corpus}")
+        return
+
+    mismatches = check(cases, modules)
+    for case_id, module, expected, got in mismatches:
+        print(f"MISMATCH {module} [{case_id}]: expected {expected!r}, got {got!r}")
+    print(f"{len(cases)} cases, {len(modules)} modules: {len(mismatches)} mismatches")
+
+    if not args.check_only:
+        results = [r for r in (bench(cases, m, args.seconds) for m in modules) if r]
+        columns = ["module", "cases", "calls_per_sec", "us_per_call", "batch_us_per_movie", "peak_alloc_bytes"]
+        cell = lambda v: "-" if v is None else str(v)
+        widths = [max(len(c), *(len(cell(r[c])) for r in results)) for c in columns]
+        print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+        for r in results:
+            print("  ".join(cell(r[c]).ljust(w) for c, w in zip(columns, widths)))
+        if args.json_file:
+            Path(args.json_file).write_text(json.dumps({"corpus_version": header["version"], "results": results},
+                                                       indent=2))
+
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Local Plex stand-in for benchmarks: synthesizes movie libraries with
+# realistic Media/Part/Stream/extras payloads, answers the endpoints Edition
+# Manager uses and records per-request statistics. Movies are generated on
+# demand from their ratingKey, so 100k-movie libraries stay cheap to serve.
+
+FRIENDLY_NAME = "Fake Plex"
+
+RESOLUTIONS = [("4k", 3840, 2160), ("1080", 1920, 1080), ("1080", 1920, 1080), ("720", 1280, 720), ("sd", 720, 480)]
+VIDEO_CODECS = ["hevc", "h264", "h264", "av1", "mpeg2video"]
+FRAME_RATES = ["24p", "24p", "25p", "30p", "60p"]
+DYNAMIC_RANGES = [
+    (None, None, "bt709"),
+    ("HDR10", "HDR10", "smpte2084"),
+    ("Dolby Vision", "Dolby Vision / HDR10", "smpte2084"),
+    ("HDR10+", "HDR10+", "smpte2084"),
+]
+AUDIO = [
+    ("truehd", 8, "TrueHD Atmos 7.1", "atmos"),
+    ("eac3", 6, "Dolby Digital+ 5.1", None),
+    ("ac3", 6, "Dolby Digital 5.1", None),
+    ("dca", 6, "DTS-HD MA 5.1", "ma"),
+    ("aac", 2, "AAC Stereo", "lc"),
+]
+LANGUAGES = [("English", "eng"), ("Français", "fra"), ("Deutsch", "deu"), ("Español", "spa"), ("日本語", "jpn")]
+CUTS = ["", "", "", ".Directors.Cut", ".Extended", ".Theatrical", ".Unrated", ".IMAX", ".Remastered"]
+SOURCES = ["BluRay", "WEB-DL", "Remux", "HDTV", "DVDRip", "UHD.BluRay"]
+GROUPS = ["FraMeSToR", "SPARKS", "NTb", "EPSiLON", "playWEB"]
+GENRES = ["Drama", "Comedy", "Action", "Thriller", "Documentary", "Horror", "Animation"]
+COUNTRIES = ["United States of America", "United Kingdom", "France", "Japan", "Germany"]
+STUDIOS = ["Warner Bros.", "A24", "Toho", "Gaumont", "Universal Pictures"]
+CONTENT_RATINGS = ["G", "PG", "PG-13", "R", "NR"]
+EXTRAS = [
+    ("Deleted Scenes", "deletedScene"),
+    ("Behind the Scenes", "behindTheScenes"),
+    ("Interview with the Director", "interview"),
+    ("Official Trailer", "trailer"),
+    ("Featurette: The Score", "featurette"),
+    ("Gag Reel", "deletedScene"),
+]
+
+class FakeLibrary:
+    """Deterministic synthetic movie libraries plus the edition writes made against them."""
+
+    def __init__(self, movies=1000, sections=2, seed=1):
+        self.count = movies
+        self.sections = max(1, sections)
+        self.seed = seed
+        self.editions = {}  # ratingKey -> editionTitle written by a client
+        self.locked = set()  # ratingKeys whose editionTitle is locked
+        self.titles = {}  # section key -> title, for libraries not named "Movies <key>"
+        self.lock = threading.Lock()
+
+    def section_of(self, key: int) -> str:
+        return str((key - 1) % self.sections + 1)
+
+    def section_title(self, section: str) -> str:
+        return self.titles.get(str(section), f"Movies {section}")
+
+    def keys(self, section: str):
+        first = int(section)
+        return range(first, self.count + 1, self.sections)
+
+    def _rng(self, key: int) -> random.Random:
+        return random.Random(self.seed * 1_000_003 + key)
+
+    def listing(self, key: int) -> dict:
+        rng = self._rng(key)
+        year = 1950 + rng.randrange(75)
+        added = 1_600_000_000 + key * 600
+        movie = {
+            "ratingKey": str(key),
+            "key": f"/library/metadata/{key}",
+            "type": "movie",
+            "title": f"Movie {key}",
+            "year": year,
+            "librarySectionID": self.section_of(key),
+            "librarySectionTitle": self.section_title(self.section_of(key)),
+            "addedAt": added,
+            "updatedAt": added + rng.randrange(86400 * 30),
+            "duration": rng.randrange(20, 200) * 60_000,
+            "contentRating": rng.choice(CONTENT_RATINGS),
+            "rating": round(rng.uniform(2, 10), 1),
+            "audienceRating": round(rng.uniform(2, 10), 1),
+            "studio": rng.choice(STUDIOS),
+            "Genre": [{"tag": g} for g in rng.sample(GENRES, 2)],
+            "Country": [{"tag": rng.choice(COUNTRIES)}],
+            "Director": [{"tag": f"Director {key % 997}"}],
+            "Writer": [{"tag": f"Writer {key % 991}"}],
+        }
+        with self.lock:
+            edition = self.editions.get(key)
+            locked = key in self.locked
+        if edition is None and key % 7 == 0:
+            edition, locked = "Old Edition", True  # set by hand
+        if edition:
+            movie["editionTitle"] = edition
+        if locked:
+            movie["Field"] = [{"locked": True, "name": "editionTitle"}]
+        return movie
+
+    def detail(self, key: int, extras=False) -> dict:
+        movie = self.listing(key)
+        rng = self._rng(key + 7_919)
+        res, width, height = rng.choice(RESOLUTIONS)
+        codec = rng.choice(VIDEO_CODECS)
+        dyn, dyn_type, trc = rng.choice(DYNAMIC_RANGES) if res == "4k" else DYNAMIC_RANGES[0]
+        source = rng.choice(SOURCES)
+        file_name = (
+            f"Movie.{key}.{movie['year']}{rng.choice(CUTS)}.{height}p.{source}."
+            f"{'x265' if codec == 'hevc' else 'x264'}-{rng.choice(GROUPS)}.mkv"
+        )
+        video = {
+            "streamType": 1, "codec": codec, "width": width, "height": height, "frameRate": 23.976,
+            "displayTitle": f"{res.upper()} ({codec.upper()})", "colorTrc": trc,
+            "extendedDisplayTitle": f"{res.upper()} {dyn or 'SDR'} ({codec.upper()})",
+        }
+        if dyn:
+            video.update(videoDynamicRange=dyn, videoDynamicRangeType=dyn_type, colorPrimaries="bt2020")
+        streams = [video]
+        for i in range(rng.randrange(1, 4)):
+            acodec, channels, title, profile = rng.choice(AUDIO)
+            language, code = LANGUAGES[0] if i == 0 else rng.choice(LANGUAGES)
+            streams.append({
+                "streamType": 2, "codec": acodec, "channels": channels, "audioProfile": profile,
+                "profile": profile, "language": language, "languageCode": code, "title": title,
+                "displayTitle": f"{language} ({title})", "bitrate": rng.randrange(192, 6000),
+            })
+        for _ in range(rng.randrange(0, 6)):
+            language, code = rng.choice(LANGUAGES)
+            streams.append({"streamType": 3, "codec": "srt", "language": language, "languageCode": code,
+                            "displayTitle": language})
+        bitrate = rng.randrange(2_000, 80_000)
+        movie["Media"] = [{
+            "id": key, "duration": movie["duration"], "bitrate": bitrate, "width": width, "height": height,
+            "videoResolution": res, "videoCodec": codec, "videoFrameRate": rng.choice(FRAME_RATES),
+            "audioCodec": streams[1]["codec"], "audioChannels": streams[1]["channels"], "container": "mkv",
+            "Part": [{
+                "id": key, "file": f"/movies/Movie {key} ({movie['year']})/{file_name}",
+                "size": bitrate * movie["duration"] // 8, "container": "mkv", "Stream": streams,
+            }],
+        }]
+        if extras:
+            movie["Extras"] = {"size": 0, "Metadata": self.extras(key)}
+            movie["Extras"]["size"] = len(movie["Extras"]["Metadata"])
+        return movie
+
+    def extras(self, key: int) -> list:
+        rng = self._rng(key + 104_729)
+        return [
+            {"ratingKey": f"x{key}-{i}", "title": title, "type": "clip", "subtype": subtype}
+            for i, (title, subtype) in enumerate(rng.sample(EXTRAS, rng.randrange(0, 4)))
+        ]
+
+    def exists(self, key) -> bool:
+        return str(key).isdigit() and 1 <= int(key) <= self.count
+
+    def set_edition(self, key: int, value: str, locked=False):
+        with self.lock:
+            self.editions[key] = value
+            if locked:
+                self.locked.add(key)
+            else:
+                self.locked.discard(key)
+
+class Stats:
+    """Request counters and per-movie request spans (first to last request touching a movie)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.errors = 0
+        self.spans = {}
+
+    def reset(self):
+        with self.lock:
+            self.requests = Counter()
+            self.errors = 0
+            self.spans = {}
+
+    def record(self, kind, keys, started, ended, error=False):
+        with self.lock:
+            self.requests[kind] += 1
+            self.errors += error
+            for key in keys:
+                span = self.spans.get(key)
+                self.spans[key] = (started, ended) if span is None else (min(span[0], started), max(span[1], ended))
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            spans = sorted(end - start for start, end in self.spans.values())
+            return {
+                "requests": dict(self.requests),
+                "total_requests": sum(self.requests.values()),
+                "errors": self.errors,
+                "movies_touched": len(spans),
+                "movie_latency_ms": {
+                    "p50": round(_percentile(spans, 50) * 1000, 1) if spans else None,
+                    "p99": round(_percentile(spans, 99) * 1000, 1) if spans else None,
+                },
+            }
+
+def _percentile(values, pct):
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+def make_handler(library: FakeLibrary, stats: Stats, latency=0.0, jitter=0.0, error_rate=0.0):
+    """Request handler class serving `library` with injected latency (seconds) and 500 errors."""
+    rng = random.Random(library.seed)
+    rng_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like Plex
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, obj, code=200):
+            body = json.dumps(obj).encode() if obj is not None else b""
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _delay_or_fail(self) -> bool:
+            with rng_lock:
+                delay = latency + (rng.uniform(0, jitter) if jitter else 0)
+                fail = error_rate and rng.random() < error_rate
+            if delay:
+                time.sleep(delay)
+            return bool(fail)
+
+        def _handle(self, method):
+            started = time.monotonic()
+            url = urlparse(self.path)
+            query = parse_qs(url.query, keep_blank_values=True)
+            parts = url.path.strip("/").split("/")
+            if url.path == "/_stats":
+                return self._send(stats.snapshot())
+            if url.path == "/_reset":
+                stats.reset()
+                return self._send({"ok": True})
+
+            kind, keys = f"{method} other", []
+            if parts[:2] == ["library", "metadata"] and len(parts) >= 3:
+                keys = [k for k in parts[2].split(",") if library.exists(k)]
+                kind = f"{method} metadata{'/' + parts[3] if len(parts) > 3 else ''}"
+            elif parts[:2] == ["library", "sections"]:
+                kind = f"{method} sections{'/' + parts[3] if len(parts) > 3 else ''}"
+
+            failed = self._delay_or_fail()
+            try:
+                if failed:
+                    return self._send({"errors": [{"code": 500, "message": "injected error"}]}, 500)
+                if method == "GET":
+                    return self._get(url, query, parts, keys)
+                return self._put(query, parts, keys)
+            finally:
+                stats.record(kind, keys, started, time.monotonic(), error=failed)
+
+        def _get(self, url, query, parts, keys):
+            if url.path in ("/", "/identity"):
+                return self._send({"MediaContainer": {"friendlyName": FRIENDLY_NAME, "version": "1.40.0"}})
+            if url.path == "/library/sections":
+                return self._send({"MediaContainer": {"friendlyName": FRIENDLY_NAME, "Directory": [
+                    {"key": str(s), "title": library.section_title(s), "type": "movie"}
+                    for s in range(1, library.sections + 1)
+                ] + [{"key": str(library.sections + 1), "title": "TV Shows", "type": "show"}]}})
+            if parts[:2] == ["library", "sections"] and len(parts) == 4 and parts[3] == "collections":
+                return self._send({"MediaContainer": {"Metadata": [{"ratingKey": "c1", "title": "Every Tenth"}]}})
+            if parts[:2] == ["library", "sections"] and len(parts) == 4 and parts[3] == "all":
+                return self._send(self._section_listing(parts[2], query))
+            if parts[:2] == ["library", "metadata"] and len(parts) == 4 and parts[3] == "extras":
+                if not keys:
+                    return self._send(None, 404)
+                return self._send({"MediaContainer": {"Metadata": library.extras(int(keys[0]))}})
+            if parts[:2] == ["library", "metadata"] and len(parts) == 3:
+                if not keys:
+                    return self._send(None, 404)
+                extras = query.get("includeExtras", ["0"])[0] == "1"
+                return self._send({"MediaContainer": {"Metadata": [library.detail(int(k), extras) for k in keys]}})
+            return self._send(None, 404)
+
+        def _section_listing(self, section, query):
+            if not section.isdigit() or not 1 <= int(section) <= library.sections:
+                return {"MediaContainer": {"size": 0, "totalSize": 0, "Metadata": []}}
+            keys = library.keys(section)
+            if "collection" in query:
+                keys = [k for k in keys if k % 10 == 0]
+            items = [library.listing(k) for k in keys]
+            for field in ("addedAt", "updatedAt"):
+                if f"{field}>>" in query:
+                    cutoff = int(query[f"{field}>>"][0])
+                    items = [m for m in items if m[field] >= cutoff]
+            if "title" in query:
+                needle = query["title"][0].lower()
+                items = [m for m in items if needle in m["title"].lower()]
+            if query.get("sort", [""])[0] == "addedAt:desc":
+                items.sort(key=lambda m: -m["addedAt"])
+            total = len(items)
+            start = int(query.get("X-Plex-Container-Start", [self.headers.get("X-Plex-Container-Start") or 0])[0])
+            size = query.get("X-Plex-Container-Size", [self.headers.get("X-Plex-Container-Size")])[0]
+            if size is not None:
+                items = items[start:start + int(size)]
+            return {"MediaContainer": {"size": len(items), "totalSize": total, "Metadata": items}}
+
+        def _put(self, query, parts, keys):
+            if parts[:2] != ["library", "metadata"] or len(parts) != 3 or not keys:
+                return self._send(None, 404)
+            if "editionTitle.value" in query:
+                library.set_edition(int(keys[0]), query["editionTitle.value"][0],
+                                    query.get("editionTitle.locked", ["0"])[0] == "1")
+            return self._send(None, 200)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_PUT(self):
+            self._handle("PUT")
+
+    return Handler
+
+class FakePlexServer:
+    """A FakeLibrary served over HTTP on a background thread."""
+
+    def __init__(self, movies=1000, sections=2, port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=1):
+        self.library = FakeLibrary(movies, sections, seed)
+        self.stats = Stats()
+        handler = make_handler(self.library, self.stats, latency_ms / 1000, jitter_ms / 1000, error_rate)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-plex", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic Plex library for benchmarks')
+    parser.add_argument('--movies', type=int, default=1000)
+    parser.add_argument('--sections', type=int, default=2, help='Number of movie libraries')
+    parser.add_argument('--port', type=int, default=32499)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Added to every request')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Random extra latency, 0..N ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = FakePlexServer(args.movies, args.sections, args.port, args.latency_ms, args.jitter_ms,
+                            args.error_rate, args.seed)
+    print(f"Fake Plex with {args.movies} movies on {server.url} (stats at {server.url}/_stats)")
+    sys.stdout.flush()
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
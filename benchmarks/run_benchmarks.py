@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import urllib.request
+from pathlib import Path
+
+from fake_plex import FakePlexServer
+
+# End-to-end throughput benchmarks: runs edition_manager.py against a local
+# fake Plex server and reports movies/sec, requests per movie, p50/p99
+# per-movie latency (first to last request touching a movie, measured by the
+# server) and peak RSS of the edition_manager process.
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVER_NAME = "bench"
+STATE_DIR = ROOT / "metadata_backup" / "servers" / SERVER_NAME
+
+# Rating and SpecialFeatures call out to TMDb / the configured Plex server,
+# so they are left out unless asked for.
+DEFAULT_MODULES = [
+    "AudioChannels", "AudioCodec", "Bitrate", "ContentRating", "Country", "Cut",
+    "Director", "Duration", "DynamicRange", "FrameRate", "Genre",
+    "Language", "Release", "Resolution", "Size", "Source", "Studio", "VideoCodec"
+]
+
+# Run in this order so restore has a backup to replay and edits to undo
+SCENARIOS = {
+    "backup": ["--backup", "--full"],
+    "process": ["--all"],
+    "restore": ["--restore"],
+    "reset": ["--reset"],
+}
+
+def _fetch(url):
+    with urllib.request.urlopen(url, timeout=30) as resp:
+        return json.load(resp)
+
+def _run(cmd, env, log):
+    """Run cmd; returns (exit code, seconds, peak RSS in MB or None)."""
+    started = time.monotonic()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    if hasattr(os, "wait4"):
+        _pid, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    else:
+        proc.wait()
+        rss = None
+    return proc.returncode, time.monotonic() - started, rss
+
+def run_size(movies, args, log):
+    server = FakePlexServer(
+        movies, args.sections, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, seed=args.seed
+    ).start()
+    env = dict(
+        os.environ,
+        PLEX_URL=server.url, PLEX_TOKEN="bench",
+        PLEX_SERVERS=SERVER_NAME, PLEX_URL_BENCH=server.url, PLEX_TOKEN_BENCH="bench",
+        MODULES_ORDER=",".join(args.modules),
+        PERFORMANCE_MAX_WORKERS=str(args.workers), PERFORMANCE_MAX_WORKERS_BENCH=str(args.workers),
+        PERFORMANCE_MODULE_CACHE="all" if args.module_cache else "false",
+        PYTHONUNBUFFERED="1",
+    )
+    base = [sys.executable, str(ROOT / "edition_manager.py"), "--server", SERVER_NAME]
+    shutil.rmtree(STATE_DIR, ignore_errors=True)
+
+    results = []
+    try:
+        for name in [s for s in SCENARIOS if s in args.scenarios]:
+            if name == "restore" and "backup" not in args.scenarios:
+                _run(base + SCENARIOS["backup"], env, log)  # restore needs a backup; not measured
+            _fetch(f"{server.url}/_reset")
+            log.write(f"\n=== {name} ({movies} movies) ===\n".encode())
+            log.flush()
+            code, seconds, rss = _run(base + SCENARIOS[name], env, log)
+            stats = _fetch(f"{server.url}/_stats")
+            results.append({
+                "scenario": name,
+                "movies": movies,
+                "exit_code": code,
+                "seconds": round(seconds, 2),
+                "movies_per_sec": round(movies / seconds, 1),
+                "requests": stats["total_requests"],
+                "requests_per_movie": round(stats["total_requests"] / movies, 3),
+                "errors": stats["errors"],
+                "p50_ms": stats["movie_latency_ms"]["p50"],
+                "p99_ms": stats["movie_latency_ms"]["p99"],
+                "peak_rss_mb": round(rss, 1) if rss is not None else None,
+            })
+    finally:
+        server.stop()
+        shutil.rmtree(STATE_DIR, ignore_errors=True)
+    return results
+
+def _fmt(value):
+    return "-" if value is None else str(value)
+
+def print_table(results):
+    columns = ["scenario", "movies", "seconds", "movies_per_sec", "requests_per_movie",
+               "p50_ms", "p99_ms", "peak_rss_mb", "errors", "exit_code"]
+    widths = [max(len(c), *(len(_fmt(r[c])) for r in results)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in results:
+        print("  ".join(_fmt(r[c]).ljust(w) for c, w in zip(columns, widths)))
+
+def compare(results, baseline_file, tolerance) -> list:
+    """Regressions against a saved --json run: slower by more than tolerance, or more requests."""
+    baseline = {(r["scenario"], r["movies"]): r for r in json.loads(Path(baseline_file).read_text())["results"]}
+    problems = []
+    for r in results:
+        old = baseline.get((r["scenario"], r["movies"]))
+        if old is None:
+            continue
+        if r["movies_per_sec"] < old["movies_per_sec"] * (1 - tolerance):
+            problems.append(f"{r['scenario']} ({r['movies']}): {r['movies_per_sec']} movies/s, "
+                            f"baseline {old['movies_per_sec']}")
+        if r["requests_per_movie"] > old["requests_per_movie"] * (1 + tolerance):
+            problems.append(f"{r['scenario']} ({r['movies']}): {r['requests_per_movie']} requests/movie, "
+                            f"baseline {old['requests_per_movie']}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Edition Manager against a fake Plex server')
+    parser.add_argument('--movies', type=int, nargs='+', default=[1000], help='Library sizes to run')
+    parser.add_argument('--scenarios', default=",".join(SCENARIOS),
+                        help=f'Comma-separated subset of {", ".join(SCENARIOS)}')
+    parser.add_argument('--sections', type=int, default=2, help='Number of movie libraries')
+    parser.add_argument('--workers', type=int, default=10, help='max_workers for edition_manager')
+    parser.add_argument('--modules', default=",".join(DEFAULT_MODULES), help='Module order to benchmark')
+    parser.add_argument('--module-cache', action='store_true', help='Leave the module result cache on')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='Server latency added to every request')
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with 500')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--log', default=str(ROOT / "benchmarks" / "benchmark.log"),
+                        help='Where edition_manager output goes')
+    parser.add_argument('--json', dest='json_file', help='Write the results to this file')
+    parser.add_argument('--compare', help='Fail if slower than this earlier --json result')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed slowdown for --compare')
+    args = parser.parse_args()
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    args.modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    with open(args.log, "wb") as log:
+        for movies in args.movies:
+            results.extend(run_size(movies, args, log))
+
+    print_table(results)
+    if args.json_file:
+        Path(args.json_file).write_text(json.dumps({
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "settings": {k: getattr(args, k) for k in ("sections", "workers", "modules", "module_cache",
+                                                       "latency_ms", "jitter_ms", "error_rate", "seed")},
+            "results": results,
+        }, indent=2))
+
+    failed = [r for r in results if r["exit_code"] != 0]
+    for r in failed:
+        print(f"{r['scenario']} ({r['movies']} movies) exited with {r['exit_code']}; see {args.log}")
+    problems = compare(results, args.compare, args.tolerance) if args.compare else []
+    for p in problems:
+        print(f"Regression: {p}")
+    sys.exit(1 if failed or problems else 0)
+
+if __name__ == '__main__':
+    main()
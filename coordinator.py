@@ -0,0 +1,323 @@
+import sys
+import hmac
+import time
+import uuid
+import socket
+import argparse
+import threading
+from collections import deque, Counter
+import requests
+from flask import Flask, request, jsonify
+from edition_manager import (
+    logger,
+    initialize_settings,
+    get_movie_by_rating_key,
+    process_single_movie,
+    JobScheduler,
+    _collect_movies,
+    _manual_edition_rules,
+    Checkpoint,
+    PRIORITY_BULK,
+    install_stop_handlers,
+    stop_requested,
+)
+
+# Coordinator/worker mode: the coordinator enumerates the movie libraries and
+# hands out leases on batches of ratingKeys over HTTP; workers on any host pull
+# a lease, run the module pipeline against Plex and report back. A lease that
+# is not completed or renewed in time goes back to the queue for another worker.
+
+DEFAULT_PORT = 5050
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3
+DONE_GRACE_SECONDS = 10  # keep answering "done" so idle workers exit cleanly
+UNREACHABLE_RETRIES = 12
+SECRET_HEADER = "X-Edition-Manager-Secret"
+
+class LeaseBook:
+    """Tracks which ratingKeys are pending, leased, done or failed."""
+
+    def __init__(self, keys, batch_size, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, checkpoint=None):
+        self.batch_size = max(1, int(batch_size))
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.checkpoint = checkpoint
+        self.total = len(keys)
+        self._pending = deque(keys)
+        self._leases = {}
+        self._attempts = Counter()
+        self._done = 0
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    def _expire_locked(self):
+        now = time.monotonic()
+        for lease_id, lease in list(self._leases.items()):
+            if lease["expires"] <= now:
+                del self._leases[lease_id]
+                # An expiry counts as an attempt, so a movie that kills every worker is given up on
+                requeue = []
+                for key in lease["items"]:
+                    self._attempts[key] += 1
+                    if self._attempts[key] < self.max_attempts:
+                        requeue.append(key)
+                    else:
+                        self._failed[key] = "lease expired"
+                self._pending.extendleft(reversed(requeue))
+                given_up = len(lease["items"]) - len(requeue)
+                logger.warning(
+                    f"Lease {lease_id} from {lease['worker']} expired; requeueing {len(requeue)} movies"
+                    + (f", giving up on {given_up}" if given_up else "")
+                )
+
+    def acquire(self, worker: str):
+        with self._lock:
+            self._expire_locked()
+            if not self._pending:
+                return None
+            items = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            lease_id = uuid.uuid4().hex
+            self._leases[lease_id] = {
+                "worker": worker,
+                "items": items,
+                "expires": time.monotonic() + self.lease_seconds,
+            }
+            return lease_id, items
+
+    def heartbeat(self, lease_id: str) -> bool:
+        with self._lock:
+            lease = self._leases.get(lease_id)
+            if not lease:
+                return False
+            lease["expires"] = time.monotonic() + self.lease_seconds
+            return True
+
+    def complete(self, lease_id: str, results: dict) -> bool:
+        """Record a worker's results; items it didn't report go back to the queue."""
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+            if not lease:
+                return False  # expired and already handed to someone else
+            for key in lease["items"]:
+                result = results.get(str(key))
+                if result is None:
+                    self._pending.append(key)
+                elif result.get("ok"):
+                    self._done += 1
+                    if self.checkpoint:
+                        self.checkpoint.mark(key)
+                else:
+                    self._attempts[key] += 1
+                    if self._attempts[key] < self.max_attempts:
+                        self._pending.append(key)
+                    else:
+                        self._failed[key] = result.get("error", "unknown error")
+            return True
+
+    def finished(self) -> bool:
+        with self._lock:
+            self._expire_locked()
+            return not self._pending and not self._leases
+
+    def status(self) -> dict:
+        with self._lock:
+            self._expire_locked()
+            return {
+                "total": self.total,
+                "done": self._done,
+                "failed": len(self._failed),
+                "pending": len(self._pending),
+                "leased": sum(len(l["items"]) for l in self._leases.values()),
+                "workers": sorted({l["worker"] for l in self._leases.values()}),
+            }
+
+def create_coordinator_app(book: LeaseBook, secret: str = "") -> Flask:
+    app = Flask(__name__)
+
+    @app.before_request
+    def _check_secret():
+        if secret and not hmac.compare_digest(request.headers.get(SECRET_HEADER, "").encode(), secret.encode()):
+            return jsonify(error="unauthorized"), 401
+
+    @app.route("/lease", methods=["POST"])
+    def lease():
+        worker = (request.get_json(silent=True) or {}).get("worker") or request.remote_addr
+        got = book.acquire(worker)
+        if got is None:
+            if book.finished():
+                return jsonify(done=True), 200
+            return "", 204  # everything is leased; ask again later
+        lease_id, items = got
+        return jsonify(lease=lease_id, items=items, lease_seconds=book.lease_seconds), 200
+
+    @app.route("/lease/<lease_id>/heartbeat", methods=["POST"])
+    def heartbeat(lease_id):
+        if not book.heartbeat(lease_id):
+            return jsonify(error="unknown or expired lease"), 410
+        return jsonify(ok=True), 200
+
+    @app.route("/lease/<lease_id>/complete", methods=["POST"])
+    def complete(lease_id):
+        results = (request.get_json(silent=True) or {}).get("results") or {}
+        if not book.complete(lease_id, results):
+            return jsonify(error="unknown or expired lease"), 410
+        return jsonify(ok=True), 200
+
+    @app.route("/status", methods=["GET"])
+    def status():
+        return jsonify(book.status()), 200
+
+    return app
+
+def enumerate_rating_keys(server, token, skip_libraries):
+    return [key for _lib_title, key, _movie in _collect_movies(server, token, skip_libraries)]
+
+def serve(host, port, lease_seconds, batch_size, secret, resume=False):
+    (
+        server, token, skip_libraries, modules, _excluded_languages,
+        _skip_multiple_audio_tracks, _tmdb_api_key, _max_workers, cfg_batch_size
+    ) = initialize_settings()
+
+    keys = enumerate_rating_keys(server, token, skip_libraries)
+    checkpoint = Checkpoint("coordinator", {"server": server, "modules": list(modules)})
+    done = checkpoint.start(resume)
+    if done:
+        keys = [k for k in keys if k not in done]
+        logger.info(f"Resuming: {len(done)} movies already processed")
+
+    book = LeaseBook(keys, batch_size or cfg_batch_size, lease_seconds, checkpoint=checkpoint)
+    app = create_coordinator_app(book, secret)
+    logger.info(f"Coordinator serving {len(keys)} movies on http://{host}:{port}")
+
+    from waitress.server import create_server
+    httpd = create_server(app, host=host, port=port)
+    threading.Thread(target=httpd.run, name="coordinator-http", daemon=True).start()
+
+    last = None
+    while not book.finished() and not stop_requested():
+        st = book.status()
+        line = f"{st['done']}/{st['total']} done, {st['failed']} failed, {st['leased']} leased to {len(st['workers'])} worker(s)"
+        if line != last:
+            logger.info(line)
+            last = line
+        time.sleep(2)
+
+    st = book.status()
+    checkpoint.close(completed=book.finished() and not st["failed"])
+    logger.info(f"Coordinator finished: {st['done']}/{st['total']} done, {st['failed']} failed")
+    if not stop_requested():
+        time.sleep(DONE_GRACE_SECONDS)
+    httpd.close()
+
+def work(url, worker_id, secret):
+    (
+        server, token, _skip_libraries, modules, excluded_languages,
+        skip_multiple_audio_tracks, tmdb_api_key, max_workers, _batch_size
+    ) = initialize_settings()
+
+    url = url.rstrip("/")
+    http = requests.Session()
+    if secret:
+        http.headers[SECRET_HEADER] = secret
+    scheduler = JobScheduler(max_workers)
+    rules = _manual_edition_rules()
+    processed = 0
+    unreachable = 0
+
+    def _process(rating_key):
+        # Fetch the details here so a failed fetch is reported, not written as "no media"
+        movie = get_movie_by_rating_key(server, token, rating_key)
+        if not movie:
+            raise LookupError(f"movie {rating_key} not found")
+        process_single_movie(
+            server, token, movie, modules,
+            excluded_languages, skip_multiple_audio_tracks, tmdb_api_key, detailed=True, rules=rules
+        )
+
+    try:
+        while not stop_requested():
+            try:
+                resp = http.post(f"{url}/lease", json={"worker": worker_id}, timeout=30)
+            except requests.exceptions.RequestException as e:
+                unreachable += 1
+                if unreachable >= UNREACHABLE_RETRIES:
+                    logger.error(f"Coordinator unreachable ({e}); giving up")
+                    break
+                logger.warning(f"Coordinator unreachable ({e}); retrying")
+                time.sleep(5)
+                continue
+            unreachable = 0
+            if resp.status_code == 204:
+                time.sleep(2)
+                continue
+            resp.raise_for_status()
+            data = resp.json()
+            if data.get("done"):
+                break
+
+            lease_id, items = data["lease"], data["items"]
+            renew_every = max(1, data.get("lease_seconds", LEASE_SECONDS) / 3)
+            finished = threading.Event()
+
+            def _heartbeat():
+                while not finished.wait(renew_every):
+                    try:
+                        http.post(f"{url}/lease/{lease_id}/heartbeat", timeout=10)
+                    except requests.exceptions.RequestException:
+                        pass
+
+            threading.Thread(target=_heartbeat, daemon=True).start()
+            futures = {key: scheduler.submit(_process, key, priority=PRIORITY_BULK) for key in items}
+            results = {}
+            for key, fut in futures.items():
+                if stop_requested():
+                    fut.cancel()
+                try:
+                    fut.result()
+                    results[str(key)] = {"ok": True}
+                except Exception as e:
+                    if not fut.cancelled():
+                        results[str(key)] = {"ok": False, "error": str(e)}
+            finished.set()
+
+            processed += sum(1 for r in results.values() if r["ok"])
+            try:
+                http.post(f"{url}/lease/{lease_id}/complete", json={"results": results}, timeout=30).raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Could not report lease {lease_id}: {e}")
+    finally:
+        scheduler.shutdown(cancel_pending=True)
+
+    logger.info(f"Worker {worker_id} finished after processing {processed} movies")
+
+def main():
+    parser = argparse.ArgumentParser(description='Distribute Edition Manager processing over HTTP')
+    sub = parser.add_subparsers(dest='mode', required=True)
+
+    p_serve = sub.add_parser('serve', help='Run the coordinator')
+    p_serve.add_argument('--host', default='0.0.0.0')
+    p_serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    p_serve.add_argument('--lease-seconds', type=int, default=LEASE_SECONDS,
+                         help='Seconds before an unrenewed lease is handed to another worker')
+    p_serve.add_argument('--batch-size', type=int, default=0, help='Movies per lease (default: [performance] batch_size)')
+    p_serve.add_argument('--secret', default='', help=f'Require this value in the {SECRET_HEADER} header')
+    p_serve.add_argument('--resume', action='store_true', help='Skip movies finished by an interrupted coordinator run')
+
+    p_work = sub.add_parser('work', help='Run a worker against a coordinator')
+    p_work.add_argument('url', help='Coordinator URL, e.g. http://coordinator:5050')
+    p_work.add_argument('--worker-id', default=f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}")
+    p_work.add_argument('--secret', default='')
+
+    args = parser.parse_args()
+    install_stop_handlers()
+
+    if args.mode == 'serve':
+        serve(args.host, args.port, args.lease_seconds, args.batch_size, args.secret, args.resume)
+    else:
+        work(args.url, args.worker_id, args.secret)
+
+    if stop_requested():
+        sys.exit(130)
+
+if __name__ == '__main__':
+    main()
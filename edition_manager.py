@@ -1,17 +1,29 @@
 import os
 import io
+import gzip
 import re
 import sys
 import time
 import json
+import sqlite3
 import logging
 import requests
 import argparse
 import threading
+import subprocess
+import zlib
+import hashlib
+import math
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict, Counter, deque, defaultdict
+from contextlib import contextmanager, closing
 from datetime import datetime, UTC
 from typing import List, Tuple
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from pathlib import Path
+from urllib.parse import urlsplit
 from configparser import ConfigParser
 from threading import Lock
 _progress_lock = Lock()
@@ -20,6 +32,15 @@ _progress_done = 0
 
 BACKUP_DIR = Path(__file__).parent / 'metadata_backup'
 BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+CONFIG_FILE = Path(__file__).parent / 'config' / 'config.ini'
+
+# Name of the [server.NAME] section this process works on (None = [server]).
+# Each named server keeps its backups and checkpoints in its own directory.
+DEFAULT_SERVER = "default"
+_server_name = None
+
+def _state_dir() -> Path:
+    return BACKUP_DIR / 'servers' / _server_name if _server_name else BACKUP_DIR
 
 def _ensure_utf8_stream(stream):
     try:
@@ -51,36 +72,212 @@ if os.name == "nt" and sys.stdout.isatty():
     except Exception:
         pass
 
+# "percent" prints PROGRESS <pct> for the GUI; "counts" prints
+# PROGRESS_COUNT <done> <total> <failed> so a --jobs parent can merge its
+# workers; "events" (--events jsonl) prints one JSON object per line:
+#   {"event": "start", "total": N}
+#   {"event": "progress", "done", "total", "failed", "percent", "rate", "eta", "elapsed"}
+#   {"event": "item", "ratingKey", "status": ok|failed|deferred|cancelled|not_found, ...}
+#   {"event": "summary", "total", "done", "failed", ..., "elapsed", "rate"}
+# Progress events are sent at most every EVENTS_INTERVAL seconds (and when the
+# run completes); item events are only flushed with them.
+_progress_format = "percent"
+EVENTS_INTERVAL = 1.0
+_progress_failed = 0
+_progress_started = 0.0
+_progress_sent = None  # last percent printed, or time of the last progress event
+
+def _write_event(event: str, flush: bool = False, **fields):
+    # One write per line so events from worker threads never interleave
+    sys.stdout.write(json.dumps({"event": event, **fields}, ensure_ascii=False) + "\n")
+    if flush:
+        sys.stdout.flush()
+
+def _progress_emit_locked(force: bool = False):
+    global _progress_sent
+    done, total = _progress_done, _progress_total
+    if _progress_format == "counts":
+        print(f"PROGRESS_COUNT {done} {total} {_progress_failed}")
+    elif _progress_format == "events":
+        now = time.monotonic()
+        if not force and done < total and _progress_sent is not None and now - _progress_sent < EVENTS_INTERVAL:
+            return
+        _progress_sent = now
+        elapsed = now - _progress_started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        if done >= total:
+            eta = 0.0
+        else:
+            eta = round((total - done) / rate, 1) if rate else None
+        _write_event(
+            "progress", done=done, total=total, failed=_progress_failed,
+            percent=round(min(100.0, done * 100 / total), 1), rate=round(rate, 2), eta=eta,
+            elapsed=round(elapsed, 1),
+        )
+    else:
+        pct = min(100, max(0, int(done * 100 / total)))
+        if pct == _progress_sent:
+            return
+        _progress_sent = pct
+        print(f"PROGRESS {pct}")
+    sys.stdout.flush()
+
 def _progress_set_total(n: int):
-    global _progress_total, _progress_done
+    global _progress_total, _progress_done, _progress_failed, _progress_started, _progress_sent
     with _progress_lock:
         _progress_total = max(1, int(n))
-        _progress_done = 0
-        print("PROGRESS 0"); sys.stdout.flush()
+        _progress_done = _progress_failed = 0
+        _progress_started = time.monotonic()
+        _progress_sent = None
+        if _progress_format == "counts":
+            print(f"PROGRESS_COUNT 0 {int(n)} 0")
+        elif _progress_format == "events":
+            _write_event("start", total=int(n))
+            _progress_sent = _progress_started
+        else:
+            print("PROGRESS 0")
+            _progress_sent = 0
+        sys.stdout.flush()
 
-def _progress_step(k: int = 1):
-    global _progress_done, _progress_total
+def _progress_step(k: int = 1, failed: bool = False):
+    global _progress_done, _progress_failed
     with _progress_lock:
         _progress_done += k
-        pct = int((_progress_done * 100) / _progress_total)
-    print(f"PROGRESS {min(100, max(0, pct))}")
-    sys.stdout.flush()
+        if failed:
+            _progress_failed += k
+        _progress_emit_locked()
 
-# Create a logger
+def _progress_update(done: int, total: int, failed: int = 0):
+    """Set absolute progress, e.g. merged from child processes."""
+    global _progress_done, _progress_total, _progress_failed
+    with _progress_lock:
+        _progress_done, _progress_total, _progress_failed = done, max(1, total), failed
+        _progress_emit_locked()
+
+def _progress_item(rating_key, status: str, **fields):
+    """Per-movie outcome; only sent with --events jsonl."""
+    if _progress_format == "events":
+        _write_event("item", ratingKey=rating_key, status=status,
+                     **{k: v for k, v in fields.items() if v is not None})
+
+def _item_title(item):
+    # Job payloads are movie dicts, plan/backup rows or (key, movie) pairs
+    if isinstance(item, tuple):
+        item = item[-1]
+    return item.get('title') if isinstance(item, dict) else None
+
+# Create a logger. Records go through a queue: worker threads only enqueue
+# them and a listener thread formats and writes them to stdout.
+# --quiet/--verbose set the level; --log-format json writes one JSON object per
+# line carrying the ratingKey, title, module and timing fields of the record.
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 handler = logging.StreamHandler(sys.stdout)
 formatter = logging.Formatter('[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
 handler.setFormatter(formatter)
-logger.addHandler(handler)
+
+# Per-thread fields added to every record logged while processing a movie
+_log_context = threading.local()
+# Record attribute -> JSON key ("module" is taken by LogRecord itself)
+LOG_FIELDS = {"ratingKey": "ratingKey", "title": "title", "stage": "stage", "edition_module": "module",
+              "path": "path", "seconds": "seconds"}
+
+@contextmanager
+def _log_fields(**fields):
+    saved = dict(_log_context.__dict__)
+    _log_context.__dict__.update(fields)
+    try:
+        yield
+    finally:
+        _log_context.__dict__.clear()
+        _log_context.__dict__.update(saved)
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update((key, getattr(record, attr)) for attr, key in LOG_FIELDS.items()
+                     if getattr(record, attr, None) is not None)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+# Per-movie lines ("Title: edition") logged by bulk jobs are sampled: at most
+# MOVIE_LINES_PER_SECOND are shown ("sample"), or all / none (--movie-lines).
+MOVIE_LINES_PER_SECOND = 10
+_movie_lines = "sample"
+_movie_lines_window = [0.0, 0]  # start of the current second, lines shown in it
+_movie_lines_skipped = 0
+_movie_lines_lock = Lock()
+
+class _ContextFilter(logging.Filter):
+    """Adds the movie's context fields and samples bulk per-movie lines.
+
+    Filters on the QueueHandler run in the thread that logs, before the record is
+    queued, which is what lets this read that thread's _log_context.
+    """
+
+    def filter(self, record):
+        global _movie_lines_skipped
+        ctx = _log_context.__dict__
+        for k in LOG_FIELDS:
+            if k in ctx and not hasattr(record, k):
+                setattr(record, k, ctx[k])
+        if not (getattr(record, "movie", False) and ctx.get("bulk")) or _movie_lines == "all":
+            return True
+        if _movie_lines == "sample":
+            with _movie_lines_lock:
+                now = time.monotonic()
+                if now - _movie_lines_window[0] >= 1.0:
+                    _movie_lines_window[:] = [now, 0]
+                if _movie_lines_window[1] < MOVIE_LINES_PER_SECOND:
+                    _movie_lines_window[1] += 1
+                    return True
+        _movie_lines_skipped += 1
+        return False
+
+_log_queue = queue.SimpleQueue()
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.addFilter(_ContextFilter())
+logger.addHandler(_queue_handler)
+_log_listener = QueueListener(_log_queue, handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+def configure_logging(level=logging.INFO, log_format="text", movie_lines="sample"):
+    global _movie_lines
+    logger.setLevel(level)
+    handler.setFormatter(_JsonFormatter() if log_format == "json" else formatter)
+    _movie_lines = movie_lines
 
 # Thread-local storage for requests session
 thread_local = threading.local()
 
+class _TimedSession(requests.Session):
+    """Session whose requests show up as "HTTP <method>" stages in --profile, --trace and metrics."""
+
+    def request(self, method, url, *args, **kwargs):
+        method = method.upper()
+        path = urlsplit(url).path
+        try:
+            with _timed(f"HTTP {method}", path=path):
+                resp = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            if _metrics:
+                _metrics.inc("edition_manager_plex_responses_total", method=method, endpoint=_endpoint(path),
+                             code="error")
+            raise
+        if _metrics:
+            _metrics.inc("edition_manager_plex_responses_total", method=method, endpoint=_endpoint(path),
+                         code=str(resp.status_code))
+        return resp
+
 def get_session():
     """Get thread-local session for connection pooling"""
     if not hasattr(thread_local, "session"):
-        thread_local.session = requests.Session()
+        thread_local.session = _TimedSession()
     return thread_local.session
 
 HTTP_TIMEOUT = 30
@@ -104,7 +301,558 @@ def make_request(url, headers, timeout=HTTP_TIMEOUT):
             else:
                 raise
 
+# Job priority classes (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_WEBHOOK = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_WEBHOOK: "webhook", PRIORITY_BULK: "bulk"}
+
+# Cross-process priority holds: a running --one-id / webhook job drops a file
+# here so bulk runs in other processes pause dispatching until it is gone.
+PRIORITY_HOLD_DIR = BACKUP_DIR / '.priority'
+PRIORITY_HOLD_TTL = 120  # seconds before an abandoned hold is ignored
+_hold_cache = {"checked": 0.0, "active": False}
+
+@contextmanager
+def priority_hold():
+    """Ask bulk runs in other processes to yield to this job while it runs."""
+    PRIORITY_HOLD_DIR.mkdir(parents=True, exist_ok=True)
+    hold = PRIORITY_HOLD_DIR / f"{os.getpid()}-{threading.get_ident()}.hold"
+    try:
+        hold.touch()
+    except OSError as e:
+        logger.warning(f"Could not create priority hold '{hold}': {e}")
+    try:
+        yield
+    finally:
+        try:
+            hold.unlink()
+        except OSError:
+            pass
+
+def priority_hold_active() -> bool:
+    """True while another process holds priority (checked at most every 250ms)."""
+    now = time.time()
+    if now - _hold_cache["checked"] < 0.25:
+        return _hold_cache["active"]
+    active = False
+    try:
+        for entry in os.scandir(PRIORITY_HOLD_DIR):
+            if not entry.name.endswith('.hold'):
+                continue
+            try:
+                if now - entry.stat().st_mtime < PRIORITY_HOLD_TTL:
+                    active = True
+                    break
+                os.unlink(entry.path)  # stale hold from a crashed process
+            except OSError:
+                pass
+    except FileNotFoundError:
+        pass
+    _hold_cache["checked"] = now
+    _hold_cache["active"] = active
+    return active
+
+class JobScheduler:
+    """Shared worker pool that always serves the most urgent job class first.
+
+    Jobs are queued per priority class (interactive > webhook > bulk). Within a
+    class, libraries take turns so one large library cannot starve the others.
+    Bulk jobs also pause while another process holds priority (see priority_hold).
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max(1, int(max_workers))
+        self._queues = {p: OrderedDict() for p in (PRIORITY_INTERACTIVE, PRIORITY_WEBHOOK, PRIORITY_BULK)}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._shutdown = False
+        self._running = 0
+
+    def submit(self, fn, *args, priority: int = PRIORITY_BULK, library: str = "", **kwargs) -> Future:
+        fut = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("scheduler has been shut down")
+            lib_queues = self._queues[priority]
+            if library not in lib_queues:
+                lib_queues[library] = deque()
+            lib_queues[library].append((fut, fn, args, kwargs, priority, time.monotonic()))
+            if len(self._threads) < self.max_workers:
+                t = threading.Thread(target=self._worker, name=f"edition-worker-{len(self._threads) + 1}", daemon=True)
+                self._threads.append(t)
+                t.start()
+            self._cond.notify()
+        if _metrics:
+            _metrics.inc("edition_manager_jobs_submitted_total", priority=PRIORITY_NAMES[priority])
+        return fut
+
+    def pending(self) -> dict:
+        with self._cond:
+            return {p: sum(len(q) for q in libs.values()) for p, libs in self._queues.items()}
+
+    def running(self) -> int:
+        with self._cond:
+            return self._running
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        with self._cond:
+            self._shutdown = True
+            if cancel_pending:
+                for libs in self._queues.values():
+                    for q in libs.values():
+                        for fut, *_ in q:
+                            fut.cancel()
+                    libs.clear()
+            self._cond.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _next_job(self):
+        # Caller holds self._cond
+        for priority, libs in self._queues.items():
+            if not libs:
+                continue
+            if priority == PRIORITY_BULK and priority_hold_active():
+                return None
+            library, q = next(iter(libs.items()))
+            job = q.popleft()
+            if q:
+                libs.move_to_end(library)  # round-robin between libraries
+            else:
+                del libs[library]
+            return job
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown and not any(self._queues.values()):
+                        return
+                    # Time out so held-back bulk jobs notice when the hold is released
+                    self._cond.wait(timeout=0.5)
+                    job = self._next_job()
+            fut, fn, args, kwargs, priority, queued_at = job
+            if not fut.set_running_or_notify_cancel():
+                if _metrics:
+                    _metrics.inc("edition_manager_jobs_finished_total", priority=PRIORITY_NAMES[priority],
+                                 status="cancelled")
+                continue
+            with self._cond:
+                self._running += 1
+            started = time.monotonic()
+            status = "done"
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                status = "failed"
+                fut.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running -= 1
+                if _metrics:
+                    name = PRIORITY_NAMES[priority]
+                    _metrics.observe("edition_manager_job_wait_seconds", started - queued_at, priority=name)
+                    _metrics.observe("edition_manager_job_duration_seconds", time.monotonic() - started,
+                                     priority=name)
+                    _metrics.inc("edition_manager_jobs_finished_total", priority=name, status=status)
+
+# Cooperative stop: set by SIGTERM/SIGINT (or the GUI's Cancel button) so bulk
+# runs stop handing out work, let in-flight movies finish and flush the checkpoint.
+# Windows has no SIGTERM for a console-less child, so the GUI instead creates
+# the file named by EDITION_MANAGER_STOP_FILE; --jobs children inherit it.
+_stop_event = threading.Event()
+STOP_FILE_ENV = "EDITION_MANAGER_STOP_FILE"
+STOP_FILE_POLL = 0.5  # seconds
+
+def stop_requested() -> bool:
+    return _stop_event.is_set()
+
+def request_stop():
+    if not _stop_event.is_set():
+        logger.info("Stop requested - finishing in-flight work and saving checkpoint...")
+    _stop_event.set()
+
+def _on_stop_signal(signum, frame):
+    if _stop_event.is_set():
+        # Second signal: stop waiting for in-flight work
+        raise SystemExit(130)
+    request_stop()
+
+def _watch_stop_file(path: Path):
+    while not _stop_event.is_set():
+        if path.exists():
+            request_stop()
+            return
+        time.sleep(STOP_FILE_POLL)
+
+def install_stop_handlers():
+    import signal
+    for name in ("SIGTERM", "SIGINT", "SIGBREAK"):
+        sig = getattr(signal, name, None)
+        if sig is None:
+            continue
+        try:
+            signal.signal(sig, _on_stop_signal)
+        except (ValueError, OSError):
+            pass  # not in the main thread / unsupported on this platform
+    stop_file = os.getenv(STOP_FILE_ENV)
+    if stop_file:
+        threading.Thread(target=_watch_stop_file, args=(Path(stop_file),), name="stop-file", daemon=True).start()
+
+CHECKPOINT_INTERVAL = 5  # seconds between checkpoint flushes
+
+class Checkpoint:
+    """Append-only journal of the ratingKeys a bulk operation has finished.
+
+    The first line records what the run was doing (operation, server, modules,
+    backup file...); a later run with --resume only reuses the journal when
+    that signature matches, and then also takes over the run's saved `state`
+    (e.g. the cut-offs its scope resolved to). Keys are flushed to disk every
+    CHECKPOINT_INTERVAL seconds, so a hard kill loses at most a few seconds of
+    work.
+    """
+
+    def __init__(self, operation: str, signature: dict, shard: Tuple[int, int] | None = None):
+        self.path = _state_dir() / 'checkpoints' / f"{operation}{_shard_suffix(shard)}.jsonl"
+        self.signature = {"operation": operation, "shard": list(shard) if shard else None, **signature}
+        self._pending = []
+        self._lock = Lock()
+        self._last_flush = time.monotonic()
+        self._fh = None
+        self.state = None
+
+    def _load(self) -> set:
+        try:
+            with self.path.open('r', encoding='utf-8') as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("signature") != self.signature:
+                    logger.warning(f"Checkpoint {self.path.name} is for a different run; starting from scratch.")
+                    return set()
+                self.state = header.get("state", self.state)
+                return {json.loads(ln) for ln in f if ln.strip()}
+        except FileNotFoundError:
+            logger.info("No checkpoint found; starting from scratch.")
+            return set()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read checkpoint {self.path}: {e}")
+            return set()
+
+    def start(self, resume: bool = False, state=None) -> set:
+        """Open the journal and return the keys an earlier run already finished."""
+        self.state = state
+        done = self._load() if resume else set()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Rewrite compacted: header plus the keys we are carrying over
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open('w', encoding='utf-8') as f:
+            f.write(json.dumps({"signature": self.signature, "state": self.state,
+                                "created_at": datetime.now(UTC).isoformat(timespec="seconds")}) + "\n")
+            for key in done:
+                f.write(json.dumps(key) + "\n")
+        tmp.replace(self.path)
+        self._fh = self.path.open('a', encoding='utf-8')
+        return done
+
+    def mark(self, key):
+        with self._lock:
+            self._pending.append(key)
+            if time.monotonic() - self._last_flush >= CHECKPOINT_INTERVAL:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._fh or not self._pending:
+            return
+        self._fh.write("".join(json.dumps(k) + "\n" for k in self._pending))
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._pending.clear()
+
+    def close(self, completed: bool):
+        """Flush and close; a completed run has nothing to resume, so drop the journal."""
+        with self._lock:
+            self._flush_locked()
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+        if completed:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+def _run_jobs(items, fn, max_workers, batch_size=0, batch_label="Processed batch",
+              scheduler=None, checkpoint=None):
+    """Run fn(item) for every (library, key, item) through the bulk scheduler.
+
+    Steps progress, logs every batch_size completions and records finished keys
+    in the checkpoint. Once a stop is requested, queued items are cancelled while
+    in-flight ones drain. Returns a summary dict.
+    """
+    from concurrent.futures import wait, FIRST_COMPLETED
+
+    global _movie_lines_skipped
+    summary = {"total": len(items), "done": 0, "failed": 0, "deferred": 0, "cancelled": 0, "interrupted": False}
+    own_scheduler = scheduler is None
+    if own_scheduler:
+        scheduler = JobScheduler(max_workers)
+
+    def _bulk(item):
+        with _log_fields(bulk=True):
+            return fn(item)
+
+    _movie_lines_skipped = 0
+    module_guard().reset()
+    try:
+        futures = {
+            scheduler.submit(_bulk, item, priority=PRIORITY_BULK, library=library): (key, item)
+            for library, key, item in items
+        }
+        total_batches = (len(futures) + batch_size - 1) // batch_size if batch_size else 0
+        pending = set(futures)
+        n = 0
+        while pending:
+            if _stop_event.is_set() and not summary["interrupted"]:
+                summary["interrupted"] = True
+                for fut in pending:
+                    fut.cancel()  # only affects jobs that have not started
+            finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                key, item = futures[fut]
+                if fut.cancelled():
+                    summary["cancelled"] += 1
+                    _progress_item(key, "cancelled")
+                    continue
+                exc = fut.exception()
+                if isinstance(exc, MovieDeferred):
+                    summary["deferred"] += 1
+                    logger.info(f"Deferred {_item_title(item) or key}: {exc}")
+                    _progress_item(key, "deferred", title=_item_title(item), error=str(exc))
+                elif exc is not None:
+                    summary["failed"] += 1
+                    logger.error(f"Error processing {key}: {exc}")
+                    _progress_item(key, "failed", title=_item_title(item), error=str(exc))
+                else:
+                    summary["done"] += 1
+                    if checkpoint:
+                        checkpoint.mark(key)
+                    result = fut.result()
+                    _progress_item(key, "ok", title=_item_title(item),
+                                   edition=result if isinstance(result, str) else None)
+                n += 1
+                _progress_step(failed=exc is not None)
+                if batch_size and (n % batch_size == 0 or n == len(futures)):
+                    logger.info(f"{batch_label} {(n + batch_size - 1) // batch_size}/{total_batches}")
+    finally:
+        if checkpoint:
+            # Keep the journal when anything is left to do, so --resume picks it up
+            checkpoint.close(completed=not (summary["interrupted"] or summary["failed"] or summary["deferred"]
+                                            or _stop_event.is_set()))
+        if own_scheduler:
+            scheduler.shutdown(cancel_pending=True)
+
+    if _movie_lines_skipped:
+        logger.info(f"{_movie_lines_skipped} per-movie lines were not shown (--movie-lines all shows every movie)")
+    if summary["deferred"]:
+        logger.info(f"{summary['deferred']} movies were deferred by a slow or failing module; "
+                    "run again with --resume to retry them")
+    if summary["interrupted"]:
+        logger.info(
+            f"Interrupted: {summary['done']} done, {summary['cancelled']} not started. "
+            "Run again with --resume to continue."
+        )
+    return summary
+
+# Sharding: --shard i/N keeps only the movies whose ratingKey hashes into
+# bucket i, so several processes or hosts can split a library without overlap.
+def parse_shard(spec: str | None) -> Tuple[int, int] | None:
+    if not spec:
+        return None
+    try:
+        i, n = (int(x) for x in spec.split('/', 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{spec}', expected i/N (e.g. 2/4)")
+    if n < 1 or not 1 <= i <= n:
+        raise argparse.ArgumentTypeError(f"invalid shard '{spec}': need 1 <= i <= N")
+    return (i, n)
+
+def in_shard(rating_key, shard: Tuple[int, int] | None) -> bool:
+    if not shard:
+        return True
+    # crc32 rather than hash(): it must agree across processes and hosts
+    return zlib.crc32(str(rating_key).encode()) % shard[1] == shard[0] - 1
+
+def _shard_suffix(shard: Tuple[int, int] | None) -> str:
+    return f".shard-{shard[0]}-of-{shard[1]}" if shard else ""
+
+def _merge_summaries(summaries) -> dict:
+    merged = {"total": 0, "done": 0, "failed": 0, "deferred": 0, "cancelled": 0, "interrupted": False}
+    for s in summaries:
+        for k in ("total", "done", "failed", "deferred", "cancelled"):
+            merged[k] += s.get(k, 0)
+        merged["interrupted"] = merged["interrupted"] or s.get("interrupted", False)
+    return merged
+
+def _run_worker_processes(cmds: List[List[str]], tags: List[str]) -> Tuple[List[dict], List[int]]:
+    """Run child edition_manager processes in parallel and relay their output.
+
+    Each command must include "--progress-format counts". Output lines are
+    prefixed with the child's tag, progress counts are merged into a single
+    progress stream and each child's SUMMARY line is collected. A stop request
+    is forwarded so every child drains and checkpoints.
+    Returns (summaries, returncodes) in the order of cmds.
+    """
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    procs = [
+        subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding="utf-8", errors="replace", env=env
+        )
+        for cmd in cmds
+    ]
+
+    counts = [(0, 0, 0)] * len(procs)
+    summaries = [{} for _ in procs]
+    out_lock = Lock()
+    _progress_set_total(0)  # the children report their totals as they go
+
+    def _relay(idx, proc):
+        tag = f"[{tags[idx]}]"
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if line.startswith("PROGRESS_COUNT "):
+                try:
+                    done, total, failed = ([int(x) for x in line.split()[1:4]] + [0])[:3]
+                except ValueError:
+                    continue
+                with out_lock:
+                    counts[idx] = (done, total, failed)
+                    _progress_update(*(sum(c[i] for c in counts) for i in range(3)))
+            elif line.startswith("SUMMARY "):
+                try:
+                    summaries[idx] = json.loads(line[len("SUMMARY "):])
+                except ValueError:
+                    pass
+            elif line.startswith("PROGRESS ") or not line.strip():
+                continue
+            else:
+                if line.startswith("{"):
+                    try:
+                        line = json.dumps({**json.loads(line), "worker": tags[idx]}, ensure_ascii=False)
+                    except ValueError:
+                        line = f"{tag} {line}"
+                else:
+                    line = f"{tag} {line}"
+                with out_lock:
+                    print(line)
+                    sys.stdout.flush()
+
+    readers = [threading.Thread(target=_relay, args=(i, p), daemon=True) for i, p in enumerate(procs)]
+    for t in readers:
+        t.start()
+
+    forwarded = False
+    while any(p.poll() is None for p in procs):
+        if _stop_event.is_set() and not forwarded:
+            forwarded = True
+            # Children watching the same stop file stop by themselves; terminate() is a hard kill on Windows
+            for p in procs:
+                if p.poll() is None and not os.getenv(STOP_FILE_ENV):
+                    p.terminate()
+        time.sleep(0.2)
+    for t in readers:
+        t.join()
+
+    return summaries, [p.returncode for p in procs]
+
+def _child_command(args: List[str], server_name: str | None = None) -> List[str]:
+    cmd = [sys.executable, str(Path(__file__).resolve()), *args]
+    server_name = server_name or _server_name
+    if server_name:
+        cmd += ["--server", server_name]
+    return cmd + ["--progress-format", "counts"]
+
+def run_sharded_jobs(action_args: List[str], jobs: int, shard: Tuple[int, int] | None = None) -> dict:
+    """Fork `jobs` worker processes that each run action_args on one sub-shard.
+
+    A "{shard}" placeholder in action_args is replaced with the worker's shard
+    tag (e.g. "shard-2-of-4"). Worker output is relayed with a [k/N] prefix and
+    their summaries are combined.
+    """
+    outer_i, outer_n = shard or (1, 1)
+    total_n = outer_n * jobs
+
+    cmds = []
+    for k in range(1, jobs + 1):
+        # Bucket (outer_i - 1) + outer_n * (k - 1) of outer_n * jobs lies inside
+        # the outer shard, so the workers partition exactly that shard.
+        sub = (outer_i - 1) + outer_n * (k - 1) + 1
+        args = [a.replace("{shard}", f"shard-{sub}-of-{total_n}") for a in action_args]
+        cmds.append(_child_command([*args, "--shard", f"{sub}/{total_n}"]))
+    logger.info(f"Started {jobs} worker processes")
+
+    summaries, returncodes = _run_worker_processes(cmds, [f"{k}/{jobs}" for k in range(1, jobs + 1)])
+
+    merged = _merge_summaries(summaries)
+    failed_procs = [i + 1 for i, rc in enumerate(returncodes) if rc not in (0, 130)]
+    if failed_procs:
+        logger.error(f"Worker process(es) {failed_procs} exited with an error")
+    merged["worker_errors"] = len(failed_procs)
+    logger.info(
+        f"All workers finished: {merged['done']}/{merged['total']} done, "
+        f"{merged['failed']} failed, {merged['cancelled']} not started"
+    )
+    return merged
+
+def configured_servers() -> List[str]:
+    """Names of every configured Plex server; [server] is DEFAULT_SERVER.
+
+    Extra servers are [server.NAME] sections in config.ini, or in env mode the
+    names listed in PLEX_SERVERS with PLEX_URL_<NAME> / PLEX_TOKEN_<NAME>.
+    """
+    if os.getenv('PLEX_URL') is not None:
+        extra = [n.strip() for n in re.split(r'[；;,]', os.getenv('PLEX_SERVERS', '')) if n.strip()]
+    else:
+        config = ConfigParser()
+        config.read(CONFIG_FILE)
+        extra = [sec.split('.', 1)[1] for sec in config.sections() if sec.startswith('server.')]
+    return [DEFAULT_SERVER] + [n for n in extra if n != DEFAULT_SERVER]
+
+def run_all_servers(action_args: List[str], servers: List[str]) -> dict:
+    """Run action_args against every server at once, one process per server.
+
+    Every server gets its own process, so connection pools, max_workers and
+    checkpoints stay independent and the run takes as long as the slowest one.
+    """
+    cmds = [_child_command(action_args, name) for name in servers]
+    logger.info(f"Running on {len(servers)} servers: {', '.join(servers)}")
+    summaries, returncodes = _run_worker_processes(cmds, servers)
+
+    for name, summ, rc in zip(servers, summaries, returncodes):
+        if rc not in (0, 130):
+            logger.error(f"Server {name}: exited with an error (code {rc})")
+        elif summ:
+            logger.info(f"Server {name}: {summ.get('done', 0)}/{summ.get('total', 0)} done, {summ.get('failed', 0)} failed")
+    merged = _merge_summaries(summaries)
+    merged["servers"] = dict(zip(servers, summaries))
+    merged["server_errors"] = sum(1 for rc in returncodes if rc not in (0, 130))
+    logger.info(
+        f"All servers finished: {merged['done']}/{merged['total']} done, "
+        f"{merged['failed']} failed, {merged['cancelled']} not started"
+    )
+    return merged
+
 def find_movies_by_title(server, token, title):
+    if _cache:
+        return _cache.search(title)
     headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
     libs = make_request(f'{server}/library/sections', headers)['MediaContainer']['Directory']
 
@@ -128,13 +876,925 @@ def find_movies_by_title(server, token, title):
 
 def get_movie_by_rating_key(server, token, rating_key):
     """Fetch full movie metadata from a ratingKey."""
+    if _cache:
+        return _cache.movie(rating_key)
     headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
     data = make_request(f'{server}/library/metadata/{rating_key}', headers)
     md = (data.get('MediaContainer', {}).get('Metadata') or [])
     return md[0] if md else None
 
+def _named_server_settings(name, max_workers):
+    """Address, token, skipped libraries and worker limit of a [server.NAME] entry."""
+    if os.getenv('PLEX_URL') is not None:
+        key = re.sub(r'\W', '_', name).upper()
+        server = os.getenv(f'PLEX_URL_{key}')
+        if not server:
+            raise SystemExit(f"Unknown server '{name}': set PLEX_URL_{key} and PLEX_TOKEN_{key}")
+        token = os.getenv(f'PLEX_TOKEN_{key}', '')
+        skip_libraries_str = os.getenv(f'PLEX_SKIP_LIBRARIES_{key}', '')
+        skip_libraries = set(re.split(r'[；;,]', skip_libraries_str)) if skip_libraries_str else set()
+        max_workers = int(os.getenv(f'PERFORMANCE_MAX_WORKERS_{key}', max_workers))
+    else:
+        config = ConfigParser()
+        config.read(CONFIG_FILE)
+        section = f'server.{name}'
+        if not config.has_section(section):
+            raise SystemExit(f"Unknown server '{name}': no [{section}] section in {CONFIG_FILE}")
+        server = config.get(section, 'address')
+        token = config.get(section, 'token')
+        skip_libraries = set(re.split(r'[；;]', config.get(section, 'skip_libraries'))) if config.has_option(section, 'skip_libraries') else set()
+        max_workers = config.getint(section, 'max_workers', fallback=max_workers)
+    return server, token, skip_libraries, max_workers
+
+# Local library snapshot: section listings and full movie metadata (media,
+# streams, extras) kept in SQLite and refreshed only for movies whose updatedAt
+# changed. With --offline, listings, module evaluation, dry runs and searches
+# read from it; only edition writes go to Plex.
+CACHE_DETAIL_WORKERS = 8
+
+class LibraryCache:
+    """SQLite copy of the movie libraries of one server."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path) if path else _state_dir() / 'library_cache.sqlite'
+        self._local = threading.local()  # sqlite connections can't be shared across threads
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path)
+            db.executescript(
+                "CREATE TABLE IF NOT EXISTS sections (key TEXT PRIMARY KEY, title TEXT);"
+                "CREATE TABLE IF NOT EXISTS movies ("
+                " rating_key TEXT PRIMARY KEY, section_key TEXT, title TEXT, updated_at INTEGER,"
+                " listing TEXT, detail TEXT, synced_at TEXT);"
+                "CREATE INDEX IF NOT EXISTS movies_section ON movies (section_key);"
+            )
+            self._local.db = db
+        return db
+
+    def is_empty(self) -> bool:
+        return self._db().execute("SELECT 1 FROM movies LIMIT 1").fetchone() is None
+
+    def sync(self, server, token, max_workers=CACHE_DETAIL_WORKERS) -> dict:
+        """Refresh listings and re-fetch full metadata only for new or changed movies."""
+        headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
+        libraries = make_request(f'{server}/library/sections', headers)['MediaContainer']['Directory']
+        sections = [lib for lib in libraries if lib.get('type') == 'movie']
+        db = self._db()
+        known = dict(db.execute("SELECT rating_key, updated_at FROM movies"))
+        seen, stale = set(), []
+        # Sections by key: two libraries may share a title
+        for sec, movie in _iter_section_movies(server, headers, sections):
+            rating_key = str(movie['ratingKey'])
+            seen.add(rating_key)
+            updated_at = int(movie.get('updatedAt') or 0)
+            if rating_key not in known:
+                db.execute(
+                    "INSERT INTO movies (rating_key, section_key, title, updated_at, listing) VALUES (?, ?, ?, ?, ?)",
+                    (rating_key, sec['key'], movie.get('title', ''), None, json.dumps(movie))
+                )
+                stale.append((rating_key, updated_at))
+            else:
+                db.execute(
+                    "UPDATE movies SET section_key = ?, title = ?, listing = ? WHERE rating_key = ?",
+                    (sec['key'], movie.get('title', ''), json.dumps(movie), rating_key)
+                )
+                if known[rating_key] != updated_at:
+                    stale.append((rating_key, updated_at))
+
+        removed = [k for k in known if k not in seen]
+        db.executemany("DELETE FROM movies WHERE rating_key = ?", [(k,) for k in removed])
+        db.execute("DELETE FROM sections")
+        db.executemany("INSERT INTO sections VALUES (?, ?)", [(sec['key'], sec.get('title', '')) for sec in sections])
+        db.commit()
+        logger.info(f"Cache: {len(seen)} movies listed, {len(stale)} new or changed, {len(removed)} removed")
+
+        def _detail(rating_key):
+            data = make_request(f'{server}/library/metadata/{rating_key}?includeExtras=1', headers)
+            md = data.get('MediaContainer', {}).get('Metadata') or []
+            return md[0] if md else None
+
+        _progress_set_total(len(stale))
+        refreshed = failed = 0
+        now = datetime.now(UTC).isoformat(timespec="seconds")
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            futures = {ex.submit(_detail, k): (k, updated_at) for k, updated_at in stale}
+            for fut in as_completed(futures):
+                rating_key, updated_at = futures[fut]
+                _progress_step()
+                try:
+                    detail = fut.result()
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Cache: could not fetch {rating_key}: {e}")
+                    continue
+                if detail is None:
+                    continue
+                # updated_at is only stored with the detail, so failures are retried next sync
+                db.execute(
+                    "UPDATE movies SET detail = ?, updated_at = ?, synced_at = ? WHERE rating_key = ?",
+                    (json.dumps(detail), updated_at, now, rating_key)
+                )
+                refreshed += 1
+                if refreshed % 500 == 0:
+                    db.commit()
+        db.commit()
+        return {"total": len(stale), "done": refreshed, "failed": failed, "movies": len(seen), "removed": len(removed)}
+
+    def sections(self) -> list:
+        return [{"key": k, "title": t, "type": "movie"} for k, t in self._db().execute("SELECT key, title FROM sections")]
+
+    def section_movies(self, section_key) -> list:
+        rows = self._db().execute("SELECT listing FROM movies WHERE section_key = ?", (str(section_key),))
+        return [json.loads(listing) for (listing,) in rows]
+
+    def movie(self, rating_key) -> dict | None:
+        """Full cached metadata of a movie (listing data if its details were never fetched)."""
+        row = self._db().execute(
+            "SELECT detail, listing FROM movies WHERE rating_key = ?", (str(rating_key),)
+        ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0] or row[1])
+
+    def movies(self, rating_keys) -> dict:
+        """movie() for several ratingKeys with one query, keyed by ratingKey."""
+        keys = [str(k) for k in rating_keys]
+        rows = self._db().execute(
+            f"SELECT rating_key, detail, listing FROM movies WHERE rating_key IN ({','.join('?' * len(keys))})", keys
+        ).fetchall() if keys else []
+        return {key: json.loads(detail or listing) for key, detail, listing in rows}
+
+    def search(self, title) -> list:
+        titles = dict(self._db().execute("SELECT key, title FROM sections"))
+        rows = self._db().execute(
+            "SELECT section_key, listing FROM movies WHERE title LIKE ? ORDER BY title", (f"%{title}%",)
+        )
+        results = []
+        for section_key, listing in rows:
+            m = json.loads(listing)
+            results.append({
+                'ratingKey': m.get('ratingKey'),
+                'title':     m.get('title'),
+                'year':      m.get('year'),
+                'thumb':     m.get('thumb'),
+                'library':   titles.get(section_key, ''),
+                'raw':       m,
+            })
+        return results
+
+# Module result cache: every module declares VERSION and INPUTS (the movie
+# fields it reads, as dotted paths into the Media/Part/Stream tree); its result
+# is stored under (module, version, hash of those fields and its other
+# arguments), so reordering [modules] or changing one module's settings only
+# recomputes what changed. Modules with a TTL (external lookups) expire, and
+# their empty results are not kept. By default only those are cached: the
+# CPU-only modules are cheaper to rerun than to look up.
+MODULE_CACHE_BATCH = 500
+
+class ModuleCache:
+    """SQLite store of module results for one server."""
+
+    def __init__(self, path: Path | None = None, network_only: bool = True):
+        self.path = Path(path) if path else _state_dir() / 'module_cache.sqlite'
+        self.network_only = network_only
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {}
+        atexit.register(self.flush)
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results (module TEXT, version TEXT, fingerprint TEXT,"
+                " value TEXT, created_at REAL, PRIMARY KEY (module, version, fingerprint))"
+            )
+            self._local.db = db
+        return db
+
+    def caches(self, mod) -> bool:
+        return getattr(mod, 'VERSION', None) is not None and (not self.network_only or bool(getattr(mod, 'TTL', None)))
+
+    def get(self, module, version, fingerprint, ttl=None):
+        """(True, value) for a usable stored result, else (False, None)."""
+        key = (module, str(version), fingerprint)
+        with self._lock:
+            row = self._pending.get(key)
+        if row is None:
+            row = self._db().execute(
+                "SELECT value, created_at FROM results WHERE module = ? AND version = ? AND fingerprint = ?", key
+            ).fetchone()
+        if row is None or (ttl and time.time() - row[1] > ttl):
+            return False, None
+        return True, json.loads(row[0])
+
+    def put(self, module, version, fingerprint, value):
+        """Queue a result; queued results are written MODULE_CACHE_BATCH at a time, in one transaction."""
+        with self._lock:
+            self._pending[(module, str(version), fingerprint)] = (json.dumps(value), time.time())
+            if len(self._pending) < MODULE_CACHE_BATCH:
+                return
+            rows, self._pending = self._pending, {}
+        self._write(rows)
+
+    def flush(self):
+        with self._lock:
+            rows, self._pending = self._pending, {}
+        if rows:
+            self._write(rows)
+
+    def _write(self, rows):
+        db = self._db()
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                [(*key, value, created_at) for key, (value, created_at) in rows.items()]
+            )
+
+def _pluck(value, path):
+    """The values at a dotted path, descending through lists (Media -> Part -> Stream)."""
+    for i, field in enumerate(path):
+        if isinstance(value, list):
+            return [_pluck(v, path[i:]) for v in value]
+        value = value.get(field) if isinstance(value, dict) else None
+    return value
+
+def _module_fingerprint(mod, movie_data, args) -> str:
+    config_fingerprint = getattr(mod, 'config_fingerprint', None)
+    key = {
+        "inputs": {field: _pluck(movie_data, field.split('.')) for field in mod.INPUTS},
+        "args": [a for a in args if a is not movie_data],
+        "config": config_fingerprint() if config_fingerprint else None,
+    }
+    return hashlib.sha1(
+        json.dumps(key, sort_keys=True, default=lambda o: sorted(o) if isinstance(o, set) else str(o)).encode()
+    ).hexdigest()
+
+def _run_module(name, fn, movie_data, args):
+    """Call a module function, going through _module_cache when the module declares its inputs."""
+    mod = sys.modules.get(fn.__module__)
+    if _module_cache is None or not _module_cache.caches(mod):
+        return fn(*args)
+    version = mod.VERSION
+
+    fingerprint = _module_fingerprint(mod, movie_data, args)
+    ttl = getattr(mod, 'TTL', None)
+
+    hit, value = _module_cache.get(name, version, fingerprint, ttl)
+    if hit:
+        return value
+    value = fn(*args)
+    if value is not None or not ttl:
+        _module_cache.put(name, version, fingerprint, value)
+    return value
+
+# Module isolation: modules that declare NETWORK = True run on a separate
+# thread pool with a time budget ([performance] module_timeout, capped by what
+# is left of movie_deadline), so a hung request can't hold a movie worker, and
+# a movie's network modules all run at the same time as its CPU-only ones. A
+# module that fails or runs out of time falls back per module_fallback (skip
+# the tag, use its last cached result, or defer the movie to a --resume run),
+# and after module_max_failures failures in a row it is disabled for the run.
+# The pool's threads are daemons, so a request that never returns can't keep
+# the process from exiting. A call that timed out keeps its thread until it
+# returns; once MODULE_HUNG_MAX of them are outstanding, no new network module
+# calls start and the module whose call just hung is disabled.
+MODULE_THREADS = 64  # started as needed
+MODULE_HUNG_MAX = MODULE_THREADS // 2
+
+class MovieDeferred(Exception):
+    """A module missed its budget and [performance] module_fallback is "defer"."""
+
+class ModuleGuard:
+    """Time budgets, fallbacks and a consecutive-failure breaker for module calls."""
+
+    def __init__(self, timeout=5.0, movie_deadline=30.0, fallback="skip", max_failures=5, timeouts=None):
+        self.timeout = timeout
+        self.timeouts = {name.lower(): t for name, t in (timeouts or {}).items()}  # per-module overrides
+        self.movie_deadline = movie_deadline
+        self.fallback = fallback
+        self.max_failures = max_failures
+        self._failures = Counter()
+        self._disabled = set()
+        self._hung = 0
+        self._lock = Lock()
+        self._jobs = queue.SimpleQueue()
+        self._threads = []
+
+    @classmethod
+    def from_config(cls):
+        fallback = _config_option('performance', 'PERFORMANCE', 'module_fallback', 'skip').strip().lower()
+        if fallback not in ('skip', 'cached', 'defer'):
+            logger.warning(f"Unknown module_fallback '{fallback}'; using skip")
+            fallback = 'skip'
+        return cls(
+            float(_config_option('performance', 'PERFORMANCE', 'module_timeout', '5')),
+            float(_config_option('performance', 'PERFORMANCE', 'movie_deadline', '30')),
+            fallback,
+            int(_config_option('performance', 'PERFORMANCE', 'module_max_failures', '5')),
+            {name: float(v) for name, v in _config_options('performance', 'PERFORMANCE', 'module_timeout_').items()},
+        )
+
+    def reset(self):
+        with self._lock:
+            self._failures.clear()
+            self._disabled.clear()
+
+    def disabled(self, name) -> bool:
+        return name in self._disabled
+
+    def budget(self, name, deadline) -> float:
+        """Seconds module `name` may run; [performance] module_timeout_<name> overrides the default."""
+        timeout = self.timeouts.get(name.lower(), self.timeout)
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        return timeout
+
+    def ok(self, name):
+        if self._failures[name]:
+            with self._lock:
+                self._failures[name] = 0
+
+    def failed(self, name):
+        with self._lock:
+            self._failures[name] += 1
+            if self.max_failures and self._failures[name] >= self.max_failures and name not in self._disabled:
+                self._disabled.add(name)
+                logger.warning(f"Module {name} failed {self._failures[name]} times in a row; "
+                               f"disabled for the rest of this run ({self.fallback} from now on)")
+
+    def saturated(self) -> bool:
+        return self._hung >= MODULE_HUNG_MAX
+
+    def abandon(self, name, fut):
+        """Give up on a timed-out call; one that is already running is counted until it returns."""
+        if fut.cancel():
+            return
+        with self._lock:
+            self._hung += 1
+            if self.saturated() and name not in self._disabled:
+                self._disabled.add(name)
+                logger.warning(f"{self._hung} module calls are still hung; module {name} "
+                               f"disabled for the rest of this run ({self.fallback} from now on)")
+        fut.add_done_callback(self._returned)
+
+    def _returned(self, _fut):
+        with self._lock:
+            self._hung -= 1
+
+    def submit(self, fn, *args) -> Future:
+        fut = Future()
+        self._jobs.put((fut, fn, args))
+        with self._lock:
+            if len(self._threads) < MODULE_THREADS:
+                t = threading.Thread(target=self._worker, name=f"module-{len(self._threads) + 1}", daemon=True)
+                self._threads.append(t)
+                t.start()
+        return fut
+
+    def _worker(self):
+        while True:
+            fut, fn, args = self._jobs.get()
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(fn(*args))
+            except BaseException as e:
+                fut.set_exception(e)
+
+_module_guard: ModuleGuard | None = None
+
+def module_guard() -> ModuleGuard:
+    global _module_guard
+    if _module_guard is None:
+        _module_guard = ModuleGuard.from_config()
+    return _module_guard
+
+def _module_fallback(name, fn, movie_data, args, reason):
+    guard = module_guard()
+    if guard.fallback == "defer":
+        raise MovieDeferred(f"module {name} {reason}")
+    if guard.fallback == "cached" and _module_cache is not None:
+        mod = sys.modules.get(fn.__module__)
+        if _module_cache.caches(mod):
+            hit, value = _module_cache.get(name, mod.VERSION, _module_fingerprint(mod, movie_data, args))
+            if hit:
+                return value
+    return None
+
+def _is_network(fn) -> bool:
+    return getattr(sys.modules.get(fn.__module__), 'NETWORK', False)
+
+def _timed_module(name, fn, movie_data, args):
+    with _log_fields(ratingKey=movie_data.get('ratingKey'), title=movie_data.get('title')), \
+            _timed(f"module {name}"):
+        return _run_module(name, fn, movie_data, args)
+
+def _start_module(name, fn, movie_data, args, deadline=None):
+    """Submit a network module to the module pool: (future, due time, budget), or None when out of time."""
+    guard = module_guard()
+    timeout = guard.budget(name, deadline)
+    if timeout <= 0 or guard.saturated():
+        return None
+    return guard.submit(_timed_module, name, fn, movie_data, args), time.monotonic() + timeout, timeout
+
+def _module_result(name, fn, movie_data, args, deadline=None, started=None):
+    """One module's value under its time budget, fallback and failure breaker.
+
+    `started` is what _start_module returned for a network module that is
+    already running.
+    """
+    from concurrent.futures import wait
+
+    guard = module_guard()
+    if guard.disabled(name) and started is None:
+        return _module_fallback(name, fn, movie_data, args, "is disabled")
+    title = movie_data.get('title', 'Unknown')
+    if not _is_network(fn):
+        try:
+            value = _timed_module(name, fn, movie_data, args)
+        except Exception as e:
+            logger.error(f"Error processing module {name} for {title}: {e}")
+            guard.failed(name)
+            return _module_fallback(name, fn, movie_data, args, "failed")
+        guard.ok(name)
+        return value
+
+    started = started or _start_module(name, fn, movie_data, args, deadline)
+    if started is None:
+        if guard.saturated():
+            logger.warning(f"Skipped module {name} for {title}: module threads are held by hung calls")
+            return _module_fallback(name, fn, movie_data, args, "could not start")
+        logger.warning(f"Skipped module {name} for {title}: movie deadline passed")
+        return _module_fallback(name, fn, movie_data, args, "missed the movie deadline")
+    fut, due, timeout = started
+    if not wait([fut], timeout=max(0.0, due - time.monotonic())).done:
+        guard.abandon(name, fut)
+        logger.warning(f"Module {name} for {title} timed out after {timeout:.1f}s")
+        guard.failed(name)
+        return _module_fallback(name, fn, movie_data, args, "timed out")
+    try:
+        value = fut.result()
+    except Exception as e:
+        logger.error(f"Error processing module {name} for {title}: {e}")
+        guard.failed(name)
+        return _module_fallback(name, fn, movie_data, args, "failed")
+    guard.ok(name)
+    return value
+
+# Set by --offline: read listings and metadata from this cache instead of Plex
+_cache: LibraryCache | None = None
+
+# Module results cache ([performance] module_cache); None disables it
+_module_cache: ModuleCache | None = None
+
+# --profile: the wall time of every stage (section listing, detail fetch, each
+# module, edition writes) goes into a log-scale histogram per stage; a table of
+# totals and percentiles is printed at the end of the run.
+PROFILE_BUCKET_GROWTH = 1.1  # ~10% wide buckets
+PROFILE_BUCKET_BASE = 1e-6   # seconds
+
+class Profiler:
+    """Thread-safe per-stage timing histograms."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._stages = {}  # stage -> {"count", "total", "max", "buckets"}
+
+    def record(self, stage: str, seconds: float):
+        bucket = max(0, int(math.log(max(seconds, PROFILE_BUCKET_BASE) / PROFILE_BUCKET_BASE,
+                                     PROFILE_BUCKET_GROWTH)))
+        with self._lock:
+            st = self._stages.get(stage)
+            if st is None:
+                st = self._stages[stage] = {"count": 0, "total": 0.0, "max": 0.0, "buckets": Counter()}
+            st["count"] += 1
+            st["total"] += seconds
+            st["max"] = max(st["max"], seconds)
+            st["buckets"][bucket] += 1
+
+    @staticmethod
+    def _percentile(st, pct) -> float:
+        wanted = st["count"] * pct / 100
+        seen = 0
+        for bucket in sorted(st["buckets"]):
+            seen += st["buckets"][bucket]
+            if seen >= wanted:
+                return min(st["max"], PROFILE_BUCKET_BASE * PROFILE_BUCKET_GROWTH ** (bucket + 1))
+        return st["max"]
+
+    def summary(self) -> list:
+        """One row per stage, largest total first; times in milliseconds."""
+        with self._lock:
+            stages = {name: dict(st, buckets=Counter(st["buckets"])) for name, st in self._stages.items()}
+        rows = [{
+            "stage": name,
+            "count": st["count"],
+            "total_ms": round(st["total"] * 1000, 1),
+            "mean_ms": round(st["total"] / st["count"] * 1000, 3),
+            "p50_ms": round(self._percentile(st, 50) * 1000, 3),
+            "p90_ms": round(self._percentile(st, 90) * 1000, 3),
+            "p99_ms": round(self._percentile(st, 99) * 1000, 3),
+            "max_ms": round(st["max"] * 1000, 3),
+        } for name, st in stages.items()]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def report(self):
+        rows = self.summary()
+        if not rows:
+            return
+        columns = list(rows[0])
+        widths = [max(len(c), *(len(str(r[c])) for r in rows)) for c in columns]
+        logger.info("Profile (wall time per stage; threads overlap, so totals can exceed the run time):")
+        logger.info("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+        for r in rows:
+            logger.info("  ".join(str(r[c]).ljust(w) for c, w in zip(columns, widths)))
+
+_profiler: Profiler | None = None
+
+# --trace: the same stages as spans in a Chrome trace file (open it in
+# Perfetto or chrome://tracing), one track per thread, to see how the worker
+# pool is used over time.
+class Tracer:
+    """Collects "complete" trace events for the stages timed with _timed."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._events = []
+        self._threads = {}
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+
+    def span(self, name: str, start: float, end: float, args: dict):
+        tid = threading.get_native_id()
+        event = {
+            "name": name, "cat": name.split(" ")[0], "ph": "X", "pid": self._pid, "tid": tid,
+            "ts": round((start - self._origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+            self._events.append(event)
+
+    def write(self, path):
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        meta = [{"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": "edition_manager"}}]
+        meta += [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+_tracer: Tracer | None = None
+
+# Metrics for long-running processes such as the webhook daemon (/metrics):
+# the stages timed with _timed, the job scheduler, Plex responses and the
+# modules' external API calls, rendered in the Prometheus text format.
+# Collection is off until enable_metrics() is called.
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC_HELP = {
+    "edition_manager_stage_duration_seconds": ("histogram", "Time spent per processing stage"),
+    "edition_manager_module_duration_seconds": ("histogram", "Time spent per module call"),
+    "edition_manager_plex_request_duration_seconds": ("histogram", "Plex request latency by endpoint"),
+    "edition_manager_plex_responses_total": ("counter", "Plex responses by endpoint and status code"),
+    "edition_manager_external_request_duration_seconds": ("histogram", "Latency of module calls to external APIs"),
+    "edition_manager_external_requests_total": ("counter", "Module calls to external APIs by host and status"),
+    "edition_manager_jobs_submitted_total": ("counter", "Jobs queued on the scheduler"),
+    "edition_manager_jobs_finished_total": ("counter", "Jobs finished, by outcome"),
+    "edition_manager_job_wait_seconds": ("histogram", "Time jobs spent queued"),
+    "edition_manager_job_duration_seconds": ("histogram", "Time jobs spent running"),
+}
+
+def _endpoint(path: str) -> str:
+    """Low-cardinality endpoint label: path segments containing ids become {id}."""
+    return re.sub(r'/[^/]*\d[^/]*', '/{id}', path) or "/"
+
+def _label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _label_text(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in labels) + "}"
+
+class Metrics:
+    """Thread-safe counters, histograms and callback gauges."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._help = dict(METRIC_HELP)
+        self._counters = defaultdict(float)  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self._gauges = {}  # name -> callback returning [(labels dict, value)]
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0] * (len(METRIC_BUCKETS) + 1) + [0.0]
+            for i, bound in enumerate(METRIC_BUCKETS):
+                if value <= bound:
+                    hist[i] += 1
+                    break
+            else:
+                hist[len(METRIC_BUCKETS)] += 1
+            hist[-1] += value
+
+    def gauge(self, name: str, help_text: str, callback):
+        """Register a gauge read at scrape time; callback() returns [(labels dict, value)]."""
+        self.describe(name, "gauge", help_text)
+        self._gauges[name] = callback
+
+    def render(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+        samples = defaultdict(list)
+        for (name, labels), value in counters.items():
+            samples[name].append(f"{name}{_label_text(labels)} {value:g}")
+        for (name, labels), hist in histograms.items():
+            cumulative = 0
+            for bound, count in zip(METRIC_BUCKETS + ("+Inf",), hist[:-1]):
+                cumulative += count
+                samples[name].append(f"{name}_bucket{_label_text(labels + (('le', bound),))} {cumulative}")
+            samples[name].append(f"{name}_sum{_label_text(labels)} {hist[-1]:g}")
+            samples[name].append(f"{name}_count{_label_text(labels)} {cumulative}")
+        for name, callback in self._gauges.items():
+            for labels, value in callback():
+                samples[name].append(f"{name}{_label_text(tuple(sorted(labels.items())))} {value:g}")
+
+        lines = []
+        for name in sorted(samples):
+            kind, help_text = self._help.get(name, ("untyped", ""))
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"] + samples[name]
+        return "\n".join(lines) + "\n"
+
+_metrics: Metrics | None = None
+
+def _observe_external(host, seconds, status):
+    _metrics.observe("edition_manager_external_request_duration_seconds", seconds, host=host)
+    _metrics.inc("edition_manager_external_requests_total", host=host, status=str(status))
+
+def enable_metrics() -> Metrics:
+    """Start collecting metrics in this process; returns the registry to render."""
+    global _metrics
+    if _metrics is None:
+        from modules import _http
+        _metrics = Metrics()
+        _http.observers.append(_observe_external)
+    return _metrics
+
+@contextmanager
+def _timed(stage: str, **args):
+    """Time the enclosed block as `stage` for --profile, --trace, metrics and --verbose."""
+    if _profiler is None and _tracer is None and _metrics is None and not _log_timings:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        if _profiler:
+            _profiler.record(stage, end - start)
+        if _tracer:
+            _tracer.span(stage, start, end, args)
+        if _metrics:
+            if stage.startswith("module "):
+                _metrics.observe("edition_manager_module_duration_seconds", end - start, module=stage[7:])
+            elif stage.startswith("HTTP "):
+                _metrics.observe("edition_manager_plex_request_duration_seconds", end - start,
+                                 method=stage[5:], endpoint=_endpoint(args.get("path", "")))
+            else:
+                _metrics.observe("edition_manager_stage_duration_seconds", end - start, stage=stage)
+        if _log_timings:
+            fields = {"stage": stage, "seconds": round(end - start, 6)}
+            if stage.startswith("module "):
+                fields["edition_module"] = stage[7:]
+            if "path" in args:
+                fields["path"] = args["path"]
+            logger.debug(f"{stage}: {(end - start) * 1000:.1f} ms", extra=fields)
+
+# Set by --verbose: log every _timed stage at debug level
+_log_timings = False
+
+# Set by --dry-run: evaluate modules and log the editions without writing them
+_dry_run = False
+
+def _library_sections(server, headers) -> list:
+    if _cache:
+        return _cache.sections()
+    return make_request(f'{server}/library/sections', headers)['MediaContainer']['Directory']
+
+def _section_movies(server, headers, section_key, scope=None) -> list:
+    if _cache:
+        return _filter_cached(_cache.section_movies(section_key), scope)
+    query = _scope_query(server, headers, section_key, scope)
+    if query is None:
+        return []  # the requested collection isn't in this section
+    with _timed("list section", section=section_key):
+        resp = make_request(f"{server}/library/sections/{section_key}/all{query}", headers)
+    return resp.get('MediaContainer', {}).get('Metadata', []) if resp else []
+
+# Scoped bulk runs: --library, --since, --updated-since, --recent and
+# --collection narrow --all/--reset/--plan. The filters are sent to Plex so a
+# run only lists (and then processes) the matching movies. Scopes keep the
+# times as typed (7d); resolve_scope turns them into cut-offs, and a
+# checkpointed run stores its cut-offs so --resume covers the same movies.
+def parse_when(spec: str, now: int | None = None) -> int:
+    """Epoch seconds for "7d", "12h", "30m", "2w" (before `now`) or an ISO date/time."""
+    if spec.strip().isdigit():
+        return int(spec)  # already epoch seconds
+    m = re.fullmatch(r'(\d+)\s*([mhdw])', spec.strip().lower())
+    if m:
+        seconds = int(m.group(1)) * {"m": 60, "h": 3600, "d": 86400, "w": 604800}[m.group(2)]
+        return int(now or time.time()) - seconds
+    try:
+        return int(datetime.fromisoformat(spec.strip()).timestamp())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time '{spec}', expected e.g. 7d, 12h or 2024-05-01")
+
+def when_spec(spec: str) -> str:
+    """argparse type for --since/--updated-since: checked, but kept as typed."""
+    parse_when(spec)
+    return spec.strip()
+
+def resolve_scope(scope, now: int | None = None):
+    """The scope with its --since/--updated-since times as epoch seconds."""
+    if not scope:
+        return scope
+    return {k: parse_when(v, now) if k in ("added_since", "updated_since") else v for k, v in scope.items()}
+
+def _scope_query(server, headers, section_key, scope) -> str | None:
+    if not scope:
+        return ""
+    params = []
+    if scope.get("added_since"):
+        params.append(f"addedAt>>={scope['added_since']}")
+    if scope.get("updated_since"):
+        params.append(f"updatedAt>>={scope['updated_since']}")
+    if scope.get("collection"):
+        resp = make_request(f"{server}/library/sections/{section_key}/collections", headers)
+        ids = [
+            c['ratingKey'] for c in resp.get('MediaContainer', {}).get('Metadata', []) or []
+            if c.get('title', '').lower() == scope["collection"].lower()
+        ]
+        if not ids:
+            return None
+        params.append(f"collection={ids[0]}")
+    if scope.get("recent"):
+        params += ["sort=addedAt:desc", "X-Plex-Container-Start=0", f"X-Plex-Container-Size={scope['recent']}"]
+    return "?" + "&".join(params) if params else ""
+
+def _filter_cached(movies, scope) -> list:
+    """Apply a scope to cached listings the way Plex would."""
+    if not scope:
+        return movies
+    if scope.get("added_since"):
+        movies = [m for m in movies if int(m.get('addedAt') or 0) >= scope["added_since"]]
+    if scope.get("updated_since"):
+        movies = [m for m in movies if int(m.get('updatedAt') or 0) >= scope["updated_since"]]
+    if scope.get("collection"):
+        name = scope["collection"].lower()
+        movies = [m for m in movies if any(c.get('tag', '').lower() == name for c in m.get('Collection', []) or [])]
+    return movies
+
+def _in_scope_library(library, scope) -> bool:
+    wanted = (scope or {}).get("libraries")
+    return not wanted or library.get('title') in wanted or str(library.get('key')) in wanted
+
+# Manually managed editions: movies carrying one of [server] skip_labels (a
+# label or collection), or, with skip_locked_editions, a locked edition other
+# than the one we last wrote for that movie, are dropped from bulk runs using
+# the section listing alone, before any detail fetch, module work or write.
+# A locked edition we have no record of (written by an older version, or put
+# back by a restore) can only be judged once the modules have run: it is ours
+# if it is made up of the labels they produce (_hand_set_edition).
+def _config_option(section: str, env_prefix: str, key: str, default: str) -> str:
+    """[section] key from config.ini, or <ENV_PREFIX>_<KEY> in env mode."""
+    if os.getenv('PLEX_URL') is not None:
+        return os.getenv(f'{env_prefix}_{key.upper()}', default)
+    config = ConfigParser()
+    config.read(CONFIG_FILE)
+    return config.get(section, key, fallback=default)
+
+def _config_options(section: str, env_prefix: str, prefix: str) -> dict:
+    """Every [section] <prefix>... option (or <ENV_PREFIX>_<PREFIX>... variable), keyed by the rest of its name."""
+    if os.getenv('PLEX_URL') is not None:
+        env = f'{env_prefix}_{prefix.upper()}'
+        return {k[len(env):].lower(): v for k, v in os.environ.items() if k.startswith(env)}
+    config = ConfigParser()
+    config.read(CONFIG_FILE)
+    if not config.has_section(section):
+        return {}
+    return {k[len(prefix):]: v for k, v in config.items(section) if k.startswith(prefix)}
+
+def _server_option(key: str, default: str) -> str:
+    return _config_option('server', 'PLEX', key, default)
+
+class EditionLog:
+    """SQLite record of the last edition written per ratingKey, for one server."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path) if path else _state_dir() / 'written_editions.sqlite'
+        self._lock = Lock()
+        self._pending = {}
+        atexit.register(self.flush)
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS editions (rating_key TEXT PRIMARY KEY, edition TEXT)")
+        return db
+
+    def record(self, rating_key, edition):
+        """Remember the edition we wrote; an empty one (cleared, reset, restored) forgets the movie."""
+        with self._lock:
+            self._pending[str(rating_key)] = edition or None
+            if len(self._pending) < MODULE_CACHE_BATCH:
+                return
+            rows, self._pending = self._pending, {}
+        self._write(rows)
+
+    def flush(self):
+        with self._lock:
+            rows, self._pending = self._pending, {}
+        if rows:
+            self._write(rows)
+
+    def _write(self, rows):
+        with closing(self._connect()) as db, db:
+            db.executemany("INSERT OR REPLACE INTO editions VALUES (?, ?)",
+                           [(k, v) for k, v in rows.items() if v is not None])
+            db.executemany("DELETE FROM editions WHERE rating_key = ?", [(k,) for k, v in rows.items() if v is None])
+
+    def load(self) -> dict:
+        self.flush()
+        if not self.path.exists():
+            return {}
+        with closing(self._connect()) as db:
+            return dict(db.execute("SELECT rating_key, edition FROM editions"))
+
+_edition_log: EditionLog | None = None
+
+def edition_log() -> EditionLog:
+    global _edition_log
+    if _edition_log is None:
+        _edition_log = EditionLog()
+    return _edition_log
+
+def _manual_edition_rules() -> dict:
+    labels = {l.strip().lower() for l in re.split(r'[；;,]', _server_option('skip_labels', '')) if l.strip()}
+    locked = _server_option('skip_locked_editions', 'false').strip().lower() in ('true', '1', 'yes')
+    return {"labels": labels, "locked": locked, "written": edition_log().load() if locked else {}}
+
+def _edition_locked(movie) -> bool:
+    return any(f.get('name') == 'editionTitle' and f.get('locked') for f in movie.get('Field', []))
+
+def _is_manual_edition(movie, rules) -> bool:
+    if rules["labels"]:
+        tags = movie.get('Label', []) + movie.get('Collection', [])
+        if any(t.get('tag', '').lower() in rules["labels"] for t in tags):
+            return True
+    edition = movie.get('editionTitle')
+    if rules["locked"] and edition and _edition_locked(movie):
+        written = rules["written"].get(str(movie['ratingKey']))
+        return written is not None and edition != written
+    return False
+
+def _hand_set_edition(movie, tags, rules) -> bool:
+    """A locked edition we have no record of, and that the modules' labels don't make up."""
+    if not rules or not rules["locked"]:
+        return False
+    edition = movie.get('editionTitle')
+    if not edition or str(movie['ratingKey']) in rules["written"] or not _edition_locked(movie):
+        return False
+    return not set(edition.split(' · ')) <= set(tags)
+
 # Initialize settings
-def initialize_settings():
+def initialize_settings(server_name=None, check_connection=True):
     # Check if we should use environment variables (when PLEX_URL is set, assume env mode)
     use_env = os.getenv('PLEX_URL') is not None
 
@@ -170,7 +1830,7 @@ def initialize_settings():
         logger.info("Using configuration from environment variables")
     else:
         # Load settings from config.ini file
-        config_file = Path(__file__).parent / 'config' / 'config.ini'
+        config_file = CONFIG_FILE
         config = ConfigParser()
         config.read(config_file)
 
@@ -205,15 +1865,20 @@ def initialize_settings():
 
         logger.info(f"Using configuration from {config_file}")
 
-    try:
-        headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
-        response = make_request(f'{server}/library/sections', headers)
-        server_name = response['MediaContainer'].get('friendlyName', server)
-        logger.info(f"Successfully connected to server: {server_name}")
-    except requests.exceptions.RequestException as err:
-        logger.error("Server connection failed, please check the settings in the configuration file or your network.")
-        time.sleep(10)
-        raise SystemExit(err)
+    if server_name and server_name != DEFAULT_SERVER:
+        server, token, skip_libraries, max_workers = _named_server_settings(server_name, max_workers)
+        logger.info(f"Using server '{server_name}'")
+
+    if check_connection:
+        try:
+            headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
+            response = make_request(f'{server}/library/sections', headers)
+            server_name = response['MediaContainer'].get('friendlyName', server)
+            logger.info(f"Successfully connected to server: {server_name}")
+        except requests.exceptions.RequestException as err:
+            logger.error("Server connection failed, please check the settings in the configuration file or your network.")
+            time.sleep(10)
+            raise SystemExit(err)
 
     return (
         server,
@@ -227,30 +1892,39 @@ def initialize_settings():
         batch_size
     )
 
-# Batched movie processing
-def process_movies_batch(
-    movies_batch,
-    server,
-    token,
-    modules,
-    excluded_languages,
-    skip_multiple_audio_tracks,
-    tmdb_api_key,
-    lib_title=""
-):
-    for movie in movies_batch:
-        try:
-            process_single_movie(
-                server,
-                token,
-                movie,
-                modules,
-                excluded_languages,
-                skip_multiple_audio_tracks,
-                tmdb_api_key
-            )
-        except Exception as e:
-            logger.error(f"Error processing movie {movie.get('title', 'Unknown')}: {str(e)}")
+def _collect_movies(server, token, skip_libraries, shard=None, scope=None, rules=None) -> list:
+    """(library title, ratingKey, movie) for every movie in the non-skipped libraries."""
+    headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
+    all_movies = []
+    library_info = {}
+    with _timed("enumerate"):
+        for library in _library_sections(server, headers):
+            if (library.get('type') == 'movie' and library.get('title') not in skip_libraries
+                    and _in_scope_library(library, scope)):
+                lib_title = library.get('title')
+                movies = _section_movies(server, headers, library['key'], scope)
+                all_movies.extend((lib_title, m['ratingKey'], m) for m in movies)
+                library_info[lib_title] = 0
+
+    if scope and scope.get("recent"):
+        # Each section returned its newest N; keep the newest N overall
+        all_movies.sort(key=lambda t: int(t[2].get('addedAt') or 0), reverse=True)
+        all_movies = all_movies[:scope["recent"]]
+    # Shard after --recent so the shards split the same N movies
+    all_movies = [t for t in all_movies if in_shard(t[1], shard)]
+    rules = rules or _manual_edition_rules()
+    if rules["labels"] or rules["locked"]:
+        kept = [t for t in all_movies if not _is_manual_edition(t[2], rules)]
+        if len(kept) < len(all_movies):
+            logger.info(f"Skipping {len(all_movies) - len(kept)} movies with manually managed editions")
+        all_movies = kept
+    for lib_title, _key, _m in all_movies:
+        library_info[lib_title] += 1
+
+    logger.info(f"Total movies found: {len(all_movies)}")
+    for lib_title, count in library_info.items():
+        logger.info(f"Library: {lib_title}, Movies: {count}")
+    return all_movies
 
 # Main movie processing function
 def process_movies(
@@ -262,49 +1936,53 @@ def process_movies(
     skip_multiple_audio_tracks,
     tmdb_api_key,
     max_workers,
-    batch_size
+    batch_size,
+    scheduler=None,
+    resume=False,
+    shard=None,
+    scope=None,
+    scope_now=None
 ):
-    headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
-    libraries = make_request(f'{server}/library/sections', headers)['MediaContainer']['Directory']
-
-    all_movies = []
-    library_info = {}
-    for library in libraries:
-        if library.get('type') == 'movie' and library.get('title') not in skip_libraries:
-            lib_title = library.get('title')
-            resp = make_request(f"{server}/library/sections/{library['key']}/all", headers)
-            movies = resp.get('MediaContainer', {}).get('Metadata', []) if resp else []
-            all_movies.extend(movies)
-            library_info[lib_title] = len(movies)
-
-    logger.info(f"Total movies found: {len(all_movies)}")
-    for lib_title, count in library_info.items():
-        logger.info(f"Library: {lib_title}, Movies: {count}")
+    # A dry run changes nothing, so it has nothing to checkpoint
+    signature = {"server": server, "modules": list(modules)}
+    if scope:
+        signature["scope"] = scope
+    checkpoint = None if _dry_run else Checkpoint("all", signature, shard)
+    scope = resolve_scope(scope, scope_now)
+    done = set()
+    if checkpoint:
+        done = checkpoint.start(resume, state={"scope": scope})
+        scope = checkpoint.state["scope"]  # a resumed run keeps its original cut-offs
+    rules = _manual_edition_rules()
+    all_movies = _collect_movies(server, token, skip_libraries, shard, scope, rules)
+    if done:
+        all_movies = [t for t in all_movies if t[1] not in done]
+        logger.info(f"Resuming: {len(done)} movies already processed, {len(all_movies)} remaining")
 
     _progress_set_total(len(all_movies))
+    batches = LabelBatches(server, token, modules, all_movies, batch_size or IDS_BATCH_SIZE)
 
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for i in range(0, len(all_movies), batch_size):
-            batch = all_movies[i:i+batch_size]
-            futures = [
-                executor.submit(
-                    process_single_movie,
-                    server,
-                    token,
-                    m,
-                    modules,
-                    excluded_languages,
-                    skip_multiple_audio_tracks,
-                    tmdb_api_key
-                )
-                for m in batch
-            ]
-            for _ in as_completed(futures):
-                _progress_step()
-            logger.info(
-                f"Processed batch {i//batch_size + 1}/{(len(all_movies)+batch_size-1)//batch_size}"
-            )
+    # Bulk work goes through the shared scheduler so interactive and webhook
+    # jobs can jump ahead of it; libraries are interleaved fairly.
+    def _process(m):
+        detailed, labels = batches.take(m['ratingKey'])
+        return process_single_movie(
+            server,
+            token,
+            detailed or m,
+            modules,
+            excluded_languages,
+            skip_multiple_audio_tracks,
+            tmdb_api_key,
+            detailed=detailed is not None,
+            labels=labels,
+            rules=rules
+        )
+
+    return _run_jobs(
+        all_movies, _process, max_workers, batch_size,
+        scheduler=scheduler, checkpoint=checkpoint
+    )
 
 # Process a single movie
 def process_single_movie(
@@ -314,155 +1992,470 @@ def process_single_movie(
     modules,
     excluded_languages,
     skip_multiple_audio_tracks,
-    tmdb_api_key
+    tmdb_api_key,
+    detailed=False,
+    labels=None,
+    rules=None
 ):
+    """Run the modules for one movie and write its edition; returns the edition title.
+
+    With `rules` (from _manual_edition_rules), a hand-set edition is left alone.
+    """
+    with _timed("movie (total)", ratingKey=movie.get('ratingKey'), title=movie.get('title')), \
+            _log_fields(ratingKey=movie.get('ratingKey'), title=movie.get('title')):
+        movie_data, tags = compute_edition(
+            server, token, movie, modules, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key, detailed,
+            labels
+        )
+        if tags is None:
+            return None
+        if _hand_set_edition(movie_data, tags, rules):
+            logger.info(f"{movie_data.get('title', 'Unknown')}: keeping hand-set edition "
+                        f"'{movie_data.get('editionTitle')}'", extra={"movie": True})
+            return None
+
+        edition_title = ' · '.join(dict.fromkeys(tags))
+        if _dry_run:
+            logger.info(f"{movie_data.get('title', 'Unknown')}: {edition_title or '(no edition)'} (dry run)",
+                        extra={"movie": True})
+            return edition_title
+
+        update_movie(server, token, movie_data, tags, modules)
+        return edition_title
+
+# Run the modules for one movie without writing anything
+_module_functions = None
+
+def _module_function(module):
+    global _module_functions
+    if _module_functions is None:
+        from modules.AudioChannels import get_AudioChannels
+        from modules.AudioCodec import get_AudioCodec
+        from modules.Bitrate import get_Bitrate
+        from modules.ContentRating import get_ContentRating
+        from modules.Country import get_Country
+        from modules.Cut import get_Cut
+        from modules.Director import get_Director
+        from modules.Duration import get_Duration
+        from modules.DynamicRange import get_DynamicRange
+        from modules.FrameRate import get_FrameRate
+        from modules.Genre import get_Genre
+        from modules.Language import get_Language
+        from modules.Rating import get_Rating
+        from modules.Release import get_Release
+        from modules.Resolution import get_Resolution
+        from modules.ShortFilm import get_ShortFilm
+        from modules.Size import get_Size
+        from modules.Source import get_Source
+        from modules.SpecialFeatures import get_SpecialFeatures
+        from modules.Studio import get_Studio
+        from modules.VideoCodec import get_VideoCodec
+        from modules.Writer import get_Writer
+
+        _module_functions = {
+            'AudioChannels': get_AudioChannels,
+            'AudioCodec': get_AudioCodec,
+            'Bitrate': get_Bitrate,
+            'ContentRating': get_ContentRating,
+            'Country': get_Country,
+            'Cut': get_Cut,
+            'Director': get_Director,
+            'Duration': get_Duration,
+            'DynamicRange': get_DynamicRange,
+            'FrameRate': get_FrameRate,
+            'Genre': get_Genre,
+            'Language': get_Language,
+            'Rating': get_Rating,
+            'Release': get_Release,
+            'Resolution': get_Resolution,
+            'ShortFilm': get_ShortFilm,
+            'Size': get_Size,
+            'Source': get_Source,
+            'SpecialFeatures': get_SpecialFeatures,
+            'Studio': get_Studio,
+            'VideoCodec': get_VideoCodec,
+            'Writer': get_Writer,
+        }
+    return _module_functions.get(module)
+
+def module_call(module, movie_data, file_name, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key,
+                server=None, token=None):
+    """(function, args) that evaluate `module` for a movie, or None for an unknown module.
+
+    `server` and `token` are the Plex server the movie belongs to; they are
+    part of SpecialFeatures' arguments and so of its module cache key.
+    """
+    fn = _module_function(module)
+    if fn is None:
+        return None
+    if module in ('Cut', 'Release'):
+        return fn, (file_name,)
+    if module == 'Source':
+        return fn, (file_name, movie_data)
+    if module == 'Language':
+        return fn, (movie_data, excluded_languages, skip_multiple_audio_tracks)
+    if module == 'Rating':
+        return fn, (movie_data, tmdb_api_key)
+    if module == 'SpecialFeatures':
+        return fn, (movie_data, server, token)
+    return fn, (movie_data,)
+
+# Batch evaluation: a module with a column() extractor and a get_<name>_batch
+# function (Size, Bitrate, Duration, ShortFilm, FrameRate, Resolution,
+# AudioChannels) labels a whole batch of movies in one call, with repeated
+# values formatted once. Used where many movies' details are already in
+# memory; the results are handed to compute_edition as `labels`.
+def module_batch(module):
+    """(column, batch function) of a module, or None if it has no batch API."""
+    fn = _module_function(module)
+    mod = sys.modules.get(fn.__module__) if fn else None
+    batch = getattr(mod, f'get_{module}_batch', None)
+    column = getattr(mod, 'column', None)
+    return (column, batch) if batch and column else None
+
+def batch_labels(modules, movies) -> list:
+    """{module: label} per movie for the modules in `modules` that have a batch API."""
+    labels = [{} for _ in movies]
+    for module in modules:
+        api = module_batch(module)
+        if api is None:
+            continue
+        column, batch = api
+        try:
+            with _timed(f"module {module} (batch)", movies=len(movies)):
+                values = batch([column(m) for m in movies])
+        except Exception as e:
+            # Left out of the labels, so compute_edition runs it movie by movie
+            logger.warning(f"Module {module} could not label {len(movies)} movies at once ({e}); "
+                           "running it per movie")
+            continue
+        for movie_labels, value in zip(labels, values):
+            movie_labels[module] = value
+    return labels
+
+# --all and --plan go through the batch API a chunk of a library at a time:
+# the first movie of a chunk to start fetches the whole chunk's details with
+# one request and labels them all; the other movies pick up their share.
+class LabelBatches:
+    """Details and batch_labels results for a run's movies, computed per chunk."""
+
+    def __init__(self, server, token, modules, items, size):
+        self.server = server
+        self.headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
+        self.modules = modules
+        self._chunk_of = {}
+        by_library = {}
+        for lib_title, key, _item in items:
+            by_library.setdefault(lib_title, []).append(str(key))
+        for keys in by_library.values():
+            for i in range(0, len(keys), size):
+                chunk = {"keys": keys[i:i + size], "lock": Lock(), "results": None}
+                for key in chunk["keys"]:
+                    self._chunk_of[key] = chunk
+
+    def take(self, rating_key):
+        """(full metadata, labels) for a movie, or (None, None) when its chunk's fetch missed it."""
+        chunk = self._chunk_of.pop(str(rating_key), None)
+        if chunk is None:
+            return None, None
+        with chunk["lock"]:
+            if chunk["results"] is None:
+                details = _fetch_details(self.server, self.headers, chunk["keys"])
+                found = [details[k] for k in chunk["keys"] if k in details]
+                chunk["results"] = {
+                    str(m['ratingKey']): (m, labels) for m, labels in zip(found, batch_labels(self.modules, found))
+                }
+            return chunk["results"].pop(str(rating_key), (None, None))
+
+def compute_edition(
+    server,
+    token,
+    movie,
+    modules,
+    excluded_languages,
+    skip_multiple_audio_tracks,
+    tmdb_api_key,
+    detailed=False,
+    labels=None
+):
+    """Return (full movie metadata, module tags); tags is None for movies without media.
+
+    Pass detailed=True when `movie` already is the full metadata, and `labels`
+    with module results computed by batch_labels.
+    """
+    labels = labels or {}
     # get full metadata
     headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
     movie_id = movie['ratingKey']
 
-    detailed_movie = None
-    try:
-        detailed_response = get_session().get(
-            f'{server}/library/metadata/{movie_id}',
-            headers=headers
-        )
-        if detailed_response.status_code == 200:
-            detailed_data = detailed_response.json()
-            if 'MediaContainer' in detailed_data and 'Metadata' in detailed_data['MediaContainer']:
-                detailed_movie = detailed_data['MediaContainer']['Metadata'][0]
-    except Exception as e:
-        logger.warning(f"Could not fetch detailed metadata for movie {movie.get('title', 'Unknown')}: {str(e)}")
+    if detailed:
+        detailed_movie = movie
+    else:
+        detailed_movie = _cache.movie(movie_id) if _cache else None
+    if detailed_movie is None:
+        try:
+            with _timed("fetch detail"):
+                detailed_response = get_session().get(
+                    f'{server}/library/metadata/{movie_id}',
+                    headers=headers,
+                    timeout=HTTP_TIMEOUT
+                )
+            if detailed_response.status_code == 200:
+                detailed_data = detailed_response.json()
+                if 'MediaContainer' in detailed_data and 'Metadata' in detailed_data['MediaContainer']:
+                    detailed_movie = detailed_data['MediaContainer']['Metadata'][0]
+        except Exception as e:
+            logger.warning(f"Could not fetch detailed metadata for movie {movie.get('title', 'Unknown')}: {str(e)}")
 
     movie_data = detailed_movie if detailed_movie else movie
+    # The modules' deadline; the detail fetch has its own HTTP timeout
+    guard = module_guard()
+    deadline = time.monotonic() + guard.movie_deadline if guard.movie_deadline > 0 else None
 
     # gets the filename
     media_list = movie_data.get('Media', [])
     if not media_list:
-        return
+        return movie_data, None
 
     first_media = media_list[0]
     media_parts = first_media.get('Part', [])
     if not media_parts:
-        return
+        return movie_data, None
 
     max_size_part = max(media_parts, key=lambda part: part['size'])
     file_path = max_size_part['file']
     file_name = os.path.basename(file_path)
 
-    tags = []
-
-    # import modules
-    from modules.AudioChannels import get_AudioChannels
-    from modules.AudioCodec import get_AudioCodec
-    from modules.Bitrate import get_Bitrate
-    from modules.ContentRating import get_ContentRating
-    from modules.Country import get_Country
-    from modules.Cut import get_Cut
-    from modules.Director import get_Director
-    from modules.Duration import get_Duration
-    from modules.DynamicRange import get_DynamicRange
-    from modules.FrameRate import get_FrameRate
-    from modules.Genre import get_Genre
-    from modules.Language import get_Language
-    from modules.Rating import get_Rating
-    from modules.Release import get_Release
-    from modules.Resolution import get_Resolution
-    from modules.ShortFilm import get_ShortFilm
-    from modules.Size import get_Size
-    from modules.Source import get_Source
-    from modules.SpecialFeatures import get_SpecialFeatures
-    from modules.Studio import get_Studio
-    from modules.VideoCodec import get_VideoCodec
-    from modules.Writer import get_Writer
-
-    # run modules
+    calls = []
     for module in modules:
+        if module in labels:
+            calls.append((module, None, None))
+            continue
         try:
-            if module == 'AudioChannels':
-                v = get_AudioChannels(movie_data)
-            elif module == 'AudioCodec':
-                v = get_AudioCodec(movie_data)
-            elif module == 'Bitrate':
-                v = get_Bitrate(movie_data)
-            elif module == 'ContentRating':
-                v = get_ContentRating(movie_data)
-            elif module == 'Country':
-                v = get_Country(movie_data)
-            elif module == 'Cut':
-                v = get_Cut(file_name)
-            elif module == 'Director':
-                v = get_Director(movie_data)
-            elif module == 'Duration':
-                v = get_Duration(movie_data)
-            elif module == 'DynamicRange':
-                v = get_DynamicRange(movie_data)
-            elif module == 'FrameRate':
-                v = get_FrameRate(movie_data)
-            elif module == 'Genre':
-                v = get_Genre(movie_data)
-            elif module == 'Language':
-                v = get_Language(
-                    movie_data,
-                    excluded_languages,
-                    skip_multiple_audio_tracks
-                )
-            elif module == 'Rating':
-                v = get_Rating(movie_data, tmdb_api_key)
-            elif module == 'Release':
-                v = get_Release(file_name)
-            elif module == 'Resolution':
-                v = get_Resolution(movie_data)
-            elif module == 'ShortFilm':
-                v = get_ShortFilm(movie_data)
-            elif module == 'Size':
-                v = get_Size(movie_data)
-            elif module == 'Source':
-                v = get_Source(file_name, movie_data)
-            elif module == 'SpecialFeatures':
-                v = get_SpecialFeatures(movie_data)
-            elif module == 'Studio':
-                v = get_Studio(movie_data)
-            elif module == 'VideoCodec':
-                v = get_VideoCodec(movie_data)
-            elif module == 'Writer':
-                v = get_Writer(movie_data)
-            else:
-                v = None
-
-            if v:
-                tags.append(v)
-
+            call = module_call(
+                module, movie_data, file_name, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key,
+                server, token
+            )
         except Exception as e:
             logger.error(
                 f"Error processing module {module} for {movie_data.get('title', 'Unknown')}: {str(e)}"
             )
+            continue
+        if call is not None:
+            calls.append((module, *call))
+
+    # Start every network module before the CPU-only ones run, so the movie
+    # waits for its slowest request instead of the sum of them
+    started = {
+        module: _start_module(module, fn, movie_data, args, deadline)
+        for module, fn, args in calls
+        if fn is not None and _is_network(fn) and not guard.disabled(module)
+    }
 
-    update_movie(server, token, movie_data, tags, modules)
+    # run modules, collecting the tags in the configured order
+    tags = []
+    try:
+        for module, fn, args in calls:
+            try:
+                if fn is None:
+                    v = labels[module]
+                else:
+                    v = _module_result(module, fn, movie_data, args, deadline, started.get(module))
+                if v:
+                    tags.append(v)
+            except MovieDeferred:
+                raise
+            except Exception as e:
+                logger.error(
+                    f"Error processing module {module} for {movie_data.get('title', 'Unknown')}: {str(e)}"
+                )
+    except MovieDeferred:
+        for pending in started.values():
+            if pending:
+                pending[0].cancel()
+        raise
+
+    return movie_data, tags
 
 def process_movie_by_rating_key(
-    server, token, rating_key, modules, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key
+    server, token, rating_key, modules, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key,
+    progress=True
 ):
+    """Process one movie; progress=False leaves the progress bar to a bulk run sharing this process."""
     movie = get_movie_by_rating_key(server, token, rating_key)
     if not movie:
         logger.error(f"Movie with ratingKey {rating_key} not found.")
+        _progress_item(rating_key, "not_found")
         return False
 
     # Log and send initial progress signal for GUI
     logger.info(f"Processing ratingKey={rating_key} ...")
-    print("PROGRESS 0")
-    sys.stdout.flush()
-
-    # Run the standard single-movie processing routine
-    process_single_movie(
-        server, token, movie, modules, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key
-    )
+    if progress:
+        _progress_set_total(1)
+
+    # Run the standard single-movie processing routine; bulk runs in other
+    # processes pause dispatching while this holds priority
+    with priority_hold():
+        edition = process_single_movie(
+            server, token, movie, modules, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key
+        )
 
     # Send completion signal for GUI progress bar
-    print("PROGRESS 100")
-    sys.stdout.flush()
+    _progress_item(rating_key, "ok", title=movie.get('title'), edition=edition)
+    if progress:
+        _progress_step()
 
     return True
 
+# --ids-from: a stream of ratingKeys (one per line, or JSON lines with a
+# "ratingKey" field) processed in one run; details are fetched in batches and
+# a RESULT line (an item event with --events jsonl) is printed per item.
+IDS_BATCH_SIZE = 50
+
+def _read_ids(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] in '{"':
+            try:
+                value = json.loads(line)
+            except ValueError:
+                logger.warning(f"Ignoring unreadable input line: {line}")
+                continue
+            key = value.get('ratingKey') if isinstance(value, dict) else value
+        else:
+            key = line
+        if key is None or str(key).strip() == "":
+            logger.warning(f"Ignoring input line without a ratingKey: {line}")
+            continue
+        yield str(key).strip()
+
+def _metadata_batch(server, headers, keys) -> list:
+    """Metadata of several ratingKeys with one request; missing ones are left out.
+
+    An error for the whole request doesn't say which key caused it, so each key
+    is then asked for separately: a 404 means that movie is gone, any other
+    error is raised.
+    """
+    try:
+        data = make_request(f"{server}/library/metadata/{','.join(keys)}", headers)
+        return data.get('MediaContainer', {}).get('Metadata', []) or []
+    except requests.exceptions.HTTPError as e:
+        if len(keys) == 1:
+            if e.response is not None and e.response.status_code == 404:
+                return []
+            raise
+    movies = []
+    for key in keys:
+        try:
+            data = make_request(f"{server}/library/metadata/{key}", headers)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                continue
+            raise
+        movies.extend(data.get('MediaContainer', {}).get('Metadata', []) or [])
+    return movies
+
+def _fetch_details(server, headers, keys) -> dict:
+    """Full metadata for several ratingKeys with one request."""
+    if _cache:
+        return _cache.movies(keys)
+    with _timed("fetch details (batch)"):
+        return {str(m['ratingKey']): m for m in _metadata_batch(server, headers, keys)}
+
+def process_ids(
+    server,
+    token,
+    stream,
+    modules,
+    excluded_languages,
+    skip_multiple_audio_tracks,
+    tmdb_api_key,
+    max_workers,
+    batch_size=IDS_BATCH_SIZE
+):
+    headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
+    summary = {"total": 0, "done": 0, "failed": 0, "not_found": 0, "interrupted": False}
+    out_lock = Lock()
+    scheduler = JobScheduler(max_workers)
+    futures = []
+    module_guard().reset()
+
+    def _emit(result):
+        with out_lock:
+            summary[{"ok": "done", "failed": "failed", "not_found": "not_found"}[result["status"]]] += 1
+            if _progress_format == "events":
+                _write_event("item", flush=True, **result)
+            else:
+                print("RESULT " + json.dumps(result, ensure_ascii=False))
+                sys.stdout.flush()
+
+    def _process(movie, labels):
+        return process_single_movie(
+            server, token, movie, modules, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key,
+            detailed=True, labels=labels
+        )
+
+    def _done(key, title, fut):
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is not None:
+            logger.error(f"Error processing {title}: {exc}")
+            _emit({"ratingKey": key, "status": "failed", "error": str(exc)})
+        else:
+            _emit({"ratingKey": key, "status": "ok", "title": title, "edition": fut.result()})
+
+    def _submit(batch):
+        try:
+            details = _fetch_details(server, headers, batch)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Could not fetch details for {len(batch)} ratingKeys: {e}")
+            for key in batch:
+                _emit({"ratingKey": key, "status": "failed", "error": str(e)})
+            return
+        found = [details[key] for key in batch if key in details]
+        labels = dict(zip((str(m['ratingKey']) for m in found), batch_labels(modules, found)))
+        for key in batch:
+            movie = details.get(key)
+            if movie is None:
+                _emit({"ratingKey": key, "status": "not_found"})
+                continue
+            fut = scheduler.submit(_process, movie, labels[key], priority=PRIORITY_BULK,
+                                   library=movie.get('librarySectionTitle', ''))
+            fut.add_done_callback(lambda f, k=key, t=movie.get('title', key): _done(k, t, f))
+            futures.append(fut)
+
+    try:
+        batch = []
+        for key in _read_ids(stream):
+            if _stop_event.is_set():
+                break
+            summary["total"] += 1
+            batch.append(key)
+            if len(batch) >= batch_size:
+                _submit(batch)
+                batch = []
+        if batch and not _stop_event.is_set():
+            _submit(batch)
+        for fut in futures:
+            while not fut.done():
+                if _stop_event.is_set():
+                    summary["interrupted"] = True
+                    fut.cancel()
+                    break
+                time.sleep(0.1)
+    finally:
+        scheduler.shutdown(cancel_pending=True)
+
+    summary["interrupted"] = summary["interrupted"] or _stop_event.is_set()
+    logger.info(
+        f"Processed {summary['total']} ratingKeys: {summary['done']} done, "
+        f"{summary['failed']} failed, {summary['not_found']} not found"
+    )
+    return summary
+
 def update_movie(server, token, movie, tags, modules):
     movie_id = movie['ratingKey']
     title = movie.get('title', 'Unknown')
@@ -474,11 +2467,12 @@ def update_movie(server, token, movie, tags, modules):
         'editionTitle.locked': 0
     }
     session = get_session()
-    session.put(
-        f'{server}/library/metadata/{movie_id}',
-        headers={'X-Plex-Token': token},
-        params=clear_params
-    )
+    with _timed("write edition (clear)"):
+        session.put(
+            f'{server}/library/metadata/{movie_id}',
+            headers={'X-Plex-Token': token},
+            params=clear_params
+        )
 
     tags = list(dict.fromkeys(tags))
 
@@ -491,46 +2485,199 @@ def update_movie(server, token, movie, tags, modules):
             'editionTitle.locked': 1
         }
 
-        session.put(
-            f'{server}/library/metadata/{movie_id}',
-            headers={'X-Plex-Token': token},
-            params=params
-        )
-        logger.info(f'{title}: {edition_title}')
+        with _timed("write edition"):
+            session.put(
+                f'{server}/library/metadata/{movie_id}',
+                headers={'X-Plex-Token': token},
+                params=params
+            )
+        edition_log().record(movie_id, edition_title)
+        logger.info(f'{title}: {edition_title}', extra={"movie": True})
     else:
-        logger.info(f'{title}: Cleared edition information')
+        edition_log().record(movie_id, "")
+        logger.info(f'{title}: Cleared edition information', extra={"movie": True})
     
     return True
 
-def reset_movies(server, token, skip_libraries, max_workers, batch_size):
-    headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
-    libraries = make_request(f'{server}/library/sections', headers)['MediaContainer']['Directory']
+# Plan / apply: --plan computes every movie's proposed edition with read-only
+# requests and writes it to a JSON lines file; --apply later writes only the
+# rows whose edition changes, throttled, e.g. in a maintenance window.
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads (rate 0 = unlimited)."""
+
+    def __init__(self, rate: float = 0):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = Lock()
 
-    to_reset = []
-    for lib in libraries:
-        if lib.get('type') == 'movie' and lib.get('title') not in skip_libraries:
-            resp = make_request(f"{server}/library/sections/{lib['key']}/all", headers)
-            movies = resp.get('MediaContainer', {}).get('Metadata', []) if resp else []
-            to_reset.extend([m for m in movies if 'editionTitle' in m])
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def plan_movies(
+    server,
+    token,
+    skip_libraries,
+    modules,
+    excluded_languages,
+    skip_multiple_audio_tracks,
+    tmdb_api_key,
+    max_workers,
+    batch_size,
+    plan_file,
+    shard=None,
+    scope=None,
+    scope_now=None
+):
+    rules = _manual_edition_rules()
+    all_movies = _collect_movies(server, token, skip_libraries, shard, resolve_scope(scope, scope_now), rules)
+    _progress_set_total(len(all_movies))
+    batches = LabelBatches(server, token, modules, all_movies, batch_size or IDS_BATCH_SIZE)
+
+    plan_path = Path(plan_file)
+    plan_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = plan_path.with_name(plan_path.name + ".tmp")
+    lock = Lock()
+    changed = 0
+
+    with tmp.open('w', encoding='utf-8') as f:
+        header = {
+            "plan": 1,
+            "server": server,
+            "modules": list(modules),
+            "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        }
+        f.write(json.dumps(header) + "\n")
+
+        def _plan_one(pair):
+            nonlocal changed
+            lib_title, m = pair
+            detailed, labels = batches.take(m['ratingKey'])
+            movie_data, tags = compute_edition(
+                server, token, detailed or m, modules, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key,
+                detailed=detailed is not None, labels=labels
+            )
+            if tags is None or _hand_set_edition(movie_data, tags, rules):
+                return
+            row = {
+                "ratingKey": movie_data['ratingKey'],
+                "title": movie_data.get('title', ''),
+                "library": lib_title,
+                "current": movie_data.get('editionTitle', ''),
+                "proposed": ' · '.join(dict.fromkeys(tags)),
+            }
+            with lock:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                changed += row["current"] != row["proposed"]
+
+        items = [(lib_title, key, (lib_title, m)) for lib_title, key, m in all_movies]
+        summary = _run_jobs(items, _plan_one, max_workers, batch_size, batch_label="Planned batch")
+
+    if summary["interrupted"]:
+        tmp.unlink(missing_ok=True)
+        logger.info("Plan interrupted; no plan file written.")
+        return summary
+    tmp.replace(plan_path)
+    logger.info(f"Plan written to {plan_path}: {changed} of {summary['done']} movies would change")
+    return summary
+
+def apply_plan(server, token, plan_file, max_workers, batch_size=0, rate=0, resume=False):
+    plan_path = Path(plan_file)
+    with plan_path.open('r', encoding='utf-8') as f:
+        header = json.loads(f.readline() or "{}")
+        rows = [json.loads(line) for line in f if line.strip()]
+    if header.get("server") != server:
+        logger.error(f"Plan {plan_path} was made for {header.get('server')}, not {server}; not applying.")
+        return None
+
+    rows = [r for r in rows if r["current"] != r["proposed"]]
+    if not rows:
+        logger.info(f"Nothing to apply: {plan_path} has no changes.")
+        return {"total": 0, "done": 0, "failed": 0, "cancelled": 0, "interrupted": False}
+
+    # Leave alone movies whose edition changed since the plan was made
+    keys = [str(r["ratingKey"]) for r in rows]
+    current = _current_editions(server, token, rating_keys=keys if len(keys) <= 1000 else None)
+    gone = [r for r in rows if str(r["ratingKey"]) not in current]
+    if gone:
+        logger.warning(f"Skipping {len(gone)} movies that are no longer on the server")
+    drifted = [r for r in rows if str(r["ratingKey"]) in current and current[str(r["ratingKey"])] != r["current"]]
+    if drifted:
+        logger.warning(f"Skipping {len(drifted)} movies whose edition changed since the plan was made")
+    skipped = {str(r["ratingKey"]) for r in gone + drifted}
+    items = [(r.get("library", ""), r["ratingKey"], r) for r in rows if str(r["ratingKey"]) not in skipped]
+
+    checkpoint = Checkpoint("apply", {"server": server, "plan": str(plan_path.resolve())})
+    done = checkpoint.start(resume)
+    if done:
+        items = [t for t in items if t[1] not in done]
+        logger.info(f"Resuming: {len(done)} rows already applied, {len(items)} remaining")
+
+    logger.info(f"Applying {len(items)} changes from {plan_path}")
+    _progress_set_total(len(items))
+    limiter = RateLimiter(rate)
+
+    def _apply_one(row):
+        limiter.wait()
+        edition = row["proposed"]
+        params = {'type': 1, 'id': row["ratingKey"], 'editionTitle.value': edition, 'editionTitle.locked': 1 if edition else 0}
+        with _timed("write edition"):
+            get_session().put(
+                f'{server}/library/metadata/{row["ratingKey"]}', headers={'X-Plex-Token': token}, params=params
+            ).raise_for_status()
+        edition_log().record(row["ratingKey"], edition)
+        logger.info(f'{row.get("title", row["ratingKey"])}: {edition or "(cleared)"}', extra={"movie": True})
+
+    return _run_jobs(items, _apply_one, max_workers, batch_size, batch_label="Applied batch", checkpoint=checkpoint)
+
+def reset_movies(server, token, skip_libraries, max_workers, batch_size, scheduler=None, resume=False, shard=None,
+                 scope=None, scope_now=None):
+    signature = {"server": server}
+    if scope:
+        signature["scope"] = scope
+    checkpoint = None if _dry_run else Checkpoint("reset", signature, shard)
+    scope = resolve_scope(scope, scope_now)
+    done = set()
+    if checkpoint:
+        done = checkpoint.start(resume, state={"scope": scope})
+        scope = checkpoint.state["scope"]  # a resumed run keeps its original cut-offs
+    # No modules run here, so a locked edition we have no record of stays
+    rules = _manual_edition_rules()
+    to_reset = [
+        t for t in _collect_movies(server, token, skip_libraries, shard, scope, rules)
+        if 'editionTitle' in t[2] and not _hand_set_edition(t[2], (), rules)
+    ]
 
     logger.info(f"Total movies to reset: {len(to_reset)}")
+    if done:
+        to_reset = [t for t in to_reset if t[1] not in done]
+        logger.info(f"Resuming: {len(done)} movies already reset, {len(to_reset)} remaining")
+
     _progress_set_total(len(to_reset))
 
-    from concurrent.futures import ThreadPoolExecutor, as_completed
     def _reset_one(movie):
+        if _dry_run:
+            logger.info(f"Would reset: {movie.get('title', 'Unknown')} ({movie.get('editionTitle')})",
+                        extra={"movie": True})
+            return
         movie_id = movie['ratingKey']
         params = {'type': 1, 'id': movie_id, 'editionTitle.value': '', 'editionTitle.locked': 0}
         s = get_session()
-        s.put(f'{server}/library/metadata/{movie_id}', headers={'X-Plex-Token': token}, params=params)
-        logger.info(f"Reset: {movie.get('title', 'Unknown')}")
+        with _timed("write edition"):
+            s.put(f'{server}/library/metadata/{movie_id}', headers={'X-Plex-Token': token}, params=params)
+        edition_log().record(movie_id, "")
+        logger.info(f"Reset: {movie.get('title', 'Unknown')}", extra={"movie": True})
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        for i in range(0, len(to_reset), batch_size):
-            batch = to_reset[i:i+batch_size]
-            futures = [ex.submit(_reset_one, m) for m in batch]
-            for _ in as_completed(futures):
-                _progress_step()
-            logger.info(f"Reset batch {i//batch_size + 1}/{(len(to_reset)+batch_size-1)//batch_size}")
+    return _run_jobs(
+        to_reset, _reset_one, max_workers, batch_size, batch_label="Reset batch",
+        scheduler=scheduler, checkpoint=checkpoint
+    )
 
 # Reset a single movie
 def reset_movie(server, token, movie):
@@ -541,6 +2688,7 @@ def reset_movie(server, token, movie):
         params = {'type': 1, 'id': movie_id, 'editionTitle.value': '', 'editionTitle.locked': 0}
         session = get_session()
         session.put(f'{server}/library/metadata/{movie_id}', headers={'X-Plex-Token': token}, params=params)
+        edition_log().record(movie_id, "")
         logger.info(f'Reset {title}')
         return True
     except Exception as e:
@@ -548,63 +2696,494 @@ def reset_movie(server, token, movie):
         return False
 
 # Backup metadata
-def _backup_filename() -> Path:
+# Backups are JSON lines: a header line, then one {"ratingKey", "title",
+# "editionTitle"} record per movie, gzip- or zstd-compressed. Older
+# single-document .json backups are still readable.
+#
+# Records are written in independently compressed blocks and a SQLite sidecar
+# (<backup>.idx) maps each ratingKey and library to its block, so single movies
+# can be read without decompressing the whole file.
+#
+# Backups form chains: a full snapshot followed by diff segments that only
+# hold the ratingKeys changed since the previous point ({"deleted": true} for
+# removed movies). Any point is restored by replaying its chain.
+BACKUP_PAGE_SIZE = 1000
+BACKUP_FETCH_WORKERS = 4
+BACKUP_BLOCK_SIZE = 1000  # records per compressed block
+BACKUP_EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst", "none": ".jsonl"}
+BACKUP_FULL_EVERY = 24  # diffs before the next backup is a full snapshot
+BACKUP_KEEP_CHAINS = 4
+
+def _backup_option(key: str, default: str) -> str:
+    return _config_option('backup', 'BACKUP', key, default)
+
+def _backup_compression() -> str:
+    """[backup] compression (or BACKUP_COMPRESSION): gzip, zstd or none."""
+    value = _backup_option('compression', 'gzip').strip().lower() or 'gzip'
+    if value not in BACKUP_EXTENSIONS:
+        logger.warning(f"Unknown backup compression '{value}'; using gzip")
+        return 'gzip'
+    if value == 'zstd':
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            logger.warning("zstd backups need the 'zstandard' package; using gzip")
+            return 'gzip'
+    return value
+
+def _open_backup(path: Path):
+    """Open a backup file for reading as text, picking the codec from its extension."""
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.name.endswith(".zst"):
+        import zstandard
+        raw = zstandard.ZstdDecompressor().stream_reader(path.open("rb"), read_across_frames=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+def _compress_block(name: str, data: bytes) -> bytes:
+    # Concatenated gzip members / zstd frames still read as one stream
+    if name.endswith(".gz"):
+        return gzip.compress(data)
+    if name.endswith(".zst"):
+        import zstandard
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+def _decompress_block(name: str, data: bytes) -> bytes:
+    if name.endswith(".gz"):
+        return gzip.decompress(data)
+    if name.endswith(".zst"):
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+def _open_index(path: Path):
+    """The backup's index connection, or None if it is missing or stale."""
+    idx = _index_path(path)
+    if not idx.exists():
+        return None
+    try:
+        db = sqlite3.connect(idx)
+        row = db.execute("SELECT value FROM meta WHERE key = 'size'").fetchone()
+        if row and int(row[0]) == path.stat().st_size:
+            return db
+        db.close()
+    except (sqlite3.Error, OSError, ValueError):
+        pass
+    logger.warning(f"Ignoring stale backup index {idx.name}")
+    return None
+
+def _remove_backup(p: Path):
+    p.unlink()
+    _index_path(p).unlink(missing_ok=True)
+
+def _backup_header(path: Path) -> dict:
+    with _open_backup(path) as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            header = None
+    if not isinstance(header, dict) or header.get("version") != "2.0":
+        return {"version": "1.0", "type": "full"}  # older single-document backup
+    header.setdefault("type", "full")
+    return header
+
+def _iter_records(path: Path):
+    """Yield the raw (ratingKey, record) pairs stored in one backup file."""
+    with _open_backup(path) as f:
+        first = f.readline()
+        try:
+            header = json.loads(first)
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get("version") != "2.0":
+            metadata = json.loads(first + f.read())
+            yield from metadata.get("data", metadata).items()  # backward compatible if old format
+            return
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record.pop("ratingKey"), record
+
+def backup_chain(path: Path) -> List[Path]:
+    """The files needed to restore `path`: its full snapshot, then each diff in order."""
+    path = Path(path)
+    chain = [path]
+    header = _backup_header(path)
+    while header["type"] == "diff":
+        parent = path.parent / header["parent"]
+        if not parent.exists():
+            raise FileNotFoundError(f"Backup chain is broken: {parent.name} (needed by {chain[-1].name}) is missing")
+        chain.append(parent)
+        header = _backup_header(parent)
+    return chain[::-1]
+
+def _resolve_backup(chain: List[Path]) -> dict:
+    state = {}
+    for p in chain:
+        for rating_key, record in _iter_records(p):
+            if record.get("deleted"):
+                state.pop(rating_key, None)
+            else:
+                state[rating_key] = record
+    return state
+
+def iter_backup(path: Path):
+    """Yield (ratingKey, {"title", "editionTitle"}) for every movie at a backup point."""
+    path = Path(path)
+    if _backup_header(path)["type"] == "diff":
+        yield from _resolve_backup(backup_chain(path)).items()
+    else:
+        yield from _iter_records(path)
+
+def _write_backup(backup_path: Path, records, shard=None, header: dict | None = None) -> int:
+    """Stream records to backup_path and its index via temp files; returns the record count."""
+    header = {
+        "version": "2.0",
+        "type": "full",
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        **(header or {}),
+    }
+    if shard:
+        header["shard"] = f"{shard[0]}/{shard[1]}"
+    backup_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # atomic-ish write
+    tmp = backup_path.with_name(backup_path.name + ".tmp")
+    tmp_idx = _index_path(tmp)
+    tmp_idx.unlink(missing_ok=True)
+    n = 0
+    try:
+        with closing(sqlite3.connect(tmp_idx)) as db, tmp.open('wb') as f:
+            db.executescript(
+                "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);"
+                "CREATE TABLE blocks (id INTEGER PRIMARY KEY, offset INTEGER, length INTEGER);"
+                "CREATE TABLE records (rating_key TEXT PRIMARY KEY, library TEXT, block INTEGER);"
+            )
+
+            def _flush(lines, keys):
+                data = _compress_block(backup_path.name, "".join(lines).encode("utf-8"))
+                cur = db.execute("INSERT INTO blocks (offset, length) VALUES (?, ?)", (f.tell(), len(data)))
+                f.write(data)
+                db.executemany(
+                    "INSERT OR REPLACE INTO records VALUES (?, ?, ?)",
+                    [(key, library, cur.lastrowid) for key, library in keys]
+                )
+
+            _flush([json.dumps(header) + "\n"], [])
+            lines, keys = [], []
+            for rating_key, meta in records:
+                lines.append(json.dumps({"ratingKey": rating_key, **meta}, ensure_ascii=False) + "\n")
+                keys.append((str(rating_key), meta.get("library")))
+                n += 1
+                if len(lines) >= BACKUP_BLOCK_SIZE:
+                    _flush(lines, keys)
+                    lines, keys = [], []
+            if lines:
+                _flush(lines, keys)
+            db.execute("CREATE INDEX records_library ON records (library)")
+            db.execute("INSERT INTO meta VALUES ('size', ?)", (str(f.tell()),))
+            db.commit()
+        tmp.replace(backup_path)
+        tmp_idx.replace(_index_path(backup_path))
+    finally:
+        tmp.unlink(missing_ok=True)
+        tmp_idx.unlink(missing_ok=True)
+    return n
+
+def _lookup_file(path: Path, wanted: set | None, library: str | None):
+    """Yield (ratingKey, record) for the wanted keys or library in one backup file."""
+    db = _open_index(path)
+    if db is None:
+        # No index (older backup): scan the whole file
+        for rating_key, record in _iter_records(path):
+            if (wanted is None or str(rating_key) in wanted) and (library is None or record.get("library") == library):
+                yield str(rating_key), record
+        return
+
+    with closing(db):
+        if wanted is not None:
+            rows = []
+            keys = sorted(wanted)
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows += db.execute(
+                    f"SELECT rating_key, block FROM records WHERE rating_key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+        else:
+            rows = db.execute("SELECT rating_key, block FROM records WHERE library = ?", (library,)).fetchall()
+        by_block = defaultdict(set)
+        for rating_key, block in rows:
+            by_block[block].add(rating_key)
+        blocks = {
+            block: db.execute("SELECT offset, length FROM blocks WHERE id = ?", (block,)).fetchone()
+            for block in by_block
+        }
+
+    with path.open('rb') as f:
+        for block, keys in sorted(by_block.items()):
+            offset, length = blocks[block]
+            f.seek(offset)
+            for line in _decompress_block(path.name, f.read(length)).decode("utf-8").splitlines():
+                record = json.loads(line)
+                rating_key = str(record.pop("ratingKey"))
+                if rating_key in keys:
+                    yield rating_key, record
+
+def backup_lookup(path: Path, rating_keys=None, library: str | None = None) -> dict:
+    """Movies at a backup point selected by ratingKey or library, read through the index."""
+    wanted = {str(k) for k in rating_keys} if rating_keys else None
+    found = {}
+    for p in reversed(backup_chain(path)):
+        for rating_key, record in _lookup_file(p, wanted, library):
+            found.setdefault(rating_key, record)  # the newest point wins
+        if wanted is not None and wanted <= found.keys():
+            break
+    return {k: r for k, r in found.items() if not r.get("deleted")}
+
+def _store_backup(records, shard=None, backup_file: Path | None = None, full=False) -> Tuple[Path, int, int]:
+    """Write records as a full snapshot or as a diff on the newest backup.
+
+    Explicit files and shard backups are always full. Returns (path, movies,
+    records written).
+    """
+    if backup_file or shard:
+        path = Path(backup_file) if backup_file else _backup_filename(shard)
+        n = _write_backup(path, records, shard)
+        return path, n, n
+
+    parent = latest_backup()
+    chain = []
+    if parent and not full:
+        try:
+            chain = backup_chain(parent)
+        except FileNotFoundError as e:
+            logger.warning(f"{e}; taking a full backup")
+    full_every = int(_backup_option('full_every', str(BACKUP_FULL_EVERY)))
+    if not chain or len(chain) > full_every:
+        path = _backup_filename()
+        n = _write_backup(path, records)
+        return path, n, n
+
+    state = _resolve_backup(chain)
+    seen = 0
+
+    def _changes():
+        nonlocal seen
+        for rating_key, meta in records:
+            seen += 1
+            if state.pop(rating_key, None) != meta:
+                yield rating_key, meta
+        for rating_key, old in state.items():
+            yield rating_key, {"deleted": True, "library": old.get("library")}
+
+    path = _backup_filename(diff=True)
+    written = _write_backup(path, _changes(), header={"type": "diff", "parent": parent.name})
+    return path, seen, written
+
+def _iter_section_movies(server, headers, sections, page_size=BACKUP_PAGE_SIZE, max_workers=BACKUP_FETCH_WORKERS):
+    """Yield (section, movie) for every section, fetching sections and pages concurrently."""
+    from concurrent.futures import wait, FIRST_COMPLETED
+
+    def _page(key, start):
+        url = f"{server}/library/sections/{key}/all?X-Plex-Container-Start={start}&X-Plex-Container-Size={page_size}"
+        with _timed("list section"):
+            return (make_request(url, headers) or {}).get('MediaContainer', {})
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        by_key = {sec['key']: sec for sec in sections}
+        pages = {ex.submit(_page, sec['key'], 0): (sec['key'], 0) for sec in sections}
+        pending = set(pages)
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                key, start = pages.pop(fut)
+                container = fut.result()
+                movies = container.get('Metadata', []) or []
+                total = container.get('totalSize')
+                if start == 0 and total is not None:
+                    nexts = range(page_size, int(total), page_size)
+                elif total is None and len(movies) >= page_size:
+                    nexts = [start + page_size]  # server doesn't report totals; keep paging
+                else:
+                    nexts = []
+                for nxt in nexts:
+                    f = ex.submit(_page, key, nxt)
+                    pages[f] = (key, nxt)
+                    pending.add(f)
+                for movie in movies:
+                    yield by_key[key], movie
+
+def _backup_filename(shard: Tuple[int, int] | None = None, diff=False) -> Path:
     ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    return BACKUP_DIR / f"metadata_backup_{ts}.json"
+    ext = (".diff" if diff else "") + BACKUP_EXTENSIONS[_backup_compression()]
+    path = _state_dir() / f"metadata_backup_{ts}{_shard_suffix(shard)}{ext}"
+    n = 1
+    while path.exists():  # never overwrite a point another diff may chain on
+        n += 1
+        path = _state_dir() / f"metadata_backup_{ts}_{n}{_shard_suffix(shard)}{ext}"
+    return path
+
+def _is_backup_file(p: Path) -> bool:
+    return p.name.endswith(".json") or any(p.name.endswith(ext) for ext in BACKUP_EXTENSIONS.values())
+
+def _backup_time(p: Path) -> datetime | None:
+    m = re.match(r"metadata_backup_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})", p.name)
+    return datetime.strptime(m.group(1), "%Y-%m-%d_%H-%M-%S") if m else None
 
 def list_backups() -> List[Path]:
-    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
-    return sorted(BACKUP_DIR.glob("metadata_backup_*.json"))
+    """Every backup point, oldest first (full snapshots and diffs)."""
+    _state_dir().mkdir(parents=True, exist_ok=True)
+    return sorted(p for p in _state_dir().glob("metadata_backup_*") if _is_backup_file(p))
+
+def _is_shard_backup(p: Path) -> bool:
+    return ".shard-" in p.name
 
 def latest_backup() -> Path | None:
-    files = list_backups()
+    """The newest whole-library backup point."""
+    # Shard backups only hold part of the library: never restored by default
+    # and never the parent of a diff
+    files = [p for p in list_backups() if not _is_shard_backup(p)]
     return files[-1] if files else None
 
-def backup_metadata(server, token, backup_file: Path | None = None):
+def backup_at(when: datetime) -> Path | None:
+    """The newest whole-library backup point taken at or before `when`."""
+    best = None
+    for p in list_backups():
+        ts = _backup_time(p)
+        if ts and ts <= when and not _is_shard_backup(p):
+            best = p
+    return best
+
+def backup_metadata(server, token, backup_file: Path | None = None, shard=None, prune=True, full=False):
     headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
     libraries = make_request(f'{server}/library/sections', headers)['MediaContainer']['Directory']
+    sections = [lib for lib in libraries if lib.get('type') == 'movie']
+
+    records = (
+        (movie['ratingKey'], {
+            'title': movie.get('title', ''),
+            'editionTitle': movie.get('editionTitle', ''),
+            'library': sec.get('title', '')
+        })
+        for sec, movie in _iter_section_movies(server, headers, sections)
+        if in_shard(movie['ratingKey'], shard)
+    )
+    backup_path, n, written = _store_backup(records, shard, backup_file, full)
 
-    payload = {
-        "version": "1.0",
-        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
-        "data": {}
-    }
-
-    for lib in libraries:
-        if lib.get('type') == 'movie':
-            response = make_request(f"{server}/library/sections/{lib['key']}/all", headers)
-            for movie in response['MediaContainer'].get('Metadata', []) or []:
-                payload["data"][movie['ratingKey']] = {
-                    'title': movie.get('title', ''),
-                    'editionTitle': movie.get('editionTitle', '')
-                }
-
-    backup_path = Path(backup_file) if backup_file else _backup_filename()
-    backup_path.parent.mkdir(parents=True, exist_ok=True)
-
-    # atomic-ish write
-    tmp = backup_path.with_suffix(backup_path.suffix + ".tmp")
-    with tmp.open('w', encoding='utf-8') as f:
-        json.dump(payload, f, indent=2)
-    tmp.replace(backup_path)
+    _report_backup(backup_path, n, written)
+    if prune:
+        prune_old_backups()
+    return backup_path
 
-    print(f"Backup complete. {len(payload['data'])} movies saved to {backup_path}")
-    prune_old_backups(keep=4)
+def _report_backup(backup_path: Path, n: int, written: int):
+    if ".diff." in backup_path.name:
+        print(f"Backup complete. {n} movies, {written} changed since the previous backup, saved to {backup_path}")
+    else:
+        print(f"Backup complete. {n} movies saved to {backup_path}")
+
+def backup_metadata_parallel(jobs: int, shard=None, backup_file: Path | None = None, full=False):
+    """Back up with `jobs` worker processes, then merge their parts into one file."""
+    parts_dir = _state_dir() / '.parts'
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    part_prefix = f"{(Path(backup_file) if backup_file else _backup_filename(shard)).name.split('.')[0]}.part"
+    part_ext = BACKUP_EXTENSIONS[_backup_compression()]
+    summary = run_sharded_jobs(
+        ["--backup", "--no-prune", "--backup-file", str(parts_dir / f"{part_prefix}.{{shard}}{part_ext}")], jobs, shard
+    )
+    parts = sorted(parts_dir.glob(f"{part_prefix}.*{part_ext}"))
+    if summary.get("worker_errors") or _stop_event.is_set():
+        logger.error("Backup incomplete; not merging worker parts.")
+        for p in parts:
+            _remove_backup(p)
+        return None
+
+    def _records():
+        for p in parts:
+            yield from iter_backup(p)
+
+    backup_path, n, written = _store_backup(_records(), shard, backup_file, full)
+    for p in parts:
+        _remove_backup(p)
+
+    _report_backup(backup_path, n, written)
+    prune_old_backups()
     return backup_path
 
-def prune_old_backups(keep: int = 4) -> None:
-    files = sorted(BACKUP_DIR.glob("metadata_backup_*.json"))
-    if len(files) <= keep:
+def prune_old_backups(keep: int | None = None) -> None:
+    """Keep the newest `keep` chains: full snapshots and the diffs built on them."""
+    keep = keep or int(_backup_option('keep', str(BACKUP_KEEP_CHAINS)))
+    files = list_backups()
+    fulls = [i for i, p in enumerate(files) if ".diff." not in p.name and not _is_shard_backup(p)]
+    if len(fulls) <= keep:
         return
-    to_delete = files[:-keep]  # oldest first
+    to_delete, kept = files[:fulls[-keep]], files[fulls[-keep]:]  # oldest first
+    # Whatever a kept diff replays stays, even if it is older than the cut
+    needed = set()
+    for p in kept:
+        if ".diff." in p.name:
+            try:
+                needed.update(backup_chain(p))
+            except FileNotFoundError as e:
+                logger.warning(str(e))
     for p in to_delete:
+        if p in needed:
+            continue
         try:
-            p.unlink()
+            _remove_backup(p)
         except Exception as e:
             logger.warning(f"Could not delete old backup '{p}': {e}")
 
+def compact_backups(keep: int | None = None) -> Path | None:
+    """Fold the newest chain into a fresh full snapshot, then prune old chains.
+
+    Later backups diff against the new snapshot, so restoring them no longer
+    replays the old chain.
+    """
+    latest = latest_backup()
+    if not latest:
+        logger.info("No backups to compact.")
+        return None
+    if ".diff." not in latest.name:
+        logger.info(f"Newest backup {latest.name} is already a full snapshot.")
+        path = latest
+    else:
+        path = _backup_filename()
+        n = _write_backup(path, iter_backup(latest), header={"compacted_from": latest.name})
+        print(f"Compacted {len(backup_chain(latest))} backup files into {path} ({n} movies)")
+    prune_old_backups(keep)
+    return path
+
 # Restore metadata
-def restore_metadata(server, token, backup_file: Path | str | None):
+def _current_editions(server, token, library=None, rating_keys=None) -> dict:
+    """Current {ratingKey: editionTitle} of every movie, read from the section listings."""
+    headers = {'X-Plex-Token': token, 'Accept': 'application/json'}
+    if rating_keys and not library:
+        # A few movies: ask for them directly instead of listing every section
+        keys = sorted({str(k) for k in rating_keys})
+        current = {}
+        for i in range(0, len(keys), 100):
+            for movie in _metadata_batch(server, headers, keys[i:i + 100]):
+                current[str(movie['ratingKey'])] = movie.get('editionTitle', '')
+        return current
+    libraries = make_request(f'{server}/library/sections', headers)['MediaContainer']['Directory']
+    sections = [
+        lib for lib in libraries
+        if lib.get('type') == 'movie' and (library is None or lib.get('title') == library)
+    ]
+    return {
+        str(movie['ratingKey']): movie.get('editionTitle', '')
+        for _sec, movie in _iter_section_movies(server, headers, sections)
+    }
+
+RESTORE_PREVIEW_LINES = 20
+
+def restore_metadata(server, token, backup_file: Path | str | None, resume=False, rating_keys=None, library=None,
+                     max_workers=8, dry_run=False):
     if backup_file is None:
         # Fallback to latest backup if none specified
         bf = latest_backup()
@@ -619,11 +3198,49 @@ def restore_metadata(server, token, backup_file: Path | str | None):
         logger.error(f"Backup file not found: {backup_file}")
         return
 
-    with backup_file.open('r', encoding='utf-8') as f:
-        metadata = json.load(f)
+    signature = {"server": server, "backup": str(backup_file.resolve())}
+    if rating_keys or library:
+        # Only the selected movies: read them through the backup index
+        selected = backup_lookup(backup_file, rating_keys, library)
+        missing = sorted({str(k) for k in rating_keys or []} - selected.keys())
+        if missing:
+            logger.warning(f"Not in backup: {', '.join(missing)}")
+        if library and not selected:
+            logger.warning(f"No movies from library '{library}' in this backup (backups before libraries were recorded can't be filtered by library)")
+        backup_items = selected.items()
+        signature.update(rating_keys=sorted(str(k) for k in rating_keys or []), library=library)
+    else:
+        backup_items = iter_backup(backup_file)
+
+    # Only write movies whose current edition differs from the backup
+    current = _current_editions(server, token, library, rating_keys)
+    items, unchanged, gone = [], 0, 0
+    for movie_id, meta in backup_items:
+        now = current.get(str(movie_id))
+        if now is None:
+            gone += 1
+        elif now == meta.get('editionTitle', ''):
+            unchanged += 1
+        else:
+            items.append((meta.get('library', ''), movie_id, (movie_id, meta)))
+    logger.info(
+        f"Backup vs. server: {len(items)} to change, {unchanged} already match, "
+        f"{gone} no longer on the server"
+    )
+
+    if dry_run:
+        for _lib, movie_id, (_id, meta) in items[:RESTORE_PREVIEW_LINES]:
+            print(f"  {meta.get('title', movie_id)}: '{current[str(movie_id)]}' -> '{meta.get('editionTitle', '')}'")
+        if len(items) > RESTORE_PREVIEW_LINES:
+            print(f"  ... and {len(items) - RESTORE_PREVIEW_LINES} more")
+        logger.info("Dry run: nothing was written.")
+        return {"total": len(items), "done": 0, "failed": 0, "cancelled": 0, "interrupted": False}
 
-    data = metadata.get("data", metadata)  # backward compatible if old format
-    items = list(data.items())
+    checkpoint = Checkpoint("restore", signature)
+    done = checkpoint.start(resume)
+    if done:
+        items = [t for t in items if t[1] not in done]
+        logger.info(f"Resuming: {len(done)} movies already restored, {len(items)} remaining")
 
     logger.info(f"Starting restore from {backup_file} for {len(items)} movies")
     _progress_set_total(len(items))
@@ -634,53 +3251,215 @@ def restore_metadata(server, token, backup_file: Path | str | None):
         params = {'type': 1, 'id': movie_id, 'editionTitle.value': edition, 'editionTitle.locked': 1 if edition else 0}
         s = get_session()
         try:
-            s.put(f'{server}/library/metadata/{movie_id}', headers={'X-Plex-Token': token}, params=params)
+            with _timed("write edition"):
+                s.put(f'{server}/library/metadata/{movie_id}', headers={'X-Plex-Token': token}, params=params).raise_for_status()
         except Exception as e:
             logger.error(f"Failed restore id={movie_id}: {e}")
-        finally:
-            _progress_step()
+            raise
+        # Whoever set the restored edition, it isn't the one we last wrote
+        edition_log().record(movie_id, "")
 
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    with ThreadPoolExecutor(max_workers=8) as ex:
-        futures = [ex.submit(_restore_one, p) for p in items]
-        for _ in as_completed(futures):
-            pass
+    summary = _run_jobs(items, _restore_one, max_workers, checkpoint=checkpoint)
+
+    if not summary["interrupted"]:
+        logger.info("Restore complete.")
+    return summary
 
-    logger.info("Restore complete.")
+def _backup_summary(path: Path | None) -> dict:
+    if not path:
+        return {"total": 0, "done": 0, "failed": 1}
+    n = sum(1 for _ in iter_backup(path))
+    return {"total": n, "done": n}
 
 def main():
-    (
-        server,
-        token,
-        skip_libraries,
-        modules,
-        excluded_languages,
-        skip_multiple_audio_tracks,
-        tmdb_api_key,
-        max_workers,
-        batch_size
-    ) = initialize_settings()
-    
     parser = argparse.ArgumentParser(description='Manage Plex server movie editions')
     parser.add_argument('--all', action='store_true', help='Add edition info to all movies')
     parser.add_argument('--one', action='store_true',
                     help='Interactively search and process a single movie')
     parser.add_argument('--one-id', dest='one_id', metavar='RATINGKEY',
                         help='Process a single movie by ratingKey (non-interactive; used by GUI)')
+    parser.add_argument('--ids-from', dest='ids_from', metavar='FILE',
+                        help='Process the ratingKeys listed in FILE ("-" for stdin), one per line or as JSON lines')
     parser.add_argument('--reset', action='store_true', help='Reset edition info for all movies')
     parser.add_argument('--backup', action='store_true', help='Backup movie metadata')
     parser.add_argument('--restore', action='store_true', help='Restore movie metadata from backup')
     parser.add_argument('--list-backups', action='store_true', help='List available backup files')
     parser.add_argument('--restore-file', dest='restore_file', metavar='PATH', help='Restore from a specific backup file')
+    parser.add_argument('--restore-at', dest='restore_at', metavar='TIME',
+                        help='Restore the newest backup taken at or before TIME (e.g. "2024-05-01 18:00")')
+    parser.add_argument('--restore-id', dest='restore_id', action='append', metavar='RATINGKEY',
+                        help='Only restore this movie (repeatable); works with --restore, --restore-file and --restore-at')
+    parser.add_argument('--restore-library', dest='restore_library', metavar='NAME',
+                        help='Only restore movies from this library')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only show what --all, --one, --reset or a restore would change')
+    parser.add_argument('--plan', metavar='FILE',
+                        help='Compute the edition of every movie without writing and save the proposed changes to FILE')
+    parser.add_argument('--apply', metavar='FILE', help='Write the changed editions from a --plan FILE')
+    parser.add_argument('--apply-rate', type=float, default=0, metavar='N',
+                        help='With --apply: at most N writes per second (default: unlimited)')
+    parser.add_argument('--sync-cache', action='store_true',
+                        help='Refresh the local library cache (only new or changed movies are fetched)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Read libraries and movie metadata from the local cache; only edition writes go to Plex')
+    parser.add_argument('--full', action='store_true', help='With --backup: take a full snapshot instead of a diff')
+    parser.add_argument('--compact-backups', action='store_true',
+                        help='Fold the newest backup chain into a full snapshot and prune old chains')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted --all, --reset or --restore run from its checkpoint')
+    parser.add_argument('--shard', type=parse_shard, metavar='I/N',
+                        help='Only handle movies in shard I of N (split by ratingKey hash) for --all, --reset or --backup')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='Split --all, --reset or --backup across N local worker processes')
+    parser.add_argument('--backup-file', dest='backup_file', metavar='PATH',
+                        help='Write --backup to PATH instead of a timestamped file')
+    parser.add_argument('--library', action='append', metavar='NAME',
+                        help='Only handle this library (name or section id; repeatable) for --all, --reset or --plan')
+    parser.add_argument('--since', type=when_spec, metavar='WHEN',
+                        help='Only movies added since WHEN (e.g. 7d, 12h, 2024-05-01)')
+    parser.add_argument('--updated-since', dest='updated_since', type=when_spec, metavar='WHEN',
+                        help='Only movies whose metadata changed since WHEN')
+    parser.add_argument('--recent', type=int, metavar='N', help='Only the N most recently added movies')
+    parser.add_argument('--collection', metavar='NAME', help='Only movies in this collection')
+    parser.add_argument('--server', metavar='NAME',
+                        help='Use the [server.NAME] section of config.ini instead of [server]')
+    parser.add_argument('--all-servers', action='store_true',
+                        help='Run --all, --reset or --backup on every configured server in parallel')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time every stage and module call and print a breakdown at the end')
+    parser.add_argument('--profile-json', dest='profile_json', metavar='FILE',
+                        help='Also write the --profile breakdown to FILE as JSON')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Write a Chrome trace (open in Perfetto) with a span per movie, stage and HTTP call')
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument('--quiet', action='store_true', help='Only log warnings and errors')
+    verbosity.add_argument('--verbose', action='store_true',
+                           help='Also log debug details, including the time of every stage and module')
+    parser.add_argument('--log-format', choices=('text', 'json'), default='text',
+                        help='json: one JSON object per log line with ratingKey, title, module and timing fields')
+    parser.add_argument('--movie-lines', choices=('all', 'sample', 'none'),
+                        help=f'Per-movie log lines in bulk runs (default: sample, at most '
+                             f'{MOVIE_LINES_PER_SECOND} a second; all with --verbose)')
+    parser.add_argument('--events', choices=('jsonl',),
+                        help='Print progress (with rate and ETA), per-movie results and a summary as JSON lines')
+    parser.add_argument('--no-prune', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--scope-now', dest='scope_now', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--progress-format', choices=('percent', 'counts'), default='percent', help=argparse.SUPPRESS)
     
     args = parser.parse_args()
+    if args.all_servers and (args.server or args.backup_file):
+        parser.error("--all-servers cannot be combined with --server or --backup-file")
+    if args.trace and (args.jobs > 1 or args.all_servers):
+        parser.error("--trace records a single process; it cannot be combined with --jobs or --all-servers")
+    install_stop_handlers()
+
+    global _progress_format, _server_name, _cache, _dry_run, _module_cache, _profiler, _tracer, _log_timings
+    started = time.monotonic()
+    configure_logging(
+        logging.WARNING if args.quiet else logging.DEBUG if args.verbose else logging.INFO,
+        args.log_format,
+        args.movie_lines or ("all" if args.verbose else "sample"),
+    )
+    _log_timings = args.verbose
+    _progress_format = "events" if args.events else args.progress_format
+    _server_name = args.server if args.server and args.server != DEFAULT_SERVER else None
+    _dry_run = args.dry_run
+    module_cache = _config_option('performance', 'PERFORMANCE', 'module_cache', 'network').strip().lower()
+    if module_cache in ('network', 'all', 'true', '1', 'yes'):
+        _module_cache = ModuleCache(network_only=module_cache == 'network')
+    if args.profile or args.profile_json:
+        _profiler = Profiler()
+    if args.trace:
+        _tracer = Tracer()
+    if args.offline:
+        _cache = LibraryCache()
+        if _cache.is_empty():
+            parser.error("the library cache is empty; run --sync-cache first")
+    summary = None
+    bulk = args.all or args.reset or args.backup
+    passthrough = [f for f, on in (("--offline", args.offline), ("--dry-run", args.dry_run),
+                                   ("--profile", _profiler is not None), ("--quiet", args.quiet),
+                                   ("--verbose", args.verbose)) if on]
+    passthrough += ["--log-format", args.log_format]
+    if args.movie_lines:
+        passthrough += ["--movie-lines", args.movie_lines]
+    scope = {
+        k: v for k, v in (
+            ("libraries", args.library), ("added_since", args.since), ("updated_since", args.updated_since),
+            ("recent", args.recent), ("collection", args.collection),
+        ) if v
+    } or None
+    # Relative times (--since 7d) count back from here
+    scope_now = args.scope_now or int(time.time())
+    if scope:
+        # Child processes get the times as typed, for their checkpoints, and
+        # scope_now, so every worker uses the same cut-off
+        for flag, value in (("--since", args.since), ("--updated-since", args.updated_since),
+                            ("--recent", args.recent), ("--collection", args.collection)):
+            if value:
+                passthrough += [flag, str(value)]
+        for name in args.library or []:
+            passthrough += ["--library", name]
+        passthrough += ["--scope-now", str(scope_now)]
+
+    if not (args.all_servers and bulk):
+        (
+            server,
+            token,
+            skip_libraries,
+            modules,
+            excluded_languages,
+            skip_multiple_audio_tracks,
+            tmdb_api_key,
+            max_workers,
+            batch_size
+        ) = initialize_settings(args.server, check_connection=not args.offline)
+
+    if args.all_servers and bulk:
+        # One child process per server; each may fan out further with --jobs
+        action = ["--all"] if args.all else ["--reset"] if args.reset else ["--backup"]
+        if args.resume:
+            action.append("--resume")
+        if args.full:
+            action.append("--full")
+        action += passthrough
+        if args.jobs > 1:
+            action += ["--jobs", str(args.jobs)]
+        if args.shard:
+            action += ["--shard", f"{args.shard[0]}/{args.shard[1]}"]
+        summary = run_all_servers(action, configured_servers())
+
+    # --jobs N: hand the bulk action to N worker processes and merge their results
+    elif args.jobs > 1 and bulk:
+        if args.backup:
+            path = backup_metadata_parallel(args.jobs, args.shard, args.backup_file, full=args.full)
+            summary = _backup_summary(path)
+            logger.info('Metadata backup completed.')
+        else:
+            action = ["--all"] if args.all else ["--reset"]
+            if args.resume:
+                action.append("--resume")
+            summary = run_sharded_jobs(action + passthrough, args.jobs, args.shard)
 
-    if args.one_id:
+    elif args.one_id:
         ok = process_movie_by_rating_key(
             server, token, args.one_id, modules, excluded_languages, skip_multiple_audio_tracks, tmdb_api_key
         )
         logger.info('Done.' if ok else 'Failed.')
 
+    elif args.ids_from:
+        if args.ids_from == "-":
+            summary = process_ids(
+                server, token, sys.stdin, modules, excluded_languages, skip_multiple_audio_tracks,
+                tmdb_api_key, max_workers
+            )
+        else:
+            with open(args.ids_from, 'r', encoding='utf-8') as f:
+                summary = process_ids(
+                    server, token, f, modules, excluded_languages, skip_multiple_audio_tracks,
+                    tmdb_api_key, max_workers
+                )
+
     elif args.one:
         # Interactive terminal flow
         title = input("Enter movie title to search: ").strip()
@@ -716,30 +3495,79 @@ def main():
         logger.info('Done.' if ok else 'Failed.')
 
     elif args.backup:
-        backup_metadata(server, token, None)
+        path = backup_metadata(server, token, args.backup_file, shard=args.shard, prune=not args.no_prune, full=args.full)
+        if _progress_format == "counts":
+            summary = _backup_summary(path)
         logger.info('Metadata backup completed.')
 
     elif args.restore_file:
-        restore_metadata(server, token, args.restore_file)
+        summary = restore_metadata(server, token, args.restore_file, resume=args.resume,
+                         rating_keys=args.restore_id, library=args.restore_library,
+                         max_workers=max_workers, dry_run=args.dry_run)
         logger.info('Metadata restoration completed.')
 
-    elif args.restore:
+    elif args.restore_at:
+        try:
+            when = datetime.fromisoformat(args.restore_at)
+        except ValueError:
+            parser.error(f"invalid --restore-at time '{args.restore_at}'")
+        path = backup_at(when)
+        if not path:
+            logger.error(f"No backup taken at or before {when}.")
+        else:
+            logger.info(f"Using backup {path.name}")
+            summary = restore_metadata(server, token, path, resume=args.resume,
+                             rating_keys=args.restore_id, library=args.restore_library,
+                             max_workers=max_workers, dry_run=args.dry_run)
+            logger.info('Metadata restoration completed.')
+
+    elif args.plan:
+        summary = plan_movies(
+            server,
+            token,
+            skip_libraries,
+            modules,
+            excluded_languages,
+            skip_multiple_audio_tracks,
+            tmdb_api_key,
+            max_workers,
+            batch_size,
+            args.plan,
+            shard=args.shard,
+            scope=scope,
+            scope_now=scope_now
+        )
+
+    elif args.apply:
+        summary = apply_plan(server, token, args.apply, max_workers, batch_size, args.apply_rate, resume=args.resume)
+
+    elif args.sync_cache:
+        summary = LibraryCache().sync(server, token, max_workers)
+        logger.info('Library cache is up to date.')
+
+    elif args.compact_backups:
+        compact_backups()
+        logger.info('Backup compaction completed.')
+
+    elif args.restore or args.restore_id or args.restore_library:
         # Restore using the latest timestamped backup automatically
-        restore_metadata(server, token, None)
+        summary = restore_metadata(server, token, None, resume=args.resume,
+                         rating_keys=args.restore_id, library=args.restore_library,
+                         max_workers=max_workers, dry_run=args.dry_run)
         logger.info('Metadata restoration completed.')
 
     elif args.list_backups:
         files = list_backups()
         if not files:
-            print("No backups found in", BACKUP_DIR)
+            print("No backups found in", _state_dir())
         else:
             print("Available backups:")
             for p in files:
-                print(" -", p)
+                print(" -", p, "(diff)" if ".diff." in p.name else "(full)")
         logger.info('Listed backups.')
 
     elif args.all:
-        process_movies(
+        summary = process_movies(
             server,
             token,
             skip_libraries,
@@ -748,16 +3576,24 @@ def main():
             skip_multiple_audio_tracks,
             tmdb_api_key,
             max_workers,
-            batch_size
+            batch_size,
+            resume=args.resume,
+            shard=args.shard,
+            scope=scope,
+            scope_now=scope_now
         )
 
     elif args.reset:
-        reset_movies(
+        summary = reset_movies(
             server,
             token,
             skip_libraries,
             max_workers,
-            batch_size
+            batch_size,
+            resume=args.resume,
+            shard=args.shard,
+            scope=scope,
+            scope_now=scope_now
         )
 
     else:
@@ -767,8 +3603,33 @@ def main():
         logger.info('  --reset: Reset edition info for all movies')
         logger.info('  --backup: Backup movie metadata')
         logger.info('  --restore: Restore movie metadata from backup')
+        logger.info('  --compact-backups: Fold backup diffs into a full snapshot')
+
+    if _progress_format == "counts" and summary is not None:
+        print("SUMMARY " + json.dumps(summary)); sys.stdout.flush()
+    elif _progress_format == "events":
+        elapsed = time.monotonic() - started
+        summary = dict(summary or {})
+        summary.setdefault("interrupted", _stop_event.is_set())
+        _write_event("summary", flush=True, **summary, elapsed=round(elapsed, 1),
+                     rate=round(summary.get("done", 0) / elapsed, 2) if elapsed > 0 else 0.0)
+
+    if _profiler:
+        _profiler.report()
+        if args.profile_json:
+            Path(args.profile_json).write_text(json.dumps({
+                "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+                "argv": sys.argv[1:],
+                "stages": _profiler.summary(),
+            }, indent=2))
+            logger.info(f"Profile written to {args.profile_json}")
+    if _tracer:
+        events = _tracer.write(args.trace)
+        logger.info(f"Trace with {events} spans written to {args.trace}")
 
     logger.info('Script execution completed.')
+    if _stop_event.is_set():
+        raise SystemExit(130)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
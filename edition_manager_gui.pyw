@@ -1,8 +1,10 @@
 import os
 import sys
 import re
+import json
 import configparser
 import random
+import tempfile
 import requests
 from pathlib import Path
 from collections import deque
@@ -31,6 +33,7 @@ if _msg_file.exists():
 APP_VERSION = f"{_version} - {_tagline}" if _tagline else _version
 PRIMARY_SCRIPT = "edition_manager.py"
 CONFIG_FILE = str(Path(__file__).parent / "config" / "config.ini")
+CANCEL_GRACE_MS = 15000
 
 DEFAULT_MODULES = [
     "AudioChannels", "AudioCodec", "Bitrate", "ContentRating", "Country", "Cut",
@@ -86,13 +89,21 @@ class ProcessWorker(QtCore.QObject):
     started = QtCore.Signal()
     line = QtCore.Signal(str)
     progress = QtCore.Signal(int)
+    stats = QtCore.Signal(str)
     finished = QtCore.Signal(int)
 
-    def __init__(self, flag: str, parent=None):
+    def __init__(self, flag, parent=None):
         super().__init__(parent)
-        self.flag = flag
+        self.flags = [flag] if isinstance(flag, str) else list(flag)
+        self._partial = ""
         self.proc = QtCore.QProcess(self)
         self.proc.setProcessChannelMode(QtCore.QProcess.MergedChannels)
+        # Cancel creates this file; the engine (and its --jobs children) watch it
+        # and stop cleanly, since terminate() is a hard kill on Windows
+        self.stop_file = Path(tempfile.gettempdir()) / f"edition-manager-stop-{os.getpid()}-{id(self):x}"
+        env = QtCore.QProcessEnvironment.systemEnvironment()
+        env.insert("EDITION_MANAGER_STOP_FILE", str(self.stop_file))
+        self.proc.setProcessEnvironment(env)
         if sys.platform.startswith("win"):
             def _no_console(args):
                 args["creationFlags"] = 0x08000000
@@ -117,15 +128,51 @@ class ProcessWorker(QtCore.QObject):
             self.line.emit(f"Error: '{PRIMARY_SCRIPT}' not found next to GUI.")
             self.finished.emit(1)
             return
-        args = [script_path, self.flag]
+        args = [script_path, *self.flags]
         self.line.emit("Running: {} {}".format(python, " ".join(args)))
-        self.proc.start(python, args)
+        self.stop_file.unlink(missing_ok=True)
+        self.proc.start(python, [*args, "--events", "jsonl"])
+
+    def request_stop(self):
+        """Ask the engine to drain and checkpoint; SIGTERM as well where that works."""
+        try:
+            self.stop_file.touch()
+        except OSError:
+            pass
+        if not sys.platform.startswith("win"):
+            self.proc.terminate()
+
+    def _event(self, event: dict):
+        kind = event.get("event")
+        if kind == "start":
+            self.progress.emit(0)
+        elif kind == "progress":
+            self.progress.emit(int(event.get("percent") or 0))
+            text = f"{event.get('done', 0)}/{event.get('total', 0)} · {event.get('rate') or 0:.1f} movies/s"
+            if event.get("eta"):
+                m, s = divmod(int(event["eta"]), 60)
+                text += f" · ETA {m}:{s:02d}"
+            self.stats.emit(text)
+        elif kind == "summary" and "total" in event:
+            self.line.emit(
+                f"Summary: {event.get('done', 0)}/{event['total']} done, {event.get('failed', 0)} failed "
+                f"in {event.get('elapsed', 0):.0f}s"
+            )
 
     @QtCore.Slot()
     def _read(self):
-        data = self.proc.readAllStandardOutput().data().decode(errors="replace")
-        for raw in data.splitlines():
-            s = raw.rstrip("\n")
+        data = self._partial + self.proc.readAllStandardOutput().data().decode(errors="replace")
+        lines = data.split("\n")
+        self._partial = lines.pop()  # incomplete last line, finished by the next read
+        for raw in lines:
+            s = raw.rstrip("\r")
+
+            if s.startswith('{"event"'):
+                try:
+                    self._event(json.loads(s))
+                except ValueError:
+                    self.line.emit(s)
+                continue
 
             if s.startswith("PROGRESS "):
                 try:
@@ -140,6 +187,10 @@ class ProcessWorker(QtCore.QObject):
 
     @QtCore.Slot(int, QtCore.QProcess.ExitStatus)
     def _done(self, code: int, _status):
+        self.stop_file.unlink(missing_ok=True)
+        if self._partial:
+            self.line.emit(self._partial)
+            self._partial = ""
         self.finished.emit(code)
 
 class ModulesList(QtWidgets.QListWidget):
@@ -785,17 +836,29 @@ class MainWindow(QtWidgets.QMainWindow):
         # self.tray.show()
 
     def cancel_current_operation(self):
-        """Cancel the currently running background process."""
+        """Cancel the currently running background process.
+
+        The engine is asked to stop first (stop file, plus SIGTERM off Windows)
+        so it can let in-flight movies finish and save its checkpoint; it is
+        killed if it hasn't exited after CANCEL_GRACE_MS.
+        """
         if self._current_worker and self._current_worker.proc.state() == QtCore.QProcess.Running:
-            self._current_worker.proc.kill()
-            self.append_status("Operation cancelled by user.")
-            self._current_worker = None
-            self.progress.setRange(0, 100)
-            self.set_progress(0)
-            self._set_buttons_enabled(True)
+            proc = self._current_worker.proc
+            self._current_worker.request_stop()
+            QtCore.QTimer.singleShot(CANCEL_GRACE_MS, lambda: self._kill_if_running(proc))
+            self.append_status("Cancelling… finishing in-flight work and saving a checkpoint (use --resume to continue).")
+            self.btn_cancel.setEnabled(False)
         else:
             self.append_status("No active operation to cancel.")
 
+    def _kill_if_running(self, proc):
+        try:
+            if proc.state() != QtCore.QProcess.NotRunning:
+                proc.kill()
+                self.append_status("Operation killed after cancel timeout.")
+        except RuntimeError:
+            pass  # process object already deleted
+
     def open_search(self):
         dlg = SearchDialog(self._cfg_server_base(), self._cfg_token(), self)
         if dlg.exec() == QtWidgets.QDialog.Accepted:
@@ -937,7 +1000,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self._apply_webhook_state()
 
     # --- Process execution ---
-    def run_flag(self, flag: str):
+    def run_flag(self, flag):
         if self._current_worker is not None:
             return
         self._set_buttons_enabled(False)
@@ -945,6 +1008,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self._current_worker = ProcessWorker(flag)
         self._current_worker.line.connect(self.append_status)
         self._current_worker.progress.connect(self.set_progress)
+        self._current_worker.stats.connect(self.set_progress_stats)
         self._current_worker.started.connect(self._on_started)
         self._current_worker.finished.connect(self._on_finished)
 
@@ -952,12 +1016,15 @@ class MainWindow(QtWidgets.QMainWindow):
 
     @QtCore.Slot()
     def _on_started(self):
+        self.progress.setFormat("%p%")
         self.progress.setRange(0, 0)
 
     @QtCore.Slot(int)
     def _on_finished(self, code: int):
         self._current_worker = None
+        self.progress.setFormat("%p%")
         self._set_buttons_enabled(True)
+        self.btn_cancel.setEnabled(True)
         if self.progress.maximum() == 0:
             self.progress.setRange(0, 100)
         if code == 0:
@@ -973,6 +1040,10 @@ class MainWindow(QtWidgets.QMainWindow):
         value = max(0, min(100, value))
         self.progress.setValue(value)
 
+    @QtCore.Slot(str)
+    def set_progress_stats(self, text: str):
+        self.progress.setFormat(f"%p% · {text}")
+
     def _update_percent(self):
         if self.progress.maximum() == 0:
             self.percent_lab.setText("…")
@@ -1079,15 +1150,30 @@ class MainWindow(QtWidgets.QMainWindow):
         start_dir = str((Path(__file__).parent / "metadata_backup").resolve())
         dlg = QtWidgets.QFileDialog(self, "Choose Edition Manager backup")
         dlg.setFileMode(QtWidgets.QFileDialog.ExistingFile)
-        dlg.setNameFilters(["JSON Backups (*.json)", "All Files (*)"])
+        dlg.setNameFilters(["Backups (*.jsonl.gz *.jsonl.zst *.jsonl *.json)", "All Files (*)"])
         dlg.setDirectory(start_dir)
 
         if dlg.exec() == QtWidgets.QDialog.Accepted:
             paths = dlg.selectedFiles()
             if paths:
                 path = paths[0]
+                scopes = ["Everything", "One movie (ratingKey)", "One library"]
+                scope, ok = QtWidgets.QInputDialog.getItem(
+                    self, "Restore from backup", "Restore:", scopes, 0, False
+                )
+                if not ok:
+                    return
                 # call CLI with explicit file path
-                self.run_flag(f"--restore-file={path}")
+                flags = [f"--restore-file={path}"]
+                if scope != scopes[0]:
+                    # Asked separately: a library may well be named "2024"
+                    label = "ratingKey:" if scope == scopes[1] else "Library name:"
+                    only, ok = QtWidgets.QInputDialog.getText(self, "Restore from backup", label)
+                    only = only.strip()
+                    if not ok or not only:
+                        return
+                    flags.append(f"--restore-id={only}" if scope == scopes[1] else f"--restore-library={only}")
+                self.run_flag(flags)
 
     @QtCore.Slot(int, QtCore.QProcess.ExitStatus)
     def _on_webhook_finished(self, code: int, _status):
@@ -1,4 +1,19 @@
-def get_AudioChannels(movie_data):
+VERSION = 1
+INPUTS = ('Media.Part.Stream.streamType', 'Media.Part.Stream.channels')
+
+MAPPING = {
+    1: "1.0",
+    2: "2.0",
+    3: "2.1",
+    4: "4.0",
+    5: "5.0",
+    6: "5.1",
+    7: "6.1",
+    8: "7.1",
+}
+
+def column(movie_data):
+    """Highest audio channel count over all streams (0 if none)."""
     best_channels = 0
 
     for media in movie_data.get('Media', []):
@@ -8,18 +23,16 @@ def get_AudioChannels(movie_data):
                     ch = stream.get('channels', 0)
                     if ch and ch > best_channels:
                         best_channels = ch
+    return best_channels
 
+def _label(best_channels):
     if best_channels == 0:
         return None
+    return MAPPING.get(best_channels, f"{best_channels}-ch")
+
+def get_AudioChannels(movie_data):
+    return _label(column(movie_data))
 
-    mapping = {
-        1: "1.0",
-        2: "2.0",
-        3: "2.1",
-        4: "4.0",
-        5: "5.0",
-        6: "5.1",
-        7: "6.1",
-        8: "7.1",
-    }
-    return mapping.get(best_channels, f"{best_channels}-ch")
\ No newline at end of file
+def get_AudioChannels_batch(channel_counts):
+    """get_AudioChannels for a column of column() values."""
+    return [_label(ch) for ch in channel_counts]
\ No newline at end of file
@@ -1,3 +1,15 @@
+VERSION = 1
+INPUTS = (
+    'Media.Part.Stream.streamType',
+    'Media.Part.Stream.channels',
+    'Media.Part.Stream.bitrate',
+    'Media.Part.Stream.codec',
+    'Media.Part.Stream.profile',
+    'Media.Part.Stream.title',
+    'Media.Part.Stream.displayTitle',
+    'Media.Part.Stream.audioProfile',
+)
+
 def get_AudioCodec(movie_data):
     best = None
     for media in movie_data.get('Media', []):
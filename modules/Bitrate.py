@@ -1,6 +1,10 @@
 import requests
 
-def get_Bitrate(movie_data):
+VERSION = 1
+INPUTS = ('Media.bitrate', 'Media.Part.size')
+
+def column(movie_data):
+    """Bitrate of the media holding the largest part (None if unknown)."""
     max_size = 0
     best_bitrate = None
 
@@ -11,7 +15,9 @@ def get_Bitrate(movie_data):
             if size > max_size:
                 max_size = size
                 best_bitrate = br
+    return best_bitrate
 
+def _label(best_bitrate):
     if best_bitrate is None:
         return None
 
@@ -25,3 +31,11 @@ def get_Bitrate(movie_data):
         return f"{mbps:.1f} Mbps"
     else:
         return f"{int(kbps)} Kbps"
+
+def get_Bitrate(movie_data):
+    return _label(column(movie_data))
+
+def get_Bitrate_batch(bitrates):
+    """get_Bitrate for a column of column() values."""
+    labels = {}
+    return [labels[br] if br in labels else labels.setdefault(br, _label(br)) for br in bitrates]
@@ -1,3 +1,6 @@
+VERSION = 1
+INPUTS = ('contentRating',)
+
 def get_ContentRating(movie_data):
     cr = movie_data.get('contentRating')
     if not cr:
@@ -1,3 +1,6 @@
+VERSION = 1
+INPUTS = ('Country',)
+
 def get_Country(movie_data):
 
     short_map = {
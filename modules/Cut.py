@@ -1,5 +1,8 @@
 import re
 
+VERSION = 1
+INPUTS = ()
+
 def get_Cut(file_name):
     name_low = file_name.lower()
 
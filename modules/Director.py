@@ -1,3 +1,6 @@
+VERSION = 1
+INPUTS = ('Director',)
+
 def get_Director(movie_data):
     directors = movie_data.get('Director', [])
     if not directors:
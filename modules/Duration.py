@@ -1,5 +1,11 @@
-def get_Duration(movie_data):
-    dur_ms = movie_data.get('duration')
+VERSION = 1
+INPUTS = ('duration',)
+
+def column(movie_data):
+    """Duration in milliseconds."""
+    return movie_data.get('duration')
+
+def _label(dur_ms):
     if not dur_ms:
         return None
     total_minutes = int(dur_ms // 60000)
@@ -7,4 +13,18 @@ def get_Duration(movie_data):
     mins = total_minutes % 60
     if hours > 0:
         return f"{hours}h {mins}m"
-    return f"{mins}m"
\ No newline at end of file
+    return f"{mins}m"
+
+def get_Duration(movie_data):
+    return _label(column(movie_data))
+
+def get_Duration_batch(durations):
+    """get_Duration for a column of column() values."""
+    labels = {}
+    out = []
+    for dur_ms in durations:
+        minutes = dur_ms // 60000 if dur_ms else None
+        if minutes not in labels:
+            labels[minutes] = _label(dur_ms)
+        out.append(labels[minutes])
+    return out
\ No newline at end of file
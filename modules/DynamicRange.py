@@ -2,6 +2,19 @@
 
 import re
 
+VERSION = 1
+INPUTS = (
+    'Media.Part.Stream.streamType',
+    'Media.Part.Stream.displayTitle',
+    'Media.Part.Stream.title',
+    'Media.Part.Stream.videoDynamicRange',
+    'Media.Part.Stream.videoDynamicRangeType',
+    'Media.Part.Stream.colorTrc',
+    'Media.Part.Stream.colorPrimaries',
+    'Media.Part.Stream.doviprofile',
+    'Media.Part.file',
+)
+
 # Delimiter pattern to reduce false positives (., _, -, space, (), [], etc.)
 _TOKEN_SEP = r"(?:[.\s_\-\[\]\(\)]+)"
 
@@ -1,8 +1,14 @@
-def get_FrameRate(movie_data):
+VERSION = 1
+INPUTS = ('Media.videoFrameRate', 'Media.frameRate')
+
+def column(movie_data):
+    """Frame rate of the first media as Plex reports it (None if missing)."""
     media_list = movie_data.get('Media', [])
     if not media_list:
         return None
-    fr = media_list[0].get('videoFrameRate') or media_list[0].get('frameRate')
+    return media_list[0].get('videoFrameRate') or media_list[0].get('frameRate')
+
+def _label(fr):
     if not fr:
         return None
 
@@ -15,3 +21,11 @@ def get_FrameRate(movie_data):
             return f"{val:.2f}fps"
     except:
         return f"{fr}fps"
+
+def get_FrameRate(movie_data):
+    return _label(column(movie_data))
+
+def get_FrameRate_batch(frame_rates):
+    """get_FrameRate for a column of column() values."""
+    labels = {}
+    return [labels[fr] if fr in labels else labels.setdefault(fr, _label(fr)) for fr in frame_rates]
@@ -1,3 +1,6 @@
+VERSION = 1
+INPUTS = ('Genre',)
+
 def get_Genre(movie_data):
     genres = movie_data.get('Genre', [])
     if not genres:
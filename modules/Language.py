@@ -1,6 +1,9 @@
 import requests
 from configparser import ConfigParser
 
+VERSION = 1
+INPUTS = ('Media.Part.Stream.streamType', 'Media.Part.Stream.language')
+
 def get_Language(movie_data, excluded_languages, skip_multiple_audio_tracks):
     language_mapping = {
         'Afrikaans': 'Afrikaans',
@@ -1,15 +1,26 @@
 from configparser import ConfigParser
 import logging
 import requests
+from modules import _http
+
+VERSION = 1
+INPUTS = ('title', 'year', 'rating', 'audienceRating')
+TTL = 7 * 86400
+NETWORK = True
 
 logger = logging.getLogger(__name__)
 
-def get_Rating(movie_data, tmdb_api_key):
+def config_fingerprint():
+    """The [rating] settings that change the result (part of the module cache key)."""
     config = ConfigParser()
     config.read('config/config.ini')
 
     rating_source = config.get('rating', 'source', fallback='imdb').lower()
     rt_type = config.get('rating', 'rotten_tomatoes_type', fallback='critic').lower()
+    return rating_source, rt_type
+
+def get_Rating(movie_data, tmdb_api_key):
+    rating_source, rt_type = config_fingerprint()
 
     if rating_source == 'imdb':
         # (really TMDb vote_average, 0-10, like "7.4")
@@ -38,7 +49,7 @@ def _get_tmdb_rating(movie_data, tmdb_api_key):
     )
 
     try:
-        resp = requests.get(url, timeout=10)
+        resp = _http.get(url, timeout=10)
         resp.raise_for_status()
         data = resp.json()
         results = data.get('results', [])
@@ -1,5 +1,8 @@
 import re
 
+VERSION = 1
+INPUTS = ()
+
 _SEP = r"(?:[.\s_\-\[\]\(\)]+)"
 
 _LABEL_PATTERNS = [
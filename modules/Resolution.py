@@ -1,23 +1,34 @@
-def get_Resolution(movie_data):
-    media_list = movie_data.get('Media', [])
-    if not media_list:
-        return None
+VERSION = 1
+INPUTS = ('Media.videoResolution',)
+
+ORDER = ["480P", "576P", "720P", "1080P", "2K", "4K", "8K"]
 
+def column(movie_data):
+    """The normalized resolutions of all media, as a frozenset."""
     resolutions = set()
-    for m in media_list:
+    for m in movie_data.get('Media', []):
         res = m.get('videoResolution')
         if res:
             res = res.upper()
             if res.isdigit():
                 res += 'p'
             resolutions.add(res)
+    return frozenset(resolutions)
 
+def _label(resolutions):
     if not resolutions:
         return None
 
-    order = ["480P", "576P", "720P", "1080P", "2K", "4K", "8K"]
     sorted_res = sorted(
         resolutions,
-        key=lambda x: order.index(x) if x in order else len(order)
+        key=lambda x: ORDER.index(x) if x in ORDER else len(ORDER)
     )
-    return " · ".join(sorted_res)
\ No newline at end of file
+    return " · ".join(sorted_res)
+
+def get_Resolution(movie_data):
+    return _label(column(movie_data))
+
+def get_Resolution_batch(resolution_sets):
+    """get_Resolution for a column of column() values."""
+    labels = {}
+    return [labels[r] if r in labels else labels.setdefault(r, _label(r)) for r in resolution_sets]
\ No newline at end of file
@@ -1,5 +1,11 @@
-def get_ShortFilm(movie_data):
-    dur_ms = movie_data.get('duration')
+VERSION = 1
+INPUTS = ('duration',)
+
+def column(movie_data):
+    """Duration in milliseconds."""
+    return movie_data.get('duration')
+
+def _label(dur_ms):
     if not dur_ms:
         return None
 
@@ -8,3 +14,10 @@ def get_ShortFilm(movie_data):
         return "Short Film"
 
     return None
+
+def get_ShortFilm(movie_data):
+    return _label(column(movie_data))
+
+def get_ShortFilm_batch(durations):
+    """get_ShortFilm for a column of column() values."""
+    return [_label(dur_ms) for dur_ms in durations]
@@ -1,13 +1,19 @@
 import requests
 
-def get_Size(movie_data):
+VERSION = 1
+INPUTS = ('Media.Part.size',)
+
+def column(movie_data):
+    """Size of the largest part in bytes (0 without parts)."""
     max_size = 0
     for media in movie_data.get('Media', []):
         for part in media.get('Part', []):
             sz = part.get('size', 0)
             if sz > max_size:
                 max_size = sz
+    return max_size
 
+def _label(max_size):
     if max_size <= 0:
         return None
 
@@ -18,3 +24,10 @@ def get_Size(movie_data):
         return f"{gib:.1f} GB"
     else:
         return f"{mib:.0f} MB"
+
+def get_Size(movie_data):
+    return _label(column(movie_data))
+
+def get_Size_batch(sizes):
+    """get_Size for a column of column() values."""
+    return [_label(size) for size in sizes]
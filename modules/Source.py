@@ -1,5 +1,8 @@
 import re
 
+VERSION = 1
+INPUTS = ('Media.Part.Stream.streamType', 'Media.Part.Stream.title', 'Media.Part.Stream.displayTitle')
+
 def get_Source(file_name, movie_data):
 
     def match_source(title: str):
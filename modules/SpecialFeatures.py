@@ -1,5 +1,9 @@
-import requests
-from configparser import ConfigParser
+from modules import _http
+
+VERSION = 2
+INPUTS = ('ratingKey', 'Extras')
+TTL = 7 * 86400
+NETWORK = True
 
 def _classify_extra(ex):
     title = (ex.get('title') or "").lower()
@@ -39,11 +43,13 @@ def _classify_extra(ex):
         return "Trailer"
     return "Special Features"
 
-def get_SpecialFeatures(movie_data):
-    cfg = ConfigParser()
-    cfg.read('config/config.ini')
-    server = cfg.get('server', 'address', fallback="").rstrip("/")
-    token  = cfg.get('server', 'token', fallback="")
+def get_SpecialFeatures(movie_data, server, token):
+    # Metadata fetched with includeExtras=1 (e.g. the offline cache) already has them
+    if 'Extras' in movie_data:
+        return _summarize((movie_data['Extras'] or {}).get('Metadata') or [])
+
+    # The server the movie came from; ratingKeys are only unique per server
+    server = (server or "").rstrip("/")
     movie_id = movie_data.get('ratingKey')
 
     if not (server and token and movie_id):
@@ -53,13 +59,15 @@ def get_SpecialFeatures(movie_data):
     headers = {"X-Plex-Token": token, "Accept": "application/json"}
 
     try:
-        resp = requests.get(url, headers=headers, timeout=8)
+        resp = _http.get(url, headers=headers, timeout=8)
         resp.raise_for_status()
         data = resp.json()
     except Exception:
         return None
 
-    extras_list = data.get('MediaContainer', {}).get('Metadata', [])
+    return _summarize(data.get('MediaContainer', {}).get('Metadata', []))
+
+def _summarize(extras_list):
     if not extras_list:
         return None
 
@@ -1,3 +1,6 @@
+VERSION = 1
+INPUTS = ('Studio', 'studio')
+
 def get_Studio(movie_data):
     studios = movie_data.get('Studio', [])
     if not studios and movie_data.get('studio'):
@@ -1,3 +1,6 @@
+VERSION = 1
+INPUTS = ('Media.videoCodec',)
+
 def get_VideoCodec(movie_data):
     media_list = movie_data.get('Media', [])
     if not media_list:
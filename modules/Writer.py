@@ -1,3 +1,6 @@
+VERSION = 1
+INPUTS = ('Writer',)
+
 def get_Writer(movie_data):
     writers = movie_data.get('Writer', [])
     if not writers:
@@ -0,0 +1,21 @@
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+# Shared GET for modules that call external services (TMDb, Plex extras), so
+# the process running them can observe those calls (e.g. the webhook daemon's
+# /metrics). Observers are called as fn(host, seconds, status); status is the
+# HTTP status code, or "error" when no response arrived.
+observers = []
+
+def get(url, **kwargs):
+    start = time.perf_counter()
+    status = "error"
+    try:
+        resp = requests.get(url, **kwargs)
+        status = resp.status_code
+        return resp
+    finally:
+        for fn in observers:
+            fn(urlsplit(url).hostname or "", time.perf_counter() - start, status)
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import edition_manager as em  # noqa: E402
+from fake_plex import FakePlexServer  # noqa: E402
+
+MOVIES = 40
+
+@pytest.fixture
+def plex(monkeypatch, tmp_path):
+    """A fake Plex server, with edition_manager's settings and state directory pointed at it."""
+    server = FakePlexServer(movies=MOVIES, sections=2).start()
+    monkeypatch.setenv("PLEX_URL", server.url)
+    monkeypatch.setenv("PLEX_TOKEN", "test")
+    monkeypatch.setenv("MODULES_ORDER", "Resolution,Duration")
+    monkeypatch.setenv("PERFORMANCE_MODULE_CACHE", "false")
+    monkeypatch.delenv(em.STOP_FILE_ENV, raising=False)
+    monkeypatch.setattr(em, "BACKUP_DIR", tmp_path / "state")
+    for name in ("_server_name", "_cache", "_module_cache", "_module_guard", "_edition_log"):
+        monkeypatch.setattr(em, name, None)
+    monkeypatch.setattr(em, "_dry_run", False)
+    em._stop_event.clear()
+    yield server
+    em._stop_event.clear()
+    server.stop()
+
+@pytest.fixture
+def settings(plex):
+    """initialize_settings() for the fake server."""
+    return em.initialize_settings(check_connection=False)
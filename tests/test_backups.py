@@ -0,0 +1,119 @@
+import sys
+import time
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import edition_manager as em
+
+def _next_second():
+    # Backup file names carry the time to the second
+    time.sleep(1.01 - time.time() % 1)
+
+def _restore_at(monkeypatch, when):
+    monkeypatch.setattr(sys, "argv", ["edition_manager.py", "--restore-at", when.isoformat(timespec="seconds")])
+    em.main()
+
+def test_restore_at_replays_a_full_and_diff_chain(plex, monkeypatch):
+    library = plex.library
+    library.set_edition(1, "First", locked=True)
+    full = em.backup_metadata(plex.url, "test", prune=False)
+    _next_second()
+    between = datetime.now()
+    _next_second()
+
+    library.set_edition(1, "Second", locked=True)
+    library.set_edition(2, "Added", locked=True)
+    diff = em.backup_metadata(plex.url, "test", prune=False)
+    assert ".diff." in diff.name
+    assert em.backup_chain(diff) == [full, diff]
+    assert sum(1 for _ in em._iter_records(diff)) == 2  # only the changed movies
+
+    library.set_edition(1, "Later", locked=True)
+    library.set_edition(2, "Later", locked=True)
+    _restore_at(monkeypatch, between)
+    assert library.editions[1] == "First"
+    assert library.editions[2] == ""
+
+    _restore_at(monkeypatch, datetime.now())
+    assert library.editions[1] == "Second"
+    assert library.editions[2] == "Added"
+
+def _point(n, kind, parent=None, shard=None):
+    name = f"metadata_backup_2026-01-01_00-00-{n:02d}"
+    name += f".shard-{shard[0]}-of-{shard[1]}" if shard else ""
+    name += ".diff.jsonl" if kind == "diff" else ".jsonl"
+    path = em._state_dir() / name
+    header = {"type": "diff", "parent": parent.name} if parent else None
+    em._write_backup(path, [(str(n), {"title": f"Movie {n}", "editionTitle": "", "library": "Movies"})], shard, header)
+    return path
+
+def test_shard_backups_do_not_count_as_chains(plex):
+    f1 = _point(1, "full")
+    d1 = _point(2, "diff", f1)
+    s1 = _point(3, "full", shard=(1, 2))
+    s2 = _point(4, "full", shard=(2, 2))
+    assert em.latest_backup() == d1
+    d2 = _point(5, "diff", d1)
+
+    em.prune_old_backups(keep=2)
+    assert em.list_backups() == [f1, d1, s1, s2, d2]
+    assert dict(em.iter_backup(d2)).keys() == {"1", "2", "5"}
+
+    f2 = _point(6, "full")
+    em.prune_old_backups(keep=1)
+    assert em.list_backups() == [f2]
+
+def test_prune_keeps_what_a_kept_diff_replays(plex):
+    f1 = _point(1, "full")
+    d1 = _point(2, "diff", f1)
+    f2 = _point(3, "full")
+    d2 = _point(4, "diff", d1)  # chains on the older full
+
+    em.prune_old_backups(keep=1)
+    assert em.list_backups() == [f1, d1, f2, d2]
+    assert dict(em.iter_backup(d2)).keys() == {"1", "2", "4"}
+
+def test_lookups_read_only_the_indexed_blocks(plex, monkeypatch):
+    monkeypatch.setattr(em, "BACKUP_BLOCK_SIZE", 5)
+    plex.library.set_edition(3, "Three", locked=True)
+    path = em.backup_metadata(plex.url, "test", prune=False)
+    scans = []
+    iter_records = em._iter_records
+    monkeypatch.setattr(em, "_iter_records", lambda p: scans.append(p) or iter_records(p))
+
+    assert em.backup_lookup(path, ["3", "999"]) == {
+        "3": {"title": "Movie 3", "editionTitle": "Three", "library": "Movies 1"}
+    }
+    assert em.backup_lookup(path, library="Movies 2").keys() == {str(k) for k in plex.library.keys("2")}
+    assert not scans
+
+    # An index that doesn't match its file is ignored and the file scanned instead
+    with closing(sqlite3.connect(em._index_path(path))) as db:
+        db.execute("UPDATE meta SET value = '0' WHERE key = 'size'")
+        db.commit()
+    assert em.backup_lookup(path, ["3"])["3"]["editionTitle"] == "Three"
+    assert scans == [path]
+
+def test_restore_id_only_touches_that_movie(plex, monkeypatch):
+    library = plex.library
+    path = em.backup_metadata(plex.url, "test", prune=False)
+    library.set_edition(3, "Changed", locked=True)
+    library.set_edition(4, "Changed", locked=True)
+    monkeypatch.setattr(sys, "argv", ["edition_manager.py", f"--restore-file={path}", "--restore-id=3"])
+    em.main()
+    assert library.editions[3] == ""
+    assert library.editions[4] == "Changed"
+
+def test_restore_writes_only_movies_that_differ(plex):
+    library = plex.library
+    path = em.backup_metadata(plex.url, "test", prune=False)
+    library.set_edition(3, "Changed", locked=True)
+    library.set_edition(4, "Changed", locked=True)
+    library.count -= 1  # the last movie is gone from the server since the backup
+    plex.stats.reset()
+
+    summary = em.restore_metadata(plex.url, "test", path)
+    assert (summary["total"], summary["done"], summary["failed"]) == (2, 2, 0)
+    assert plex.stats.snapshot()["requests"]["PUT metadata"] == 2
+    assert library.editions[3] == library.editions[4] == ""
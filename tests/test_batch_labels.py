@@ -0,0 +1,31 @@
+import copy
+import json
+
+import edition_manager as em
+from conftest import ROOT
+
+MODULES = ["Size", "Bitrate", "Duration", "ShortFilm", "FrameRate", "Resolution", "AudioChannels"]
+
+def _corpus():
+    lines = (ROOT / "benchmarks" / "corpus" / "modules.jsonl").read_text(encoding="utf-8").splitlines()
+    movies = [json.loads(line)["movie"] for line in lines[1:]]
+    malformed = copy.deepcopy(movies[0])
+    malformed["Media"][0]["Part"][0]["size"] = None
+    movies.append(malformed)
+    for key, movie in enumerate(movies, 1):
+        movie["ratingKey"] = str(key)
+    return movies
+
+def _tags(movie, labels=None):
+    return em.compute_edition("http://plex", "test", movie, MODULES, [], False, "", detailed=True, labels=labels)[1]
+
+def test_batch_labels_match_per_movie_labels(monkeypatch):
+    monkeypatch.setattr(em, "_module_guard", em.ModuleGuard())
+    monkeypatch.setattr(em, "_module_cache", None)
+    movies = _corpus()
+    assert all(em.module_batch(m) for m in MODULES)
+
+    labels = em.batch_labels(MODULES, movies)
+    assert "Size" not in labels[-1]  # the malformed row fails the Size batch, which falls back per movie
+    assert "Resolution" in labels[-1]
+    assert [_tags(m, l) for m, l in zip(movies, labels)] == [_tags(m) for m in movies]
@@ -0,0 +1,43 @@
+import time
+
+from coordinator import LeaseBook
+
+LEASE = 0.05
+
+def test_expired_lease_is_requeued_for_another_worker():
+    book = LeaseBook(["1", "2", "3"], batch_size=2, lease_seconds=LEASE)
+    lease_id, items = book.acquire("w1")
+    assert items == ["1", "2"]
+    time.sleep(LEASE * 2)
+
+    again_id, again = book.acquire("w2")
+    assert again == ["1", "2"]
+    assert not book.complete(lease_id, {"1": {"ok": True}})  # the first worker's late report is refused
+    assert book.complete(again_id, {"1": {"ok": True}, "2": {"ok": True}})
+    assert book.status()["done"] == 2
+
+def test_heartbeat_keeps_a_lease():
+    book = LeaseBook(["1"], batch_size=1, lease_seconds=LEASE * 2)
+    lease_id, _items = book.acquire("w1")
+    for _ in range(4):
+        time.sleep(LEASE)
+        assert book.heartbeat(lease_id)
+    assert book.acquire("w2") is None
+    assert book.status()["leased"] == 1
+
+def test_lease_that_keeps_expiring_is_given_up():
+    book = LeaseBook(["1"], batch_size=1, lease_seconds=LEASE, max_attempts=2)
+    for _ in range(2):
+        assert book.acquire("w")[1] == ["1"]
+        time.sleep(LEASE * 2)
+    assert book.acquire("w") is None
+    assert book.finished()
+    assert book.status()["failed"] == 1
+
+def test_failed_items_are_retried_up_to_max_attempts():
+    book = LeaseBook(["1"], batch_size=1, lease_seconds=60, max_attempts=2)
+    for _ in range(2):
+        lease_id, _items = book.acquire("w")
+        book.complete(lease_id, {"1": {"ok": False, "error": "boom"}})
+    assert book.finished()
+    assert book.status()["failed"] == 1
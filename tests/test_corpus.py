@@ -0,0 +1,12 @@
+import subprocess
+import sys
+
+from conftest import ROOT
+
+def test_modules_match_the_golden_corpus():
+    result = subprocess.run(
+        [sys.executable, str(ROOT / "benchmarks" / "bench_modules.py"), "--check-only"],
+        cwd=ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert " 0 mismatches" in result.stdout
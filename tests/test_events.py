@@ -0,0 +1,24 @@
+import sys
+import json
+
+import edition_manager as em
+from conftest import MOVIES
+
+def test_events_jsonl(plex, monkeypatch, capsys):
+    monkeypatch.setattr(em, "_progress_format", em._progress_format)
+    monkeypatch.setattr(sys, "argv", ["edition_manager.py", "--all", "--events", "jsonl", "--quiet"])
+    em.main()
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith('{"event"')]
+
+    assert events[0] == {"event": "start", "total": MOVIES}
+    items = [e for e in events if e["event"] == "item"]
+    assert sorted(int(e["ratingKey"]) for e in items) == list(range(1, MOVIES + 1))
+    assert all(e["status"] == "ok" and e["edition"] == plex.library.editions[int(e["ratingKey"])] for e in items)
+
+    progress = [e for e in events if e["event"] == "progress"]
+    assert progress[-1]["done"] == MOVIES and progress[-1]["percent"] == 100.0 and progress[-1]["eta"] == 0.0
+    assert len(progress) <= 3  # at most one a second, plus the final one, on a run this short
+
+    summary = events[-1]
+    assert summary["event"] == "summary"
+    assert (summary["total"], summary["done"], summary["failed"], summary["interrupted"]) == (MOVIES, MOVIES, 0, False)
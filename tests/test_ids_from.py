@@ -0,0 +1,31 @@
+import io
+import json
+
+import edition_manager as em
+
+def test_read_ids_accepts_plain_and_json_lines():
+    lines = [
+        "1", "  2  ", "", '{"ratingKey": 3, "title": "x"}', '"4"', "{not json", '{"title": "no key"}', '{"ratingKey": ""}',
+    ]
+    assert list(em._read_ids(io.StringIO("\n".join(lines)))) == ["1", "2", "3", "4"]
+
+def test_process_ids_prints_a_result_per_key(settings, plex, capsys):
+    server, token, _skip, modules, excluded, skip_multi, tmdb, _workers, _batch = settings
+    stream = io.StringIO('1\n{"ratingKey": "2"}\n999\n3\n')
+    summary = em.process_ids(server, token, stream, modules, excluded, skip_multi, tmdb, 2, batch_size=2)
+    assert {k: summary[k] for k in ("total", "done", "failed", "not_found")} == {
+        "total": 4, "done": 3, "failed": 0, "not_found": 1
+    }
+
+    results = {
+        r["ratingKey"]: r for r in (
+            json.loads(line[len("RESULT "):]) for line in capsys.readouterr().out.splitlines()
+            if line.startswith("RESULT ")
+        )
+    }
+    assert results["999"] == {"ratingKey": "999", "status": "not_found"}
+    for key in ("1", "2", "3"):
+        assert results[key]["status"] == "ok"
+        assert results[key]["edition"] == plex.library.editions[int(key)]
+    # Details come in one request per batch of two
+    assert plex.stats.snapshot()["requests"]["GET metadata"] == 2
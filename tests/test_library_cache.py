@@ -0,0 +1,22 @@
+import edition_manager as em
+from conftest import MOVIES
+
+def test_sync_keeps_libraries_that_share_a_title(plex, settings):
+    server, token = settings[:2]
+    plex.library.titles = {"1": "Movies", "2": "Movies"}
+    cache = em.LibraryCache()
+    summary = cache.sync(server, token)
+    assert summary["movies"] == summary["done"] == MOVIES
+
+    listed = {sec["key"]: {m["ratingKey"] for m in cache.section_movies(sec["key"])} for sec in cache.sections()}
+    assert listed == {
+        "1": {str(k) for k in plex.library.keys("1")},
+        "2": {str(k) for k in plex.library.keys("2")},
+    }
+
+def test_sync_refetches_only_changed_movies(plex, settings):
+    server, token = settings[:2]
+    cache = em.LibraryCache()
+    cache.sync(server, token)
+    assert cache.sync(server, token)["total"] == 0
+    assert cache.movie("3")["Media"]
@@ -0,0 +1,48 @@
+import sys
+import logging
+import threading
+
+import edition_manager as em
+from conftest import MOVIES
+
+def _record(**extra):
+    return em.logger.makeRecord(em.logger.name, logging.INFO, __file__, 0, "Movie: 4K", (), None, extra=extra)
+
+def _filter_in_worker(n, **fields):
+    """Runs the queue filter on n per-movie records from a worker thread, as a bulk job would."""
+    records, shown = [_record(movie=True) for _ in range(n)], []
+
+    def _log():
+        with em._log_fields(**fields):
+            shown.extend(r for r in records if em._queue_handler.filter(r))
+
+    t = threading.Thread(target=_log)
+    t.start()
+    t.join()
+    return records, shown
+
+def test_bulk_movie_lines_are_sampled(monkeypatch):
+    monkeypatch.setattr(em, "_movie_lines", "sample")
+    monkeypatch.setattr(em, "_movie_lines_window", [em.time.monotonic(), 0])
+    monkeypatch.setattr(em, "_movie_lines_skipped", 0)
+    records, shown = _filter_in_worker(25, bulk=True, ratingKey="7", title="Movie")
+    assert len(shown) == em.MOVIE_LINES_PER_SECOND
+    assert em._movie_lines_skipped == 25 - em.MOVIE_LINES_PER_SECOND
+    assert all(r.ratingKey == "7" and r.title == "Movie" for r in records)
+
+def test_movie_lines_modes(monkeypatch):
+    monkeypatch.setattr(em, "_movie_lines_skipped", 0)
+    monkeypatch.setattr(em, "_movie_lines", "all")
+    assert len(_filter_in_worker(25, bulk=True)[1]) == 25
+    monkeypatch.setattr(em, "_movie_lines", "none")
+    assert _filter_in_worker(25, bulk=True)[1] == []
+    assert len(_filter_in_worker(25)[1]) == 25  # single-movie runs are never sampled
+    assert em._queue_handler.filter(_record())  # nor are other lines
+
+def test_run_counts_the_lines_it_did_not_show(plex, monkeypatch):
+    monkeypatch.setattr(em, "_movie_lines", em._movie_lines)
+    monkeypatch.setattr(em, "_movie_lines_skipped", 0)
+    monkeypatch.setattr(em.logger, "level", em.logger.level)
+    monkeypatch.setattr(sys, "argv", ["edition_manager.py", "--all"])
+    em.main()
+    assert 0 < em._movie_lines_skipped <= MOVIES - em.MOVIE_LINES_PER_SECOND
@@ -0,0 +1,48 @@
+import edition_manager as em
+from conftest import MOVIES
+
+def _run_all(settings):
+    server, token, skip_libraries, modules, excluded, skip_multi, tmdb, _workers, batch_size = settings
+    return em.process_movies(server, token, skip_libraries, modules, excluded, skip_multi, tmdb, 2, batch_size)
+
+def _tags(settings, key):
+    server, token, _skip, modules, excluded, skip_multi, tmdb = settings[:7]
+    movie = em.get_movie_by_rating_key(server, token, str(key))
+    return em.compute_edition(server, token, movie, modules, excluded, skip_multi, tmdb, detailed=True)[1]
+
+def test_skip_locked_editions(settings, plex, monkeypatch):
+    monkeypatch.setenv("PLEX_SKIP_LOCKED_EDITIONS", "true")
+    library = plex.library
+    # Unrecorded: a single-tag edition an older version wrote, and a hand-set one
+    library.set_edition(1, _tags(settings, 1)[0], locked=True)
+    library.set_edition(2, "Director's Cut", locked=True)
+    _run_all(settings)
+    assert library.editions[1] == " · ".join(_tags(settings, 1))
+    assert library.editions[2] == "Director's Cut"
+    assert library.editions.get(7) is None  # the fake server's hand-set "Old Edition"
+
+    # Recorded, then changed by hand: skipped from the listing
+    library.set_edition(3, "Mine", locked=True)
+    _run_all(settings)
+    assert library.editions[3] == "Mine"
+    assert library.editions[1] == " · ".join(_tags(settings, 1))
+
+def test_reset_and_restore_clear_the_record(settings, plex, monkeypatch):
+    server, token, skip_libraries = settings[:3]
+    monkeypatch.setenv("PLEX_SKIP_LOCKED_EDITIONS", "true")
+    library = plex.library
+    library.set_edition(1, _tags(settings, 1)[0], locked=True)
+    backup = em.backup_metadata(server, token, prune=False)
+    _run_all(settings)
+    assert len(em.edition_log().load()) == MOVIES - MOVIES // 7
+
+    # The restored single-tag edition is judged by the modules' labels, not the newer record
+    em.restore_metadata(server, token, backup, rating_keys=["1"])
+    assert "1" not in em.edition_log().load()
+    _run_all(settings)
+    assert library.editions[1] == " · ".join(_tags(settings, 1))
+
+    em.reset_movies(server, token, skip_libraries, 2, 0)
+    assert em.edition_log().load() == {}
+    assert library.editions[1] == ""
+    assert library.editions.get(7) is None  # unrecorded and locked: a reset runs no modules, so it stays
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+import edition_manager as em
+import modules.SpecialFeatures as SpecialFeatures
+
+MOVIE = {"ratingKey": "1", "title": "Slow Movie"}
+NAME = "SpecialFeatures"
+
+@pytest.fixture
+def guard(monkeypatch):
+    g = em.ModuleGuard(timeout=0.2, movie_deadline=5, fallback="skip", max_failures=2)
+    monkeypatch.setattr(em, "_module_guard", g)
+    monkeypatch.setattr(em, "_module_cache", None)
+    return g
+
+@pytest.fixture
+def hang():
+    """A network module that only returns once the test is over."""
+    release = threading.Event()
+
+    def _hang(movie_data):
+        release.wait(10)
+        return "late"
+
+    yield _network(_hang)
+    release.set()
+
+def _network(fn):
+    fn.__module__ = SpecialFeatures.__name__  # declares NETWORK = True
+    return fn
+
+def _result(fn):
+    return em._module_result(NAME, fn, MOVIE, (MOVIE,))
+
+def test_timed_out_module_is_skipped_then_disabled(guard, hang):
+    started = time.monotonic()
+    assert _result(hang) is None
+    assert time.monotonic() - started < 1
+    assert not guard.disabled(NAME)
+    assert _result(hang) is None
+    assert guard.disabled(NAME)
+
+def test_timeout_error_raised_by_the_module_uses_the_fallback(guard):
+    def _upstream_timeout(movie_data):
+        raise TimeoutError("upstream timed out")
+
+    assert _result(_network(_upstream_timeout)) is None
+    assert guard._failures[NAME] == 1
+
+def test_success_resets_the_failure_count(guard, hang):
+    assert _result(hang) is None
+    assert _result(_network(lambda movie_data: "2 Extras")) == "2 Extras"
+    assert guard._failures[NAME] == 0
+
+def test_defer_fallback_defers_the_movie(guard, hang):
+    guard.fallback = "defer"
+    with pytest.raises(em.MovieDeferred):
+        _result(hang)
+
+def test_cached_fallback_uses_the_last_stored_result(guard, hang, monkeypatch, tmp_path):
+    monkeypatch.setattr(em, "_module_cache", em.ModuleCache(tmp_path / "module_cache.sqlite"))
+    guard.fallback = "cached"
+    assert _result(_network(lambda movie_data: "2 Extras")) == "2 Extras"
+    assert _result(hang) == "2 Extras"
+
+def test_module_timeouts_are_read_once(monkeypatch):
+    monkeypatch.setenv("PLEX_URL", "http://plex")
+    monkeypatch.setenv("PERFORMANCE_MODULE_TIMEOUT", "4")
+    monkeypatch.setenv("PERFORMANCE_MODULE_TIMEOUT_SPECIALFEATURES", "1.5")
+    g = em.ModuleGuard.from_config()
+    monkeypatch.setattr(em, "_config_option", None)  # budget() must not read the config
+    assert g.budget(NAME, None) == 1.5
+    assert g.budget("Rating", None) == 4
+    assert 0 < g.budget("Rating", time.monotonic() + 1) <= 1
+
+def test_hung_calls_are_bounded(guard, hang, monkeypatch):
+    monkeypatch.setattr(em, "MODULE_HUNG_MAX", 2)
+    guard.max_failures = 10
+    assert _result(hang) is None
+    assert not guard.saturated()
+    assert _result(hang) is None
+    assert guard.saturated() and guard.disabled(NAME)
+    calls = []
+    fn = _network(lambda movie_data: calls.append(1) or "8.1")
+    assert em._module_result("Rating", fn, MOVIE, (MOVIE,)) is None
+    assert calls == [] and not guard.disabled("Rating")
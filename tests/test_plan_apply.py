@@ -0,0 +1,48 @@
+import json
+
+import edition_manager as em
+from conftest import MOVIES
+
+def test_apply_skips_movies_changed_since_the_plan(settings, plex, tmp_path):
+    server, token, skip_libraries, modules, excluded, skip_multi, tmdb, _workers, batch_size = settings
+    plan = tmp_path / "plan.jsonl"
+    em.plan_movies(server, token, skip_libraries, modules, excluded, skip_multi, tmdb, 2, batch_size, plan)
+    rows = [json.loads(line) for line in plan.read_text(encoding="utf-8").splitlines()[1:]]
+    assert len(rows) == MOVIES
+    assert not plex.library.editions  # planning writes nothing
+
+    drifted, *rest = [r for r in rows if r["current"] != r["proposed"]]
+    plex.library.set_edition(int(drifted["ratingKey"]), "Hand Edited", locked=True)
+
+    summary = em.apply_plan(server, token, plan, 2)
+    assert summary["done"] == len(rest)
+    assert plex.library.editions[int(drifted["ratingKey"])] == "Hand Edited"
+    for row in rest:
+        assert plex.library.editions[int(row["ratingKey"])] == row["proposed"]
+
+def _plan(settings, tmp_path):
+    server, token, skip_libraries, modules, excluded, skip_multi, tmdb, _workers, batch_size = settings
+    plan = tmp_path / "plan.jsonl"
+    em.plan_movies(server, token, skip_libraries, modules, excluded, skip_multi, tmdb, 2, batch_size, plan)
+    return plan
+
+def test_applying_a_plan_without_changes_reads_nothing(settings, plex, tmp_path):
+    plan = _plan(settings, tmp_path)
+    header, *rows = plan.read_text(encoding="utf-8").splitlines()
+    rows = [json.loads(line) for line in rows]
+    plan.write_text("\n".join([header] + [json.dumps({**r, "proposed": r["current"]}) for r in rows]) + "\n",
+                    encoding="utf-8")
+    plex.stats.reset()
+
+    assert em.apply_plan(settings[0], settings[1], plan, 2)["total"] == 0
+    assert plex.stats.snapshot()["total_requests"] == 0
+
+def test_movies_gone_since_the_plan_are_reported_as_missing(settings, plex, tmp_path, monkeypatch):
+    plan = _plan(settings, tmp_path)
+    plex.library.count -= 1
+    warnings = []
+    monkeypatch.setattr(em.logger, "warning", warnings.append)
+
+    summary = em.apply_plan(settings[0], settings[1], plan, 2)
+    assert summary["done"] == summary["total"] == MOVIES - 1
+    assert warnings == ["Skipping 1 movies that are no longer on the server"]
@@ -0,0 +1,33 @@
+import edition_manager as em
+from conftest import MOVIES
+
+def test_resume_after_interrupt_writes_each_movie_once(settings, monkeypatch):
+    server, token, skip_libraries, modules, excluded, skip_multi, tmdb, _workers, batch_size = settings
+    written = []
+    update_movie = em.update_movie
+
+    def _update(server, token, movie, tags, modules):
+        written.append(movie['ratingKey'])
+        if len(written) == 10:
+            em.request_stop()
+        return update_movie(server, token, movie, tags, modules)
+
+    monkeypatch.setattr(em, "update_movie", _update)
+    args = (server, token, skip_libraries, modules, excluded, skip_multi, tmdb, 2, batch_size)
+
+    first = em.process_movies(*args)
+    assert first["interrupted"]
+    assert first["done"] == len(written) < MOVIES
+
+    em._stop_event.clear()
+    second = em.process_movies(*args, resume=True)
+    assert not second["interrupted"]
+    assert second["total"] == MOVIES - first["done"]
+    # In-flight movies finished and were checkpointed, so nothing is written twice
+    assert sorted(written, key=int) == [str(k) for k in range(1, MOVIES + 1)]
+
+def test_completed_run_leaves_nothing_to_resume(settings):
+    server, token, skip_libraries, modules, excluded, skip_multi, tmdb, _workers, batch_size = settings
+    args = (server, token, skip_libraries, modules, excluded, skip_multi, tmdb, 2, batch_size)
+    assert em.process_movies(*args)["done"] == MOVIES
+    assert em.process_movies(*args, resume=True)["total"] == MOVIES
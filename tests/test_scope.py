@@ -0,0 +1,52 @@
+import pytest
+
+import edition_manager as em
+
+ADDED = 1_600_000_000  # the fake server adds movie N at ADDED + N * 600
+
+def _keys(settings, scope, now=None):
+    server, token, skip_libraries = settings[:3]
+    return sorted(int(k) for _lib, k, _m in em._collect_movies(server, token, skip_libraries, None,
+                                                               em.resolve_scope(scope, now)))
+
+SCOPES = [
+    ({"added_since": "1h"}, list(range(30, 41))),
+    ({"added_since": str(ADDED + 35 * 600)}, list(range(35, 41))),
+    ({"libraries": ["Movies 2"]}, list(range(2, 41, 2))),
+    ({"recent": 5}, list(range(36, 41))),
+    ({"collection": "every tenth"}, [10, 20, 30, 40]),
+    ({"libraries": ["1"], "recent": 3}, [35, 37, 39]),
+]
+
+@pytest.mark.parametrize("scope, expected", SCOPES)
+def test_scopes_online_and_offline(settings, scope, expected, monkeypatch):
+    now = ADDED + 30 * 600 + 3600
+    assert _keys(settings, scope, now) == expected
+
+    if "collection" not in scope:  # collections aren't cached
+        cache = em.LibraryCache()
+        cache.sync(*settings[:2])
+        monkeypatch.setattr(em, "_cache", cache)
+        assert _keys(settings, scope, now) == expected
+
+def test_resume_keeps_the_cut_off_of_a_relative_scope(settings, monkeypatch):
+    server, token, skip_libraries, modules, excluded, skip_multi, tmdb, _workers, batch_size = settings
+    written = []
+    update_movie = em.update_movie
+
+    def _update(server, token, movie, tags, modules):
+        written.append(int(movie['ratingKey']))
+        if len(written) == 3:
+            em.request_stop()
+        return update_movie(server, token, movie, tags, modules)
+
+    monkeypatch.setattr(em, "update_movie", _update)
+    args = (server, token, skip_libraries, modules, excluded, skip_multi, tmdb, 1, batch_size)
+    scope = {"added_since": "1h"}
+
+    first = em.process_movies(*args, scope=scope, scope_now=ADDED + 30 * 600 + 3600)
+    assert first["interrupted"]
+    em._stop_event.clear()
+    # A day later "1h" would match nothing; the resumed run still uses the original cut-off
+    em.process_movies(*args, resume=True, scope=scope, scope_now=ADDED + 30 * 600 + 3600 + 86400)
+    assert sorted(written) == list(range(30, 41))
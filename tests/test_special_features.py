@@ -0,0 +1,24 @@
+import edition_manager as em
+from fake_plex import FakePlexServer
+from modules import SpecialFeatures
+
+def test_extras_come_from_the_movies_own_server():
+    a = FakePlexServer(movies=20, seed=1).start()
+    b = FakePlexServer(movies=20, seed=2).start()
+    try:
+        for key in range(1, 21):
+            fn, args = em.module_call("SpecialFeatures", {"ratingKey": str(key)}, "", set(), False, None, b.url, "t")
+            assert fn(*args) == SpecialFeatures._summarize(b.library.extras(key))
+        assert a.stats.snapshot()["total_requests"] == 0
+
+        # Same ratingKey on two servers: two module cache entries
+        prints = {
+            em._module_fingerprint(SpecialFeatures, {"ratingKey": "1"},
+                                   em.module_call("SpecialFeatures", {"ratingKey": "1"}, "", set(), False, None,
+                                                  server.url, "t")[1])
+            for server in (a, b)
+        }
+        assert len(prints) == 2
+    finally:
+        a.stop()
+        b.stop()
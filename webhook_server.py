@@ -1,12 +1,22 @@
+import os
+import hmac
 import json
 import logging
 import threading
 import datetime as dt
-from concurrent.futures import ThreadPoolExecutor
-from flask import Flask, request, jsonify
+from pathlib import Path
+from configparser import ConfigParser
+from flask import Flask, Response, request, jsonify
 from edition_manager import (
     initialize_settings,
     process_movie_by_rating_key,
+    process_movies,
+    reset_movies,
+    JobScheduler,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_WEBHOOK,
+    PRIORITY_NAMES,
+    enable_metrics,
 )
 
 app = Flask(__name__)
@@ -25,7 +35,26 @@ log.setLevel(logging.WARNING)
     BATCH_SIZE,
 ) = initialize_settings()
 
-EXECUTOR = ThreadPoolExecutor(max_workers=2)
+# One scheduler for everything this daemon runs: interactive requests first,
+# then webhook events, then bulk runs.
+SCHEDULER = JobScheduler(max_workers=MAX_WORKERS)
+
+# /metrics: scheduler, stage, module and HTTP metrics from edition_manager plus
+# the webhook events seen here; bulk runs started by this daemon are included.
+METRICS = enable_metrics()
+METRICS.describe("edition_manager_webhook_events_total", "counter", "Webhook events received, by outcome")
+METRICS.gauge("edition_manager_jobs_queued", "Jobs waiting on the scheduler",
+              lambda: [({"priority": PRIORITY_NAMES[p]}, n) for p, n in SCHEDULER.pending().items()])
+METRICS.gauge("edition_manager_jobs_running", "Jobs currently running", lambda: [({}, SCHEDULER.running())])
+METRICS.gauge("edition_manager_bulk_run_active", "Bulk run in progress, by action",
+              lambda: [({"action": a}, int(_bulk_running == a)) for a in ("all", "reset")])
+
+_cfg = ConfigParser()
+_cfg.read(Path(__file__).parent / 'config' / 'config.ini')
+SECRET = os.getenv('WEBHOOK_SECRET') or _cfg.get('webhook', 'secret', fallback='').strip()
+
+_bulk_lock = threading.Lock()
+_bulk_running = None
 
 _seen = set()
 _seen_lock = threading.Lock()
@@ -57,29 +86,56 @@ def _parse_added_at(value):
     return None
 
 def _submit_one_movie(rating_key: str):
-    (
-        SERVER, TOKEN, SKIP_LIBRARIES, MODULES, EXCLUDED_LANGUAGES,
-        SKIP_MULTIPLE_AUDIO_TRACKS, TMDB_API_KEY, MAX_WORKERS, BATCH_SIZE
-    ) = initialize_settings()
-
+    # A bulk run may be sharing this process's progress counters
     process_movie_by_rating_key(
         SERVER, TOKEN, rating_key, MODULES, EXCLUDED_LANGUAGES,
-        SKIP_MULTIPLE_AUDIO_TRACKS, TMDB_API_KEY
+        SKIP_MULTIPLE_AUDIO_TRACKS, TMDB_API_KEY, progress=False
     )
 
+def _run_bulk(action: str):
+    global _bulk_running
+    try:
+        if action == "all":
+            process_movies(
+                SERVER, TOKEN, SKIP_LIBRARIES, MODULES, EXCLUDED_LANGUAGES,
+                SKIP_MULTIPLE_AUDIO_TRACKS, TMDB_API_KEY, MAX_WORKERS, BATCH_SIZE,
+                scheduler=SCHEDULER
+            )
+        elif action == "reset":
+            reset_movies(SERVER, TOKEN, SKIP_LIBRARIES, MAX_WORKERS, BATCH_SIZE, scheduler=SCHEDULER)
+    except Exception as e:
+        print(f"[ERROR] Bulk run '{action}' failed: {e}")
+    finally:
+        with _bulk_lock:
+            _bulk_running = None
+
+def _event(outcome: str):
+    METRICS.inc("edition_manager_webhook_events_total", outcome=outcome)
+
+def _authorized() -> bool:
+    if not SECRET:
+        return True
+    return hmac.compare_digest(request.headers.get("X-Edition-Manager-Secret", "").encode(), SECRET.encode())
+
 @app.route("/healthz", methods=["GET"])
 def health():
     return jsonify(ok=True), 200
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
 @app.route("/edition-manager", methods=["POST"])
 def edition_manager():
     payload_text = request.form.get("payload")
     if not payload_text:
+        _event("invalid")
         return jsonify(error="missing payload"), 400
 
     try:
         data = json.loads(payload_text)
     except Exception:
+        _event("invalid")
         return jsonify(error="invalid json"), 400
 
     event = data.get("event")
@@ -88,6 +144,7 @@ def edition_manager():
     rating_key = md.get("ratingKey")
 
     if event != "library.new" or item_type != "movie" or not rating_key:
+        _event("ignored")
         return jsonify(ignored=True), 202
 
     added_at = md.get("addedAt")
@@ -99,19 +156,46 @@ def edition_manager():
             now = dt.datetime.now(dt.timezone.utc)
             if (now - added_dt) > dt.timedelta(minutes=ADD_WINDOW_MINUTES):
                 print(f"[INFO] Ignoring stale item (addedAt={added_at})")
+                _event("stale")
                 return jsonify(ignored_stale=True, addedAt=str(added_at)), 202
     except Exception as e:
         print(f"[WARN] Error parsing addedAt '{added_at}': {e}")
 
     with _seen_lock:
         if rating_key in _seen:
+            _event("duplicate")
             return jsonify(duplicate=True), 202
         _seen.add(rating_key)
 
-    EXECUTOR.submit(_submit_one_movie, rating_key)
+    _event("queued")
+    SCHEDULER.submit(_submit_one_movie, rating_key, priority=PRIORITY_WEBHOOK)
 
     return jsonify(queued=True, ratingKey=rating_key), 202
 
+@app.route("/process/<rating_key>", methods=["POST"])
+def process_one(rating_key):
+    if not _authorized():
+        return jsonify(error="unauthorized"), 401
+    SCHEDULER.submit(_submit_one_movie, rating_key, priority=PRIORITY_INTERACTIVE)
+    return jsonify(queued=True, ratingKey=rating_key, priority="interactive"), 202
+
+@app.route("/run/<action>", methods=["POST"])
+def run_bulk(action):
+    global _bulk_running
+    # Bulk runs rewrite (or clear) every edition; never allow them unauthenticated
+    if not SECRET:
+        return jsonify(error="bulk runs are disabled until [webhook] secret (WEBHOOK_SECRET) is set"), 403
+    if not _authorized():
+        return jsonify(error="unauthorized"), 401
+    if action not in ("all", "reset"):
+        return jsonify(error=f"unknown action '{action}'"), 400
+    with _bulk_lock:
+        if _bulk_running:
+            return jsonify(error="bulk run already in progress", running=_bulk_running), 409
+        _bulk_running = action
+    threading.Thread(target=_run_bulk, args=(action,), name=f"bulk-{action}", daemon=True).start()
+    return jsonify(started=True, action=action), 202
+
 if __name__ == "__main__":
 
     from waitress import serve